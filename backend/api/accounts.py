@@ -20,7 +20,7 @@ class AccountsConfig(BaseModel):
 
 
 @router.get("/accounts")
-async def get_accounts():
+def get_accounts():
     """Get all accounts from accounts.yaml"""
     try:
         accounts_path = Path("config/accounts.yaml")
@@ -36,7 +36,7 @@ async def get_accounts():
 
 
 @router.post("/accounts")
-async def save_accounts(config: AccountsConfig):
+def save_accounts(config: AccountsConfig):
     """Save accounts to accounts.yaml"""
     try:
         accounts_path = Path("config/accounts.yaml")
@@ -71,7 +71,7 @@ accounts:
 
 
 @router.put("/accounts/{account_number}")
-async def update_account(account_number: str, account: AccountConfig):
+def update_account(account_number: str, account: AccountConfig):
     """Update a single account"""
     try:
         accounts_path = Path("config/accounts.yaml")
@@ -88,7 +88,7 @@ async def update_account(account_number: str, account: AccountConfig):
 
         # Save back
         accounts_config = AccountsConfig(accounts=config["accounts"])
-        return await save_accounts(accounts_config)
+        return save_accounts(accounts_config)
     except HTTPException:
         raise
     except Exception as e:
@@ -97,7 +97,7 @@ async def update_account(account_number: str, account: AccountConfig):
 
 
 @router.delete("/accounts/{account_number}")
-async def delete_account(account_number: str):
+def delete_account(account_number: str):
     """Delete an account"""
     try:
         accounts_path = Path("config/accounts.yaml")
@@ -118,7 +118,7 @@ async def delete_account(account_number: str):
 
         # Save back
         accounts_config = AccountsConfig(accounts=config["accounts"])
-        await save_accounts(accounts_config)
+        save_accounts(accounts_config)
 
         return {"message": "Account deleted successfully"}
     except HTTPException:
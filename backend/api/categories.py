@@ -76,7 +76,7 @@ def load_categories_from_database():
 
 
 @router.get("/tree", response_model=List[Tier1Category])
-async def get_category_tree():
+def get_category_tree():
     """Get complete 3-tier category tree"""
     try:
         categories = load_categories_from_database()
@@ -87,7 +87,7 @@ async def get_category_tree():
 
 
 @router.get("/tier1", response_model=List[str])
-async def get_tier1_categories():
+def get_tier1_categories():
     """Get list of tier1 categories"""
     try:
         categories = load_categories_from_database()
@@ -98,7 +98,7 @@ async def get_tier1_categories():
 
 
 @router.get("/tier2/{tier1}", response_model=List[str])
-async def get_tier2_categories(tier1: str):
+def get_tier2_categories(tier1: str):
     """Get tier2 categories for a specific tier1"""
     try:
         categories = load_categories_from_database()
@@ -112,7 +112,7 @@ async def get_tier2_categories(tier1: str):
 
 
 @router.get("/tier3/{tier1}/{tier2}", response_model=List[str])
-async def get_tier3_categories(tier1: str, tier2: str):
+def get_tier3_categories(tier1: str, tier2: str):
     """Get tier3 categories for a specific tier1/tier2"""
     try:
         categories = load_categories_from_database()
@@ -128,7 +128,7 @@ async def get_tier3_categories(tier1: str, tier2: str):
 
 
 @router.post("/tier1")
-async def create_tier1_category(name: str):
+def create_tier1_category(name: str):
     """Create a new tier1 category"""
     try:
         from backend.database.connection import get_db_context
@@ -161,7 +161,7 @@ async def create_tier1_category(name: str):
 
 
 @router.post("/tier2/{tier1}")
-async def create_tier2_category(tier1: str, name: str):
+def create_tier2_category(tier1: str, name: str):
     """Create a new tier2 category under a tier1"""
     try:
         from backend.database.connection import get_db_context
@@ -203,7 +203,7 @@ async def create_tier2_category(tier1: str, name: str):
 
 
 @router.post("/tier3/{tier1}/{tier2}")
-async def create_tier3_category(tier1: str, tier2: str, name: str):
+def create_tier3_category(tier1: str, tier2: str, name: str):
     """Create a new tier3 category"""
     try:
         from backend.database.connection import get_db_context
@@ -248,7 +248,7 @@ async def create_tier3_category(tier1: str, tier2: str, name: str):
 
 
 @router.delete("/tier1/{tier1}")
-async def delete_tier1_category(tier1: str):
+def delete_tier1_category(tier1: str):
     """Delete a tier1 category (and all its children)"""
     try:
         from backend.database.connection import get_db_context
@@ -288,7 +288,7 @@ async def delete_tier1_category(tier1: str):
 
 
 @router.delete("/tier2/{tier1}/{tier2}")
-async def delete_tier2_category(tier1: str, tier2: str):
+def delete_tier2_category(tier1: str, tier2: str):
     """Delete a tier2 category (and all its children)"""
     try:
         from backend.database.connection import get_db_context
@@ -330,7 +330,7 @@ async def delete_tier2_category(tier1: str, tier2: str):
 
 
 @router.delete("/tier3/{tier1}/{tier2}/{tier3}")
-async def delete_tier3_category(tier1: str, tier2: str, tier3: str):
+def delete_tier3_category(tier1: str, tier2: str, tier3: str):
     """Delete a tier3 category"""
     try:
         from backend.database.connection import get_db_context
@@ -374,7 +374,7 @@ async def delete_tier3_category(tier1: str, tier2: str, tier3: str):
 
 
 @router.put("/tier1/{old_name}")
-async def rename_tier1_category(old_name: str, new_name: str):
+def rename_tier1_category(old_name: str, new_name: str):
     """
     Rename a tier1 category and cascade to all transactions and rules.
 
@@ -457,7 +457,7 @@ async def rename_tier1_category(old_name: str, new_name: str):
 
 
 @router.put("/tier2/{tier1}/{old_name}")
-async def rename_tier2_category(tier1: str, old_name: str, new_name: str):
+def rename_tier2_category(tier1: str, old_name: str, new_name: str):
     """
     Rename a tier2 category and cascade to all transactions and rules.
 
@@ -545,7 +545,7 @@ async def rename_tier2_category(tier1: str, old_name: str, new_name: str):
 
 
 @router.put("/tier3/{tier1}/{tier2}/{old_name}")
-async def rename_tier3_category(tier1: str, tier2: str, old_name: str, new_name: str):
+def rename_tier3_category(tier1: str, tier2: str, old_name: str, new_name: str):
     """
     Rename a tier3 category and cascade to all transactions and rules.
 
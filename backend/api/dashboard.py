@@ -6,13 +6,14 @@ from sqlalchemy.orm import Session
 
 from backend.database.connection import get_db
 from backend.database.repositories.transaction_repo import TransactionRepository
-from backend.database.models import Owner
+from backend.database.models import Owner, RecurringPayment
 from backend.schemas.dashboard import (
     CategoryAggregation,
     MonthlyTrend,
     TopCounterparty,
     SavingsRateData,
-    ComparisonResponse
+    ComparisonResponse,
+    RecurringPaymentData
 )
 from backend.utils.cache import cached, clear_dashboard_cache
 
@@ -21,7 +22,7 @@ router = APIRouter()
 
 @router.get("/dashboard/summary")
 @cached(ttl_seconds=300)  # 5-minute cache
-async def get_summary(
+def get_summary(
     from_date: Optional[date] = None,
     to_date: Optional[date] = None,
     owner: Optional[str] = None,
@@ -68,7 +69,7 @@ async def get_summary(
 
 @router.get("/dashboard/categories", response_model=List[CategoryAggregation])
 @cached(ttl_seconds=300)  # 5-minute cache
-async def get_category_breakdown(
+def get_category_breakdown(
     from_date: Optional[date] = None,
     to_date: Optional[date] = None,
     owner: Optional[str] = None,
@@ -111,7 +112,7 @@ async def get_category_breakdown(
 
 @router.get("/dashboard/trends/monthly", response_model=List[MonthlyTrend])
 @cached(ttl_seconds=300)  # 5-minute cache
-async def get_monthly_trends(
+def get_monthly_trends(
     from_date: Optional[date] = None,
     to_date: Optional[date] = None,
     owner: Optional[str] = None,
@@ -146,7 +147,7 @@ async def get_monthly_trends(
 
 @router.get("/dashboard/top-counterparties", response_model=List[TopCounterparty])
 @cached(ttl_seconds=300)  # 5-minute cache
-async def get_top_counterparties(
+def get_top_counterparties(
     from_date: Optional[date] = None,
     to_date: Optional[date] = None,
     owner: Optional[str] = None,
@@ -181,7 +182,7 @@ async def get_top_counterparties(
 
 @router.get("/dashboard/savings-rate", response_model=List[SavingsRateData])
 @cached(ttl_seconds=300)  # 5-minute cache
-async def get_savings_rate(
+def get_savings_rate(
     from_date: Optional[date] = None,
     to_date: Optional[date] = None,
     owner: Optional[str] = None,
@@ -214,7 +215,7 @@ async def get_savings_rate(
 
 @router.get("/dashboard/comparison", response_model=ComparisonResponse)
 @cached(ttl_seconds=300)  # 5-minute cache
-async def get_period_comparison(
+def get_period_comparison(
     current_start: date = Query(..., description="Start date of current period"),
     current_end: date = Query(..., description="End date of current period"),
     previous_start: date = Query(..., description="Start date of previous period"),
@@ -248,7 +249,7 @@ async def get_period_comparison(
 
 
 @router.get("/dashboard/category-time-series")
-async def get_category_time_series(
+def get_category_time_series(
     from_date: Optional[date] = None,
     to_date: Optional[date] = None,
     owner: Optional[str] = None,
@@ -283,6 +284,74 @@ async def get_category_time_series(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/dashboard/recurring", response_model=List[RecurringPaymentData])
+@cached(ttl_seconds=300)  # 5-minute cache
+def get_recurring_payments(
+    type: Optional[str] = Query(None, pattern='^(expense|income)$'),
+    active_only: bool = True,
+    min_confidence: float = Query(0.0, ge=0, le=1),
+    db: Session = Depends(get_db)
+):
+    """Get detected recurring payments (subscriptions, rent, salary), largest first"""
+    try:
+        query = db.query(RecurringPayment)
+        if type:
+            query = query.filter(RecurringPayment.direction == type)
+        if active_only:
+            query = query.filter(RecurringPayment.is_active == True)
+        if min_confidence:
+            query = query.filter(RecurringPayment.confidence >= min_confidence)
+
+        results = []
+        for item in query.all():
+            results.append({
+                "id": item.id,
+                "counterparty": item.counterparty,
+                "direction": item.direction,
+                "currency": item.currency,
+                "amount": float(item.amount),
+                "amount_czk": float(item.amount_czk) if item.amount_czk is not None else None,
+                "amount_min": float(item.amount_min),
+                "amount_max": float(item.amount_max),
+                "period": item.period,
+                "interval_days": float(item.interval_days),
+                "occurrences": item.occurrences,
+                "confidence": float(item.confidence),
+                "first_date": item.first_date.date().isoformat(),
+                "last_date": item.last_date.date().isoformat(),
+                "next_expected_date": item.next_expected_date.date().isoformat(),
+                "is_active": item.is_active,
+                "category_tier1": item.category_tier1,
+                "category_tier2": item.category_tier2,
+                "category_tier3": item.category_tier3
+            })
+
+        results.sort(key=lambda item: abs(item["amount_czk"] if item["amount_czk"] is not None else item["amount"]), reverse=True)
+        return results
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/dashboard/recurring/rebuild")
+def rebuild_recurring(db: Session = Depends(get_db)):
+    """Re-detect recurring payments from the whole history (imports only update the counterparties they touch)"""
+    from backend.services.recurring_payments import rebuild_recurring_payments
+
+    try:
+        stats = rebuild_recurring_payments(db)
+        clear_dashboard_cache()
+        return {
+            "message": f"Found {stats['recurring']} recurring payments in {stats['groups']} counterparties",
+            "stats": stats
+        }
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/dashboard/test-endpoint")
 async def test_endpoint_simple():
     """Simple test endpoint to verify router is working"""
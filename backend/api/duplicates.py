@@ -0,0 +1,147 @@
+"""Near-duplicate transaction review API"""
+from fastapi import APIRouter, HTTPException, Query, Depends
+from typing import Optional
+from datetime import date
+from sqlalchemy.orm import Session
+import logging
+
+from backend.database.connection import get_db
+from backend.database.models import DuplicateCandidate
+from backend.services.duplicate_detection import detect_duplicates, merge_duplicate
+from backend.utils.cache import clear_dashboard_cache
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+def _transaction_summary(txn) -> dict:
+    return {
+        "id": txn.id,
+        "transaction_id": txn.transaction_id,
+        "date": txn.date.isoformat() if txn.date else None,
+        "description": txn.description,
+        "counterparty_name": txn.counterparty_name,
+        "note": txn.note,
+        "amount": float(txn.amount) if txn.amount else 0,
+        "currency": txn.currency,
+        "account_number": txn.account.account_number if txn.account else None,
+        "category_tier1": txn.category_tier1,
+        "category_tier2": txn.category_tier2,
+        "category_tier3": txn.category_tier3,
+        "categorization_source": txn.categorization_source,
+        "source_file": txn.source_file
+    }
+
+
+def _get_candidate(db: Session, candidate_id: int) -> DuplicateCandidate:
+    candidate = db.query(DuplicateCandidate).filter(DuplicateCandidate.id == candidate_id).first()
+    if not candidate:
+        raise HTTPException(status_code=404, detail="Duplicate candidate not found")
+    if candidate.status == "merged":
+        raise HTTPException(status_code=400, detail="Duplicate candidate is already merged")
+    if candidate.original is None or candidate.duplicate is None:
+        raise HTTPException(status_code=404, detail="Transaction of the candidate no longer exists")
+    return candidate
+
+
+@router.get("")
+def list_duplicates(
+    status: str = Query("pending", pattern="^(pending|dismissed)$"),
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_db)
+):
+    """List near-duplicate candidates, most similar first"""
+    try:
+        candidates = db.query(DuplicateCandidate).filter(
+            DuplicateCandidate.status == status
+        ).order_by(DuplicateCandidate.similarity.desc(), DuplicateCandidate.id).limit(limit).all()
+
+        items = []
+        for candidate in candidates:
+            if candidate.original is None or candidate.duplicate is None:
+                continue
+            items.append({
+                "id": candidate.id,
+                "similarity": float(candidate.similarity) if candidate.similarity is not None else None,
+                "status": candidate.status,
+                "created_at": candidate.created_at.isoformat() if candidate.created_at else None,
+                "original": _transaction_summary(candidate.original),
+                "duplicate": _transaction_summary(candidate.duplicate)
+            })
+
+        return {
+            "duplicates": items,
+            "count": len(items)
+        }
+    except Exception as e:
+        logger.error(f"Error listing duplicates: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/scan")
+def scan_duplicates(
+    from_date: Optional[date] = None,
+    to_date: Optional[date] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Scan a date range (default: the whole history) for near-duplicates.
+
+    Imports check their own transactions; a full scan finds duplicates
+    imported before detection existed or after changing its settings.
+    """
+    try:
+        stats = detect_duplicates(db, from_date, to_date)
+        if stats["merged"]:
+            clear_dashboard_cache()
+
+        return {
+            "status": "completed",
+            "message": f"Found {stats['found']} near-duplicates among {stats['scanned']} transactions ({stats['new']} new)",
+            "stats": stats
+        }
+    except Exception as e:
+        logger.error(f"Error scanning for duplicates: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/{candidate_id}/merge")
+def merge_candidate(candidate_id: int, db: Session = Depends(get_db)):
+    """Delete the duplicate transaction, keeping the original"""
+    try:
+        candidate = _get_candidate(db, candidate_id)
+        original_id = candidate.original_id
+        duplicate_id = candidate.duplicate_id
+
+        merge_duplicate(db, candidate)
+        db.commit()
+        clear_dashboard_cache()
+
+        return {
+            "message": f"Transaction {duplicate_id} merged into {original_id}",
+            "original_id": original_id,
+            "deleted_id": duplicate_id
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error merging duplicate {candidate_id}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/{candidate_id}/dismiss")
+def dismiss_candidate(candidate_id: int, db: Session = Depends(get_db)):
+    """Mark a candidate as not a duplicate (it won't be reported again)"""
+    try:
+        candidate = _get_candidate(db, candidate_id)
+        candidate.status = "dismissed"
+        db.commit()
+
+        return {"message": "Duplicate candidate dismissed"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error dismissing duplicate {candidate_id}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
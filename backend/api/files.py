@@ -1,31 +1,37 @@
 """File Upload and Processing API"""
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, BackgroundTasks
-from fastapi.responses import JSONResponse
-from typing import Optional, List
+from fastapi import APIRouter, UploadFile, File, Form, Header, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import Any, AsyncIterator, Dict, Optional, List, Tuple
+import asyncio
 import os
-import shutil
+import hashlib
+import json
+import re
+import time
+import zipfile
 from pathlib import Path
-from datetime import datetime
 import logging
 
 from backend.schemas.file_processing import (
     FileProcessingJob,
     FileProcessingStatus,
-    InstitutionInfo
+    InstitutionInfo,
+    UploadComplete,
+    UploadSession,
+    UploadSessionCreate
 )
-from backend.utils.cache import clear_dashboard_cache
+from backend.services import chunked_upload, job_queue
+from backend.services.file_processing import UPLOAD_DIR, detect_institution
+from backend.services.import_worker import load_worker_settings, notify_job_enqueued
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 # Storage paths
-UPLOAD_DIR = Path("data/uploads")
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
-# In-memory job tracker (replace with database in production)
-processing_jobs = {}
-
 
 def get_available_institutions() -> List[InstitutionInfo]:
     """Get list of configured institutions from config files"""
@@ -54,189 +60,133 @@ def get_available_institutions() -> List[InstitutionInfo]:
     return institutions
 
 
-def log_to_job(job_id: str, message: str, level: str = "INFO"):
-    """Add a log message to the job's log array"""
-    if job_id in processing_jobs:
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        processing_jobs[job_id]['log'].append(f"[{timestamp}] [{level}] {message}")
+@router.get("/institutions", response_model=List[InstitutionInfo])
+def list_institutions():
+    """Get list of available institutions for file upload"""
+    return get_available_institutions()
+
+
+# Read size when streaming uploads to disk
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Archives inside a batch ZIP are rejected rather than unpacked
+NESTED_ARCHIVE_SUFFIXES = {'.zip', '.7z', '.rar', '.gz', '.tgz', '.tar', '.bz2', '.xz'}
+
 
+def save_upload(fileobj, original_filename: str, institution: str) -> Tuple[str, str]:
+    """
+    Save an uploaded file stream to the upload directory.
+
+    The SHA-256 of the content is computed while copying, so the file is read once.
+
+    Returns:
+        (stored file name (unique per upload), hex SHA-256 of the content)
+    """
+    safe_filename = chunked_upload.stored_upload_name(original_filename, institution)
 
-def process_file_task(job_id: str, file_path: str, institution: str):
-    """Background task to process uploaded file"""
+    sha256 = hashlib.sha256()
     try:
-        log_to_job(job_id, f"Starting file processing for {processing_jobs[job_id]['filename']}")
-        log_to_job(job_id, f"Institution: {institution}, Override mode: {processing_jobs[job_id]['override_existing']}")
-
-        # Update job status
-        processing_jobs[job_id]['status'] = 'processing'
-        processing_jobs[job_id]['started_at'] = datetime.now().isoformat()
-
-        # Import processing modules
-        from src.core.parser import FileParser
-        from src.core.normalizer import DataNormalizer
-        from src.utils.categorizer import get_categorizer
-        from src.core.database_writer import DatabaseWriter
-
-        # Load institution config
-        config_path = f"config/institutions/{institution}.yaml"
-        import yaml
-        with open(config_path, 'r', encoding='utf-8') as f:
-            inst_config = yaml.safe_load(f)
-
-        # Parse file
-        log_to_job(job_id, "Parsing file...")
-        parser = FileParser(inst_config)
-        original_filename = processing_jobs[job_id]['filename']
-        raw_data = parser.parse_file(file_path, original_filename=original_filename)
-
-        processing_jobs[job_id]['parsed_rows'] = len(raw_data)
-        log_to_job(job_id, f"✓ Parsed {len(raw_data)} rows from file")
-
-        # Normalize data
-        log_to_job(job_id, "Normalizing transactions...")
-        from src.utils.currency import CurrencyConverter
-
-        # Load currency settings from settings.yaml
-        settings_path = "config/settings.yaml"
-        with open(settings_path, 'r', encoding='utf-8') as f:
-            settings = yaml.safe_load(f)
-
-        currency_config = settings.get('currency', {})
-        use_cnb_api = currency_config.get('use_cnb_api', False)
-        rates = currency_config.get('rates', {})
-        base_currency = currency_config.get('base_currency', 'CZK')
-
-        log_to_job(job_id, f"Currency conversion: CNB API {'ENABLED' if use_cnb_api else 'DISABLED'}, base={base_currency}")
-
-        # Initialize currency converter with settings
-        currency_converter = CurrencyConverter(
-            rates=rates,
-            base_currency=base_currency,
-            use_cnb_api=use_cnb_api,
-            cnb_cache_dir=currency_config.get('cnb_api', {}).get('cache_dir', 'data/cache')
+        with open(UPLOAD_DIR / safe_filename, "wb") as buffer:
+            while True:
+                chunk = fileobj.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                sha256.update(chunk)
+                buffer.write(chunk)
+    except Exception:
+        # e.g. a corrupt ZIP member: don't leave a partial file behind
+        (UPLOAD_DIR / safe_filename).unlink(missing_ok=True)
+        raise
+
+    return safe_filename, sha256.hexdigest()
+
+
+def _already_imported_message(previous: dict) -> str:
+    """Job message for an upload identical to an already imported file"""
+    return (
+        f"Identical file already imported as '{previous['filename']}' "
+        f"(job {previous['import_job_id']}, {previous['imported_at']}) - skipped"
+    )
+
+
+def _archive_members(archive: zipfile.ZipFile, archive_name: str, settings: Dict[str, Any],
+                     unpacked_bytes: int) -> Tuple[List[zipfile.ZipInfo], int]:
+    """
+    Check a ZIP's entries against the upload limits before anything is extracted
+
+    Returns:
+        (statement file entries, uncompressed bytes of the batch so far)
+
+    Raises:
+        HTTPException: 400 for nested archives and unsafe paths, 413 for too many or too large files
+    """
+    entries = archive.infolist()
+    if len(entries) > int(settings['max_archive_members']):
+        raise HTTPException(
+            status_code=413,
+            detail=f"ZIP archive '{archive_name}' has {len(entries)} entries (max {settings['max_archive_members']})"
         )
-        normalizer = DataNormalizer(currency_converter, inst_config)
-        # source_file is just for metadata in the transaction, use the saved file path
-        transactions = normalizer.normalize_transactions(raw_data, file_path)
-
-        processing_jobs[job_id]['normalized_rows'] = len(transactions)
-        log_to_job(job_id, f"✓ Normalized {len(transactions)} transactions")
-
-        # Categorize transactions
-        categorizer = get_categorizer()
-        from src.utils.logger import get_logger
-        logger = get_logger()
-
-        # Get disable_ai_categorization flag from job
-        disable_ai = processing_jobs[job_id].get('disable_ai_categorization', False)
-        ai_status = "DISABLED" if disable_ai else "ENABLED"
-        log_to_job(job_id, f"Categorizing transactions (AI: {ai_status})...")
-        logger.info(f"===== Starting categorization of {len(transactions)} transactions (AI: {ai_status}) =====")
-
-        for idx, txn in enumerate(transactions):
-            txn_dict = txn.to_dict()
-            logger.info(f"[{idx+1}/{len(transactions)}] Processing: desc={txn_dict.get('description')}, type={txn_dict.get('type')}, counterparty={txn_dict.get('counterparty_name')}")
-            tier1, tier2, tier3, owner, is_internal, source, confidence = categorizer.categorize(
-                txn_dict,
-                disable_ai=disable_ai
+
+    max_file_bytes = int(float(settings['max_file_mb']) * 1024 * 1024)
+    max_total_bytes = int(float(settings['max_archive_mb']) * 1024 * 1024)
+    members = []
+    for member in entries:
+        path = member.filename.replace('\\', '/')
+        if path.startswith('/') or '..' in path.split('/') or re.match(r'[A-Za-z]:', path):
+            raise HTTPException(status_code=400, detail=f"Unsafe path '{member.filename}' in ZIP archive '{archive_name}'")
+
+        name = Path(path).name
+        if member.is_dir() or not name or name.startswith('.') or path.startswith('__MACOSX'):
+            continue
+        if Path(name).suffix.lower() in NESTED_ARCHIVE_SUFFIXES:
+            raise HTTPException(status_code=400, detail=f"Nested archive '{member.filename}' in '{archive_name}' is not supported")
+
+        # Declared sizes: reading a member never yields more than file_size bytes
+        if member.file_size > max_file_bytes:
+            raise HTTPException(
+                status_code=413,
+                detail=f"'{member.filename}' in '{archive_name}' exceeds the maximum size of {settings['max_file_mb']} MB"
             )
-            logger.info(f"[{idx+1}/{len(transactions)}] Result: Tier1={tier1}, Tier2={tier2}, Tier3={tier3}, internal={is_internal}, source={source}")
-            txn.category_tier1 = tier1
-            txn.category_tier2 = tier2
-            txn.category_tier3 = tier3
-            txn.is_internal_transfer = is_internal
-            if owner and owner != 'Unknown':
-                txn.owner = owner
-            txn.categorization_source = source
-            if confidence:
-                txn.ai_confidence = confidence
-        logger.info(f"===== Completed categorization of {len(transactions)} transactions =====")
-        log_to_job(job_id, "✓ Categorization complete")
-
-        # Write to SQLite database as PRIMARY destination
-        logger.info("===== Starting write to SQLite database =====")
-
-        override_existing = processing_jobs[job_id]['override_existing']
-        mode = "overwrite" if override_existing else "append"
-        log_to_job(job_id, f"Writing to database (mode: {mode})...")
-        logger.info(f"Writing {len(transactions)} transactions to database (mode: {mode})")
-
-        # Use DatabaseWriter to write to SQLite
-        db_writer = DatabaseWriter()
-        result = db_writer.write_transactions(transactions, mode=mode)
-
-        # Extract statistics from result
-        inserted = result.get('added', 0)
-        updated = result.get('updated', 0)
-        skipped = result.get('skipped', 0)
-        total = result.get('total', 0)
-
-        logger.info(f"Database write complete: {inserted} added, {updated} updated, {skipped} skipped")
-        log_to_job(job_id, f"✓ Database write complete:")
-        log_to_job(job_id, f"  - Inserted: {inserted} new transactions")
-        log_to_job(job_id, f"  - Updated: {updated} existing transactions")
-        if skipped > 0:
-            log_to_job(job_id, f"  - Skipped: {skipped} duplicates")
-
-        processing_jobs[job_id]['inserted_rows'] = inserted
-        processing_jobs[job_id]['updated_rows'] = updated
-
-        # Build detailed message
-        msg_parts = []
-        if inserted > 0:
-            msg_parts.append(f"{inserted} new")
-        if updated > 0:
-            msg_parts.append(f"{updated} updated")
-        if skipped > 0:
-            msg_parts.append(f"{skipped} skipped (duplicates)")
-
-        if msg_parts:
-            msg = f"Processed {total} transactions: " + ", ".join(msg_parts)
-        else:
-            msg = "No transactions to process"
-
-        processing_jobs[job_id]['message'] = msg
-
-        success = True  # Database write always returns True if it doesn't throw exception
-
-        # Clear dashboard cache after successful data import
-        clear_dashboard_cache()
-        log_to_job(job_id, "Cleared dashboard cache")
-
-        log_to_job(job_id, "✅ File processing completed successfully")
-        processing_jobs[job_id]['status'] = 'completed'
-        processing_jobs[job_id]['completed_at'] = datetime.now().isoformat()
+        unpacked_bytes += member.file_size
+        if unpacked_bytes > max_total_bytes:
+            raise HTTPException(
+                status_code=413,
+                detail=f"ZIP archives unpack to more than {settings['max_archive_mb']} MB"
+            )
+        members.append(member)
 
-    except Exception as e:
-        logger.error(f"Error processing file {file_path}: {e}")
-        import traceback
-        error_trace = traceback.format_exc()
-        logger.error(error_trace)
+    return members, unpacked_bytes
 
-        log_to_job(job_id, f"❌ Error processing file: {str(e)}", "ERROR")
-        log_to_job(job_id, error_trace, "ERROR")
 
-        processing_jobs[job_id]['status'] = 'failed'
-        processing_jobs[job_id]['error'] = str(e)
-        processing_jobs[job_id]['completed_at'] = datetime.now().isoformat()
+def _iter_batch_members(files: List[UploadFile]):
+    """Yield (filename, file object) for uploaded files, expanding ZIP archives"""
+    settings = chunked_upload.load_upload_settings()
+    unpacked_bytes = 0
+    for upload in files:
+        if Path(upload.filename).suffix.lower() != '.zip':
+            yield upload.filename, upload.file
+            continue
 
+        try:
+            archive = zipfile.ZipFile(upload.file)
+        except zipfile.BadZipFile:
+            raise HTTPException(status_code=400, detail=f"Invalid ZIP archive '{upload.filename}'")
 
-@router.get("/institutions", response_model=List[InstitutionInfo])
-async def list_institutions():
-    """Get list of available institutions for file upload"""
-    return get_available_institutions()
+        members, unpacked_bytes = _archive_members(archive, upload.filename, settings, unpacked_bytes)
+        for member in members:
+            # Only the base name is used, so archive paths can't escape the upload dir
+            yield Path(member.filename.replace('\\', '/')).name, archive.open(member)
 
 
 @router.post("/upload")
-async def upload_file(
-    background_tasks: BackgroundTasks,
+def upload_file(
     file: UploadFile = File(...),
     institution: str = Form(...),
     override_existing: bool = Form(False),
     disable_ai_categorization: bool = Form(False)
 ):
     """
-    Upload and process a financial data file
+    Upload a financial data file and queue it for processing
 
     Args:
         file: The file to upload (CSV or XLSX)
@@ -257,105 +207,454 @@ async def upload_file(
                 detail=f"Invalid institution '{institution}'. Available: {inst_ids}"
             )
 
-        # Create unique filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        file_ext = Path(file.filename).suffix
-        safe_filename = f"{institution}_{timestamp}{file_ext}"
-        file_path = UPLOAD_DIR / safe_filename
-
         # Save uploaded file
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-
-        # Create processing job
-        job_id = f"job_{timestamp}_{institution}"
-        processing_jobs[job_id] = {
-            'id': job_id,
-            'filename': file.filename,
-            'saved_filename': safe_filename,
-            'institution': institution,
-            'status': 'pending',
-            'created_at': datetime.now().isoformat(),
-            'override_existing': override_existing,
-            'disable_ai_categorization': disable_ai_categorization,
-            'parsed_rows': 0,
-            'normalized_rows': 0,
-            'inserted_rows': 0,
-            'updated_rows': 0,
-            'log': []  # Capture detailed processing log
+        safe_filename, file_hash = save_upload(file.file, file.filename, institution)
+
+        return _queue_upload(
+            file.filename, safe_filename, institution, file_hash, override_existing, disable_ai_categorization
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error uploading file: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _queue_upload(
+    filename: str,
+    safe_filename: str,
+    institution: str,
+    file_hash: str,
+    override_existing: bool,
+    disable_ai_categorization: bool
+) -> JSONResponse:
+    """Queue the import of a stored upload (or record it as skipped if already imported)"""
+    # Identical file imported before: nothing to do (override re-processes it)
+    previous = None if override_existing else job_queue.find_imported_file(file_hash)
+    if previous:
+        (UPLOAD_DIR / safe_filename).unlink()
+        message = _already_imported_message(previous)
+        job_id = job_queue.record_skipped_upload(filename, institution, message, file_hash)
+        return JSONResponse(
+            status_code=200,
+            content={
+                'job_id': str(job_id),
+                'message': message,
+                'status': 'completed'
+            }
+        )
+
+    # Queue processing job - picked up by the import worker pool
+    job_id = job_queue.enqueue_job(
+        filename=filename,
+        saved_filename=safe_filename,
+        institution=institution,
+        override_existing=override_existing,
+        disable_ai_categorization=disable_ai_categorization,
+        max_attempts=int(load_worker_settings()['max_attempts']),
+        file_hash=file_hash
+    )
+    notify_job_enqueued()
+
+    return JSONResponse(
+        status_code=202,
+        content={
+            'job_id': str(job_id),
+            'message': 'File uploaded successfully, processing queued',
+            'status': 'pending'
         }
+    )
+
+
+@router.post("/uploads", response_model=UploadSession, status_code=201)
+def create_upload(upload: UploadSessionCreate):
+    """
+    Start a chunked, resumable upload
+
+    Send the file with PUT /uploads/{upload_id}?offset=N (raw bytes, any chunk
+    size; chunk_size is a suggestion), then POST /uploads/{upload_id}/complete
+    to queue the import. After an interruption, GET /uploads/{upload_id}
+    returns the offset to continue from.
+    """
+    try:
+        institution = upload.institution or detect_institution(upload.filename)
+        if not institution:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Could not detect institution for '{upload.filename}'. Rename the file or pass 'institution'."
+            )
+        inst_ids = [i.id for i in get_available_institutions()]
+        if institution not in inst_ids:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid institution '{institution}'. Available: {inst_ids}"
+            )
+
+        return chunked_upload.create_upload(
+            upload.filename,
+            institution,
+            size=upload.size,
+            override_existing=upload.override_existing,
+            disable_ai_categorization=upload.disable_ai_categorization
+        )
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error starting upload: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/uploads/{upload_id}", response_model=UploadSession)
+def get_upload(upload_id: str):
+    """Get the state of a chunked upload (offset to resume from)"""
+    try:
+        session = chunked_upload.get_upload(upload_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not session:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return session
+
+
+@router.put("/uploads/{upload_id}", response_model=UploadSession)
+async def upload_chunk(upload_id: str, offset: int, request: Request):
+    """
+    Append a chunk (the raw request body) to a chunked upload
+
+    `offset` must be the upload's current offset; otherwise 409 is returned
+    with the current offset in `offset`. The format is checked as soon as the
+    first 64 KB have arrived (or on complete for a smaller file), so a file
+    that isn't a CSV/XLSX statement fails early.
+    """
+    try:
+        session = await chunked_upload.append_chunk(upload_id, offset, request.stream())
+    except chunked_upload.UploadOffsetError as e:
+        return JSONResponse(status_code=409, content={'detail': str(e), 'offset': e.offset})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error receiving chunk of upload {upload_id}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if session is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return session
+
+
+@router.post("/uploads/{upload_id}/complete")
+def complete_upload(upload_id: str, completion: Optional[UploadComplete] = None):
+    """
+    Finish a chunked upload and queue its import
+
+    Returns:
+        Same as POST /upload: job ID and status
+    """
+    try:
+        completed = chunked_upload.complete_upload(upload_id, sha256=completion.sha256 if completion else None)
+        if completed is None:
+            raise HTTPException(status_code=404, detail="Upload not found")
+
+        session, safe_filename, file_hash = completed
+        return _queue_upload(
+            session['filename'], safe_filename, session['institution'], file_hash,
+            session['override_existing'], session['disable_ai_categorization']
+        )
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error completing upload {upload_id}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.delete("/uploads/{upload_id}")
+def abort_upload(upload_id: str):
+    """Cancel a chunked upload and delete the received data"""
+    try:
+        if not chunked_upload.abort_upload(upload_id):
+            raise HTTPException(status_code=404, detail="Upload not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {'message': 'Upload cancelled'}
+
+
+@router.post("/upload/batch")
+def upload_batch(
+    files: List[UploadFile] = File(...),
+    institution: Optional[str] = Form(None),
+    override_existing: bool = Form(False),
+    disable_ai_categorization: bool = Form(False)
+):
+    """
+    Upload several files (or ZIP archives of files) and import them as one job
+
+    The institution of each file is detected from the filename_patterns in its
+    institution config. Files are parsed in parallel and written in a single
+    de-duplicated bulk write.
+
+    Args:
+        files: Files to upload (CSV, XLSX or ZIP)
+        institution: Institution ID for all files (default: auto-detect per file)
+        override_existing: Whether to override existing transactions (default: False)
+        disable_ai_categorization: Whether to disable AI categorization fallback (default: False)
 
-        # Start background processing
-        background_tasks.add_task(
-            process_file_task,
-            job_id,
-            str(file_path),
-            institution
+    Returns:
+        Job ID and the detected institution of each file
+    """
+    # Files saved for this batch; deleted again if the batch fails before it is queued
+    saved_paths: List[Path] = []
+    try:
+        inst_ids = [i.id for i in get_available_institutions()]
+        if institution and institution not in inst_ids:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid institution '{institution}'. Available: {inst_ids}"
+            )
+
+        members = list(_iter_batch_members(files))
+        if not members:
+            raise HTTPException(status_code=400, detail="No files to import")
+
+        # Detect all institutions before saving anything
+        detected = [(name, fileobj, institution or detect_institution(name)) for name, fileobj in members]
+        unknown = [name for name, _, inst in detected if not inst]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Could not detect institution for: {unknown}. Rename the files or pass 'institution'."
+            )
+
+        batch_files = []
+        skipped = []
+        seen_hashes = set()
+        for name, fileobj, inst in detected:
+            safe_filename, file_hash = save_upload(fileobj, name, inst)
+            saved_paths.append(UPLOAD_DIR / safe_filename)
+
+            # Same file twice in the batch, or already imported earlier
+            previous = None if override_existing else job_queue.find_imported_file(file_hash)
+            if file_hash in seen_hashes or previous:
+                saved_paths.pop().unlink()
+                reason = _already_imported_message(previous) if previous else "Identical to another file in this batch - skipped"
+                skipped.append(f"{name}: {reason}")
+                continue
+
+            seen_hashes.add(file_hash)
+            batch_files.append({
+                'filename': name,
+                'saved_filename': safe_filename,
+                'institution': inst,
+                'sha256': file_hash
+            })
+
+        if not batch_files:
+            message = f"All {len(skipped)} files already imported - skipped"
+            job_id = job_queue.record_skipped_upload(f"Batch: {len(skipped)} files", 'batch', message)
+            for line in skipped:
+                job_queue.append_job_log(job_id, line)
+            return JSONResponse(
+                status_code=200,
+                content={
+                    'job_id': str(job_id),
+                    'message': message,
+                    'status': 'completed',
+                    'skipped': skipped,
+                    'files': []
+                }
+            )
+
+        job_id = job_queue.enqueue_job(
+            filename=batch_files[0]['filename'] if len(batch_files) == 1 else f"Batch: {len(batch_files)} files",
+            saved_filename='',
+            institution='batch',
+            override_existing=override_existing,
+            disable_ai_categorization=disable_ai_categorization,
+            max_attempts=int(load_worker_settings()['max_attempts']),
+            batch_files=batch_files
         )
+        # The queued job owns the files now
+        saved_paths.clear()
+        for line in skipped:
+            job_queue.append_job_log(job_id, line)
+        notify_job_enqueued()
 
         return JSONResponse(
             status_code=202,
             content={
-                'job_id': job_id,
-                'message': 'File uploaded successfully, processing started',
-                'status': 'pending'
+                'job_id': str(job_id),
+                'message': f'{len(batch_files)} files uploaded successfully, processing queued',
+                'status': 'pending',
+                'skipped': skipped,
+                'files': [{'filename': f['filename'], 'institution': f['institution']} for f in batch_files]
             }
         )
 
+    except HTTPException:
+        _discard_uploads(saved_paths)
+        raise
     except Exception as e:
-        logger.error(f"Error uploading file: {e}")
+        logger.error(f"Error uploading batch: {e}")
+        _discard_uploads(saved_paths)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _discard_uploads(paths: List[Path]):
+    """Delete files saved for a batch that failed before its job was queued"""
+    for path in paths:
+        try:
+            path.unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning(f"Could not delete upload {path}: {e}")
+
+
 @router.get("/jobs", response_model=List[FileProcessingJob])
-async def list_jobs(limit: int = 50):
+def list_jobs(limit: int = 50):
     """Get list of recent processing jobs"""
-    jobs = list(processing_jobs.values())
-    jobs.sort(key=lambda x: x['created_at'], reverse=True)
-    return jobs[:limit]
+    return job_queue.list_jobs(limit)
 
 
 @router.get("/jobs/{job_id}", response_model=FileProcessingJob)
-async def get_job_status(job_id: str):
+def get_job_status(job_id: int):
     """Get status of a specific processing job"""
-    if job_id not in processing_jobs:
+    job = job_queue.get_job(job_id)
+    if not job:
         raise HTTPException(status_code=404, detail="Job not found")
 
-    return processing_jobs[job_id]
+    return job
 
 
 @router.delete("/jobs/{job_id}")
-async def delete_job(job_id: str):
+def delete_job(job_id: int):
     """Delete a processing job from history"""
-    if job_id not in processing_jobs:
+    job = job_queue.get_job(job_id)
+    if not job:
         raise HTTPException(status_code=404, detail="Job not found")
 
-    job = processing_jobs[job_id]
+    if job['status'] == 'processing':
+        raise HTTPException(status_code=409, detail="Job is being processed")
 
-    # Delete uploaded file if it exists
-    if 'saved_filename' in job:
-        file_path = UPLOAD_DIR / job['saved_filename']
+    job_queue.delete_job(job_id)
+
+    # Delete uploaded file(s) if they exist
+    saved_filenames = [job['saved_filename']] + [f['saved_filename'] for f in job['files']]
+    for saved_filename in filter(None, saved_filenames):
+        file_path = UPLOAD_DIR / saved_filename
         if file_path.exists():
             file_path.unlink()
 
-    del processing_jobs[job_id]
-
     return {'message': 'Job deleted successfully'}
 
 
 @router.get("/jobs/{job_id}/log")
-async def get_job_log(job_id: str):
+def get_job_log(job_id: int):
     """Get detailed processing log for a job"""
-    if job_id not in processing_jobs:
+    job = job_queue.get_job(job_id)
+    if not job:
         raise HTTPException(status_code=404, detail="Job not found")
 
-    job = processing_jobs[job_id]
-    log_lines = job.get('log', [])
+    log_lines = job_queue.get_job_log(job_id) or []
 
     return {
-        'job_id': job_id,
-        'filename': job.get('filename'),
-        'status': job.get('status'),
+        'job_id': job['id'],
+        'filename': job['filename'],
+        'status': job['status'],
         'log': log_lines,
         'log_text': '\n'.join(log_lines)
     }
+
+
+TERMINAL_JOB_STATUSES = ('completed', 'failed')
+
+
+def _sse(event: str, data: Any, event_id: Optional[int] = None) -> str:
+    """One Server-Sent Events message"""
+    lines = [f"id: {event_id}"] if event_id is not None else []
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False)}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def _job_event_stream(
+    job: Dict[str, Any],
+    after_id: int,
+    request: Request,
+    poll_interval: float,
+    heartbeat_seconds: float
+) -> AsyncIterator[str]:
+    job_id = int(job['id'])
+    status = job['status']
+    yield _sse('snapshot', job)
+
+    last_sent = time.monotonic()
+    while not await request.is_disconnected():
+        events = await run_in_threadpool(job_queue.get_job_events, job_id, after_id)
+        for event in events:
+            after_id = event['id']
+            if event['event'] == 'status':
+                status = event['data']['status']
+            yield _sse(event['event'], event['data'], event['id'])
+
+        if events:
+            last_sent = time.monotonic()
+            continue
+
+        if status in TERMINAL_JOB_STATUSES:
+            final = await run_in_threadpool(job_queue.get_job, job_id)
+            yield _sse('end', final or job)
+            return
+
+        if time.monotonic() - last_sent >= heartbeat_seconds:
+            # Also notices a job deleted while being watched
+            if await run_in_threadpool(job_queue.get_job, job_id) is None:
+                yield _sse('end', None)
+                return
+            yield ": keep-alive\n\n"
+            last_sent = time.monotonic()
+
+        await asyncio.sleep(poll_interval)
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events(
+    job_id: int,
+    request: Request,
+    after: int = 0,
+    last_event_id: Optional[str] = Header(None)
+):
+    """
+    Server-Sent Events stream of a job's progress.
+
+    Starts with a `snapshot` event (the job as returned by GET /jobs/{job_id}),
+    then sends the job's events after `after` (or the Last-Event-ID header an
+    EventSource sends when it reconnects), each with its id:
+
+    - `log`: {line, level} - a processing log line
+    - `stage`: {stage} - parse, dedupe, categorize, write, post_process
+    - `progress`: {parsed, normalized, deduped, categorized, written} - row counters
+    - `status`: {status, ...} - pending, processing, completed, failed
+
+    Ends with an `end` event (the final job) once the job is completed or failed.
+    """
+    job = await run_in_threadpool(job_queue.get_job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    if last_event_id and last_event_id.isdigit():
+        after = int(last_event_id)
+
+    settings = load_worker_settings()
+    return StreamingResponse(
+        _job_event_stream(
+            job, after, request,
+            poll_interval=float(settings['events_poll_interval']),
+            heartbeat_seconds=float(settings['events_heartbeat_seconds'])
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -59,7 +59,7 @@ def load_rules_from_database():
 
 
 @router.get("", response_model=List[CategorizationRule])
-async def list_rules():
+def list_rules():
     """Get all categorization rules"""
     try:
         rules = load_rules_from_database()
@@ -91,7 +91,7 @@ async def list_rules():
 
 
 @router.post("", response_model=CategorizationRule)
-async def create_rule(rule: RuleCreate):
+def create_rule(rule: RuleCreate):
     """Create a new categorization rule"""
     try:
         from backend.database.connection import get_db_context
@@ -159,7 +159,7 @@ async def create_rule(rule: RuleCreate):
 
 
 @router.put("/{rule_id}", response_model=CategorizationRule)
-async def update_rule(rule_id: int, rule: RuleUpdate):
+def update_rule(rule_id: int, rule: RuleUpdate):
     """Update an existing categorization rule"""
     try:
         from backend.database.connection import get_db_context
@@ -230,7 +230,7 @@ async def update_rule(rule_id: int, rule: RuleUpdate):
 
 
 @router.delete("/{rule_id}")
-async def delete_rule(rule_id: int):
+def delete_rule(rule_id: int):
     """Delete a categorization rule"""
     try:
         from backend.database.connection import get_db_context
@@ -257,7 +257,7 @@ async def delete_rule(rule_id: int):
 
 
 @router.post("/test")
-async def test_rule(
+def test_rule(
     rule: RuleCreate,
     transaction: Optional[Dict] = None,
     count_matches: bool = False
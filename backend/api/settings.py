@@ -61,7 +61,7 @@ class Owner(BaseModel):
 
 
 @router.get("/app")
-async def get_app_settings():
+def get_app_settings():
     """Get application settings"""
     try:
         settings_path = Path("config/settings.yaml")
@@ -85,7 +85,7 @@ async def get_app_settings():
 
 
 @router.put("/app")
-async def update_app_settings(updates: Dict[str, Any]):
+def update_app_settings(updates: Dict[str, Any]):
     """Update application settings"""
     try:
         settings_path = Path("config/settings.yaml")
@@ -110,7 +110,7 @@ async def update_app_settings(updates: Dict[str, Any]):
 
 
 @router.get("/institutions")
-async def get_institutions():
+def get_institutions():
     """Get all institution configurations"""
     try:
         institutions_dir = Path("config/institutions")
@@ -135,7 +135,7 @@ async def get_institutions():
 
 
 @router.get("/institutions/{institution_id}")
-async def get_institution(institution_id: str):
+def get_institution(institution_id: str):
     """Get specific institution configuration"""
     try:
         institution_path = Path(f"config/institutions/{institution_id}.yaml")
@@ -154,7 +154,7 @@ async def get_institution(institution_id: str):
 
 
 @router.put("/institutions/{institution_id}/owners")
-async def update_institution_owners(institution_id: str, owner_mappings: Dict[str, str]):
+def update_institution_owners(institution_id: str, owner_mappings: Dict[str, str]):
     """Update owner mappings for an institution"""
     try:
         institution_path = Path(f"config/institutions/{institution_id}.yaml")
@@ -186,7 +186,7 @@ async def update_institution_owners(institution_id: str, owner_mappings: Dict[st
 
 
 @router.post("/institutions")
-async def create_institution(institution: InstitutionCreate):
+def create_institution(institution: InstitutionCreate):
     """Create a new institution configuration"""
     try:
         # Generate ID from name (lowercase, replace spaces with underscores)
@@ -258,7 +258,7 @@ async def create_institution(institution: InstitutionCreate):
 
 
 @router.put("/institutions/{institution_id}")
-async def update_institution(institution_id: str, updates: InstitutionUpdate):
+def update_institution(institution_id: str, updates: InstitutionUpdate):
     """Update an existing institution configuration"""
     try:
         institution_path = Path(f"config/institutions/{institution_id}.yaml")
@@ -339,7 +339,7 @@ async def update_institution(institution_id: str, updates: InstitutionUpdate):
 
 
 @router.delete("/institutions/{institution_id}")
-async def delete_institution(institution_id: str):
+def delete_institution(institution_id: str):
     """Delete an institution configuration"""
     try:
         institution_path = Path(f"config/institutions/{institution_id}.yaml")
@@ -361,7 +361,7 @@ async def delete_institution(institution_id: str):
 
 
 @router.get("/owners")
-async def get_all_owners():
+def get_all_owners():
     """Get all unique owners across all institutions"""
     try:
         institutions_dir = Path("config/institutions")
@@ -397,7 +397,7 @@ async def get_all_owners():
 
 
 @router.post("/owners/{owner_name}/accounts")
-async def add_owner_account(owner_name: str, account: str, institution_id: str):
+def add_owner_account(owner_name: str, account: str, institution_id: str):
     """Add an account to an owner in a specific institution"""
     try:
         institution_path = Path(f"config/institutions/{institution_id}.yaml")
@@ -434,7 +434,7 @@ async def add_owner_account(owner_name: str, account: str, institution_id: str):
 
 
 @router.delete("/owners/{owner_name}/accounts")
-async def remove_owner_account(owner_name: str, account: str, institution_id: str):
+def remove_owner_account(owner_name: str, account: str, institution_id: str):
     """Remove an account from an owner in a specific institution"""
     try:
         institution_path = Path(f"config/institutions/{institution_id}.yaml")
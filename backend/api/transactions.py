@@ -1,5 +1,6 @@
 """Transactions API endpoints"""
 from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi.responses import JSONResponse
 from typing import Optional
 from datetime import date
 from sqlalchemy.orm import Session
@@ -13,7 +14,7 @@ router = APIRouter()
 
 
 @router.get("/transactions")
-async def get_transactions(
+def get_transactions(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100000),
     from_date: Optional[date] = None,
@@ -88,6 +89,7 @@ async def get_transactions(
                 "counterparty_name": txn.counterparty_name,
                 "counterparty_bank": txn.counterparty_bank,
                 "is_internal_transfer": txn.is_internal_transfer,
+                "transfer_pair_id": txn.transfer_pair_id,
                 "categorization_source": txn.categorization_source,
                 "ai_confidence": txn.ai_confidence,
                 "variable_symbol": txn.variable_symbol,
@@ -98,7 +100,9 @@ async def get_transactions(
             }
             transaction_dicts.append(txn_dict)
 
-        return {
+        # Rows are already JSON-native; returning a JSONResponse renders it here in the
+        # worker thread instead of running jsonable_encoder on the event loop
+        return JSONResponse(content={
             "data": transaction_dicts,
             "pagination": {
                 "page": (skip // limit) + 1,
@@ -106,7 +110,7 @@ async def get_transactions(
                 "total_pages": total_pages,
                 "total_items": total
             }
-        }
+        })
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -114,7 +118,7 @@ async def get_transactions(
 
 
 @router.post("/transactions/reapply-rules")
-async def reapply_rules(
+def reapply_rules(
     from_date: Optional[date] = None,
     to_date: Optional[date] = None,
     owner: Optional[str] = None,
@@ -271,8 +275,42 @@ async def reapply_rules(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/transactions/pair-transfers")
+def pair_transfers(
+    from_date: Optional[date] = None,
+    to_date: Optional[date] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Pair internal transfer legs (debit on one own account, credit on another).
+
+    Imports pair the transactions around their own date range; this re-runs
+    pairing over a whole range, e.g. after changing
+    internal_transfers.pairing in categorization.yaml. Already paired
+    transactions are kept.
+    """
+    from backend.services.transfer_pairing import pair_transfers as run_pairing
+
+    try:
+        stats = run_pairing(db, from_date, to_date)
+        if stats["pairs"]:
+            clear_dashboard_cache()
+
+        return {
+            "status": "completed",
+            "message": f"Paired {stats['pairs']} transfers among {stats['candidates']} transactions",
+            "stats": stats
+        }
+
+    except Exception as e:
+        import logging
+        logger = logging.getLogger(__name__)
+        logger.error(f"Error pairing transfers: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/transactions/uncategorized/list")
-async def get_uncategorized(
+def get_uncategorized(
     limit: int = Query(100, ge=1, le=500),
     db: Session = Depends(get_db)
 ):
@@ -308,7 +346,7 @@ async def get_uncategorized(
 
 
 @router.get("/transactions/{transaction_id}")
-async def get_transaction(
+def get_transaction(
     transaction_id: int,
     db: Session = Depends(get_db)
 ):
@@ -340,6 +378,7 @@ async def get_transaction(
             "counterparty_name": transaction.counterparty_name,
             "counterparty_bank": transaction.counterparty_bank,
             "is_internal_transfer": transaction.is_internal_transfer,
+            "transfer_pair_id": transaction.transfer_pair_id,
             "categorization_source": transaction.categorization_source,
             "ai_confidence": transaction.ai_confidence,
             "variable_symbol": transaction.variable_symbol,
@@ -355,7 +394,7 @@ async def get_transaction(
 
 
 @router.put("/transactions/{transaction_id}")
-async def update_transaction(
+def update_transaction(
     transaction_id: int,
     updates: dict,
     db: Session = Depends(get_db)
@@ -381,7 +420,7 @@ async def update_transaction(
 
 
 @router.delete("/transactions/{transaction_id}")
-async def delete_transaction(transaction_id: int, db: Session = Depends(get_db)):
+def delete_transaction(transaction_id: int, db: Session = Depends(get_db)):
     """Delete a transaction from SQLite database"""
     # Fixed to work with SQLite
     try:
@@ -400,7 +439,7 @@ async def delete_transaction(transaction_id: int, db: Session = Depends(get_db))
 
 
 @router.post("/transactions/bulk-update")
-async def bulk_update_transactions(
+def bulk_update_transactions(
     transaction_ids: list[int],
     updates: dict,
     db: Session = Depends(get_db)
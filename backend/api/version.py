@@ -6,7 +6,7 @@ router = APIRouter()
 
 
 @router.get("/")
-async def get_version():
+def get_version():
     """
     Get application version information.
 
@@ -6,21 +6,11 @@ import os
 import logging
 from pathlib import Path
 
-# Set up logging to file
-log_dir = Path("data/logs")
-log_dir.mkdir(parents=True, exist_ok=True)
-log_file = log_dir / "finance_consolidator.log"
-
-# Configure root logger to write to both file and console
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S',
-    handlers=[
-        logging.FileHandler(log_file, encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
+# Log to file and console through a queue: handlers write on a background thread
+from src.utils.logger import configure_logging, load_logging_settings
+logging_settings = load_logging_settings()
+configure_logging(logging_settings)
+log_file = logging_settings.get('file')
 
 logger = logging.getLogger(__name__)
 logger.info(f"Logging initialized. Log file: {log_file}")
@@ -44,6 +34,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request latency/in-flight metrics for /metrics
+from backend.utils.monitoring import MetricsMiddleware
+app.add_middleware(MetricsMiddleware)
+
+# Per-request SQL summary for requests sent with X-SQL-Profile: 1 (or ?sql_profile=1)
+from backend.database.profiler import SQLProfilerMiddleware
+app.add_middleware(SQLProfilerMiddleware)
+
 # Health check endpoint
 @app.get("/api/v1/health")
 async def health_check():
@@ -63,14 +61,40 @@ async def health_check():
 
 # Version info endpoint
 @app.get("/api/v1/version")
-async def get_version():
+def get_version():
     """Get application version information"""
     from backend.utils.version import get_version_info
     return get_version_info()
 
+# Prometheus metrics (HTTP routes, SQL, dashboard cache, AI calls, import jobs)
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Metrics in the Prometheus text exposition format"""
+    from fastapi.responses import Response
+    from backend.utils.monitoring import CONTENT_TYPE, render_metrics
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE)
+
+# Create/upgrade tables and start the import workers that consume the job queue
+@app.on_event("startup")
+def start_import_workers():
+    """Initialize database and start embedded import worker pool"""
+    from backend.database.connection import init_db
+    from backend.services.import_worker import start_embedded_pool
+    init_db()
+    start_embedded_pool()
+
+# Release pooled database connections on shutdown (each runs PRAGMA optimize)
+@app.on_event("shutdown")
+def dispose_database():
+    """Stop import workers and close pooled database connections"""
+    from backend.database.connection import engine
+    from backend.services.import_worker import stop_embedded_pool
+    stop_embedded_pool()
+    engine.dispose()
+
 # Import and include routers
 try:
-    from backend.api import transactions, dashboard, files, categories, rules, settings, accounts
+    from backend.api import transactions, dashboard, files, categories, rules, settings, accounts, duplicates
     logger.info("[OK] All routers imported successfully")
 
     app.include_router(transactions.router, prefix="/api/v1", tags=["transactions"])
@@ -94,6 +118,9 @@ try:
     app.include_router(accounts.router, prefix="/api/v1", tags=["accounts"])
     logger.info("[OK] Registered accounts router")
 
+    app.include_router(duplicates.router, prefix="/api/v1/duplicates", tags=["duplicates"])
+    logger.info("[OK] Registered duplicates router")
+
 except Exception as e:
     logger.error(f"[ERROR] loading routers: {e}")
     import traceback
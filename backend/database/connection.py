@@ -1,29 +1,344 @@
 """Database connection and session management"""
 import os
-from sqlalchemy import create_engine
+import logging
+from pathlib import Path
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, Session
 from contextlib import contextmanager
-from typing import Generator
+from typing import Any, Dict, Generator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
 
 from backend.database.models import Base
 
+logger = logging.getLogger(__name__)
+
 # Database URL from environment or default to SQLite in data directory
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///data/finance.db")
 
+# SQLite performance profile applied to every new DBAPI connection.
+# WAL lets dashboard reads proceed while an upload is writing; NORMAL sync is
+# durable in WAL mode except for the last commits on power loss.
+# Any key can be overridden (or disabled with null) in settings.yaml -> database.sqlite
+DEFAULT_SQLITE_PRAGMAS: Dict[str, Any] = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 268435456,   # 256 MB memory-mapped I/O
+    "cache_size": -65536,     # Negative = KiB, i.e. 64 MB page cache per connection
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,     # ms to wait for the writer lock instead of failing
+}
+
+# Pool sizing: SQLite allows many concurrent readers (in WAL mode) but only one writer
+DEFAULT_POOL_CONFIG: Dict[str, Any] = {
+    "readers": 4,
+    "writers": 1,
+    "max_overflow": 4,
+    "timeout": 30,
+    "recycle": 3600,
+}
+
+
+def _load_database_settings(settings_path: str = "config/settings.yaml") -> Dict[str, Any]:
+    """Load the optional `database` section from settings.yaml"""
+    path = Path(settings_path)
+    if not path.exists():
+        return {}
+
+    try:
+        import yaml
+        with open(path, 'r', encoding='utf-8') as f:
+            settings = yaml.safe_load(f) or {}
+        return settings.get('database', {}) or {}
+    except Exception as e:
+        logger.warning(f"Could not load database settings from {settings_path}: {e}")
+        return {}
+
+
+def _is_file_sqlite(url: str) -> bool:
+    """True for on-disk SQLite URLs (pooling and WAL do not apply to :memory:)"""
+    if not url.startswith("sqlite"):
+        return False
+    return not (url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in url)
+
+
+def _apply_sqlite_pragmas(dbapi_connection, pragmas: Dict[str, Any]):
+    """Execute PRAGMA statements on a freshly opened SQLite connection"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            if value is None:
+                continue
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def _optimize_sqlite(dbapi_connection):
+    """Run PRAGMA optimize so the query planner statistics stay current"""
+    try:
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA optimize")
+        cursor.close()
+    except Exception as e:
+        # Closing must never fail because of housekeeping
+        logger.debug(f"PRAGMA optimize skipped: {e}")
+
+
+def create_db_engine(
+    url: str = DATABASE_URL,
+    profile: Optional[str] = None,
+    database_settings: Optional[Dict[str, Any]] = None,
+    echo: bool = False
+) -> Engine:
+    """
+    Create a SQLAlchemy engine with the configured SQLite performance profile.
+
+    Args:
+        url: Database URL
+        profile: "performance" (pragmas + sized pool) or "default" (SQLite defaults).
+                 Falls back to settings.yaml -> database.profile, then "performance".
+        database_settings: Pre-loaded `database` settings section (loads settings.yaml if None)
+        echo: Log all SQL statements
+
+    Returns:
+        Configured Engine
+    """
+    if database_settings is None:
+        database_settings = _load_database_settings()
+
+    profile = profile or os.getenv("DATABASE_PROFILE") or database_settings.get('profile', 'performance')
+    is_sqlite = url.startswith("sqlite")
+
+    engine_kwargs: Dict[str, Any] = {
+        "connect_args": {"check_same_thread": False} if is_sqlite else {},
+        "echo": echo,
+    }
+
+    pragmas: Dict[str, Any] = {}
+    optimize_on_close = False
+
+    if profile == "performance":
+        pragmas = {**DEFAULT_SQLITE_PRAGMAS, **(database_settings.get('sqlite') or {})}
+        optimize_on_close = bool(pragmas.pop('optimize_on_close', True))
+
+        if _is_file_sqlite(url):
+            pool = {**DEFAULT_POOL_CONFIG, **(database_settings.get('pool') or {})}
+            engine_kwargs.update(
+                pool_size=int(pool['readers']) + int(pool['writers']),
+                max_overflow=int(pool['max_overflow']),
+                pool_timeout=pool['timeout'],
+                pool_recycle=pool['recycle'],
+            )
+
+    engine = create_engine(url, **engine_kwargs)
+
+    if is_sqlite and pragmas:
+        @event.listens_for(engine, "connect")
+        def _on_connect(dbapi_connection, connection_record):
+            _apply_sqlite_pragmas(dbapi_connection, pragmas)
+
+    if is_sqlite and optimize_on_close:
+        @event.listens_for(engine, "close")
+        def _on_close(dbapi_connection, connection_record):
+            _optimize_sqlite(dbapi_connection)
+
+    # Slow query log and X-SQL-Profile request summaries
+    from backend.database.profiler import install_profiler
+    install_profiler(engine, database_settings.get('profiler'))
+
+    logger.debug(f"Created database engine (profile={profile})")
+    return engine
+
+
+# Tables whose changes invalidate in-memory caches in every process (see get_cache_generation)
+CACHE_GENERATION_TABLES: Dict[str, tuple] = {
+    "categorization": ("categorization_rules", "categories", "owners"),
+}
+
 # Create engine
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {},
-    echo=False  # Set to True for SQL query logging
-)
+engine = create_db_engine(DATABASE_URL)
+
+# Statement timings for /metrics
+from backend.utils.monitoring import instrument_engine
+instrument_engine(engine)
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+# Alembic revisions and the revision of databases created before them
+MIGRATIONS_DIR = Path(__file__).resolve().parent / "migrations"
+BASELINE_REVISION = "0001_baseline"
+
+
+@contextmanager
+def _schema_lock():
+    """
+    Exclusive lock held by one process at a time while it initializes the schema.
+
+    uvicorn --workers N starts N processes that all call init_db(); without
+    the lock two of them stamp and upgrade the same database and the second
+    fails. The lock file sits next to an on-disk SQLite database; other
+    databases aren't locked.
+    """
+    if not _is_file_sqlite(str(engine.url)) or not engine.url.database:
+        yield
+        return
+
+    lock_path = Path(f"{engine.url.database}.init.lock")
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, "a+b") as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
 def init_db():
-    """Initialize database - create all tables"""
-    Base.metadata.create_all(bind=engine)
+    """Initialize database - create all tables and apply pending migrations"""
+    from sqlalchemy import inspect
+
+    with _schema_lock():
+        existed = inspect(engine).has_table("transactions")
+        Base.metadata.create_all(bind=engine)
+        if engine.url.get_backend_name() == "sqlite":
+            _add_missing_columns()
+        _run_migrations(existed)
+        if engine.url.get_backend_name() == "sqlite":
+            _create_generation_triggers()
+
+
+def alembic_config(connection=None):
+    """
+    Alembic config of the migrations, built in code.
+
+    alembic.ini in the project root is only for the CLI; deployments (the
+    Docker image) may not ship it.
+    """
+    from alembic.config import Config
+
+    config = Config()
+    config.set_main_option("script_location", str(MIGRATIONS_DIR))
+    config.set_main_option("path_separator", "os")
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+def _run_migrations(existed: bool):
+    """
+    Bring the schema to the Alembic head revision.
+
+    create_all() builds new databases from the current models, so they are
+    only stamped. Databases without alembic_version predate migrations:
+    they are stamped with the baseline and upgraded.
+    """
+    from alembic import command
+    from alembic.runtime.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+
+    with engine.begin() as conn:
+        config = alembic_config(conn)
+        current = MigrationContext.configure(conn).get_current_revision()
+        if current is None:
+            if not existed:
+                command.stamp(config, "head")
+                return
+            command.stamp(config, BASELINE_REVISION)
+            current = BASELINE_REVISION
+
+        heads = set(ScriptDirectory.from_config(config).get_heads())
+        if current not in heads:
+            logger.info(f"Upgrading database schema from {current} to {', '.join(sorted(heads))}")
+            command.upgrade(config, "head")
+
+
+def _add_missing_columns():
+    """
+    Add columns and indexes introduced after a table was first created.
+
+    create_all() only creates missing tables; SQLite supports ADD COLUMN for
+    the nullable columns new features add to existing tables.
+    """
+    from sqlalchemy import inspect, text
+
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+
+            existing_columns = {col['name'] for col in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN "{column.name}" {column_type}'))
+                logger.info(f"Added column {table.name}.{column.name}")
+
+            for index in table.indexes:
+                index.create(bind=conn, checkfirst=True)
+
+
+def _create_generation_triggers():
+    """
+    Bump cache_generations on every change to the tables of CACHE_GENERATION_TABLES.
+
+    Triggers also catch bulk updates and changes made by other processes,
+    which ORM events would miss.
+    """
+    from sqlalchemy import text
+
+    with engine.begin() as conn:
+        for name, tables in CACHE_GENERATION_TABLES.items():
+            conn.execute(
+                text("INSERT OR IGNORE INTO cache_generations (name, generation) VALUES (:name, 0)"),
+                {"name": name}
+            )
+            for table in tables:
+                for operation in ("INSERT", "UPDATE", "DELETE"):
+                    conn.execute(text(
+                        f"CREATE TRIGGER IF NOT EXISTS trg_{table}_{operation.lower()}_generation "
+                        f"AFTER {operation} ON {table} "
+                        f"BEGIN UPDATE cache_generations SET generation = generation + 1 "
+                        f"WHERE name = '{name}'; END"
+                    ))
+
+
+def get_cache_generation(name: str) -> Optional[int]:
+    """
+    Current change counter of a CACHE_GENERATION_TABLES group.
+
+    Returns:
+        Generation number, or None when it isn't tracked (non-SQLite database)
+    """
+    if engine.url.get_backend_name() != "sqlite":
+        return None
+
+    from sqlalchemy import text
+
+    with engine.connect() as conn:
+        return conn.execute(
+            text("SELECT generation FROM cache_generations WHERE name = :name"),
+            {"name": name}
+        ).scalar()
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -0,0 +1,45 @@
+"""
+Alembic environment.
+
+init_db() passes its open connection in config.attributes["connection"];
+the alembic CLI connects to DATABASE_URL. SQLite can't ALTER a column, so
+migrations run in batch mode (copy the table, swap it in).
+"""
+from logging.config import fileConfig
+
+from alembic import context
+
+from backend.database.models import Base
+
+config = context.config
+target_metadata = Base.metadata
+
+
+def run_migrations(connection):
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        render_as_batch=connection.dialect.name == "sqlite",
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        run_migrations(connection)
+        return
+
+    # CLI: own logging config, engine from DATABASE_URL
+    if config.config_file_name is not None:
+        fileConfig(config.config_file_name)
+    from backend.database.connection import engine
+
+    with engine.begin() as connection:
+        run_migrations(connection)
+
+
+if context.is_offline_mode():
+    raise SystemExit("Offline (--sql) migrations are not supported; run against a database")
+run_migrations_online()
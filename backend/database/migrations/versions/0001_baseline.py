@@ -0,0 +1,22 @@
+"""Baseline: schema created by init_db before migrations were introduced
+
+Databases created before Alembic have no alembic_version table; init_db
+stamps them with this revision and upgrades from here.
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-18
+"""
+
+revision = "0001_baseline"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    pass
+
+
+def downgrade():
+    pass
@@ -0,0 +1,55 @@
+"""Store transaction amounts as integer cents
+
+transactions.amount and amount_czk were NUMERIC(15, 2), which SQLite keeps
+as REAL: sums drifted by float rounding (0.1 + 0.2) and were rounded again
+in Python. They become BIGINT counts of cents (MinorUnits in the models).
+
+ROUND(x, 2) before scaling: SQLite rounds the decimal text of the value,
+so 0.285 becomes 29 cents like Decimal("0.285") does, where ROUND(x * 100)
+sees 28.499999999999996.
+
+Revision ID: 0002_integer_cents
+Revises: 0001_baseline
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002_integer_cents"
+down_revision = "0001_baseline"
+branch_labels = None
+depends_on = None
+
+AMOUNT_COLUMNS = (("amount", False), ("amount_czk", True))
+
+
+def _stored_as_cents() -> bool:
+    """Tables made by create_all() from current models already have integer columns"""
+    columns = {col["name"]: col["type"] for col in sa.inspect(op.get_bind()).get_columns("transactions")}
+    return isinstance(columns["amount"], sa.Integer)
+
+
+def upgrade():
+    if _stored_as_cents():
+        return
+
+    op.execute(
+        "UPDATE transactions SET "
+        "amount = CAST(ROUND(ROUND(amount, 2) * 100) AS INTEGER), "
+        "amount_czk = CAST(ROUND(ROUND(amount_czk, 2) * 100) AS INTEGER)"
+    )
+    with op.batch_alter_table("transactions") as batch:
+        for name, nullable in AMOUNT_COLUMNS:
+            batch.alter_column(name, type_=sa.BigInteger(), existing_type=sa.Numeric(15, 2),
+                               existing_nullable=nullable)
+    if op.get_bind().dialect.name == "sqlite":
+        # The copied table has no planner statistics
+        op.execute("ANALYZE transactions")
+
+
+def downgrade():
+    with op.batch_alter_table("transactions") as batch:
+        for name, nullable in AMOUNT_COLUMNS:
+            batch.alter_column(name, type_=sa.Numeric(15, 2), existing_type=sa.BigInteger(),
+                               existing_nullable=nullable)
+    op.execute("UPDATE transactions SET amount = amount / 100.0, amount_czk = amount_czk / 100.0")
@@ -0,0 +1,52 @@
+"""Store recurring payment amounts as integer cents
+
+recurring_payments.amount, amount_czk, amount_min and amount_max were
+NUMERIC(15, 2) (REAL in SQLite) while the transaction amounts they are
+compared with are integer cents since 0002_integer_cents. They become
+BIGINT counts of cents too (MinorUnits in the models), rounded the same way.
+
+Revision ID: 0003_recurring_cents
+Revises: 0002_integer_cents
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003_recurring_cents"
+down_revision = "0002_integer_cents"
+branch_labels = None
+depends_on = None
+
+AMOUNT_COLUMNS = ("amount", "amount_czk", "amount_min", "amount_max")
+
+
+def _stored_as_cents() -> bool:
+    """Tables made by create_all() from current models already have integer columns"""
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("recurring_payments"):
+        return True
+    columns = {col["name"]: col["type"] for col in inspector.get_columns("recurring_payments")}
+    return isinstance(columns["amount"], sa.Integer)
+
+
+def upgrade():
+    if _stored_as_cents():
+        return
+
+    op.execute(
+        "UPDATE recurring_payments SET "
+        + ", ".join(f"{name} = CAST(ROUND(ROUND({name}, 2) * 100) AS INTEGER)" for name in AMOUNT_COLUMNS)
+    )
+    with op.batch_alter_table("recurring_payments") as batch:
+        for name in AMOUNT_COLUMNS:
+            batch.alter_column(name, type_=sa.BigInteger(), existing_type=sa.Numeric(15, 2), existing_nullable=True)
+
+
+def downgrade():
+    with op.batch_alter_table("recurring_payments") as batch:
+        for name in AMOUNT_COLUMNS:
+            batch.alter_column(name, type_=sa.Numeric(15, 2), existing_type=sa.BigInteger(), existing_nullable=True)
+    op.execute(
+        "UPDATE recurring_payments SET "
+        + ", ".join(f"{name} = {name} / 100.0" for name in AMOUNT_COLUMNS)
+    )
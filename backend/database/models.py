@@ -7,6 +7,8 @@ from sqlalchemy import (
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
+from backend.database.types import MinorUnits
+
 Base = declarative_base()
 
 
@@ -90,9 +92,9 @@ class Transaction(Base):
     # Core fields
     date = Column(DateTime, nullable=False)
     description = Column(Text, nullable=False)
-    amount = Column(Numeric(15, 2), nullable=False)
+    amount = Column(MinorUnits(), nullable=False)  # Stored in cents, Decimal in Python
     currency = Column(String(3), nullable=False)
-    amount_czk = Column(Numeric(15, 2))
+    amount_czk = Column(MinorUnits())
     exchange_rate = Column(Numeric(10, 6))
 
     # 3-Tier categorization
@@ -100,6 +102,8 @@ class Transaction(Base):
     category_tier2 = Column(String(100))
     category_tier3 = Column(String(100))
     is_internal_transfer = Column(Boolean, default=False)
+    transfer_pair_id = Column(String(50))  # Shared by both legs of a paired internal transfer
+    recurring_key = Column(String(150))  # Recurring payment group: direction|currency|normalized counterparty
 
     # Categorization metadata
     categorization_source = Column(String(50))  # manual_rule, ai, internal_transfer, uncategorized
@@ -142,6 +146,8 @@ class Transaction(Base):
         Index("idx_transactions_account", "account_id"),
         Index("idx_transactions_amount", "amount"),
         Index("idx_transactions_internal", "is_internal_transfer"),
+        Index("idx_transactions_transfer_pair", "transfer_pair_id"),
+        Index("idx_transactions_recurring_key", "recurring_key"),
         Index("idx_transactions_synced", "synced_to_sheets"),
     )
 
@@ -187,24 +193,44 @@ class CategorizationRule(Base):
 
 
 class ImportJob(Base):
-    """Track file import/processing status"""
+    """Track file import/processing status (also the durable processing queue)"""
     __tablename__ = "import_jobs"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     filename = Column(String(255), nullable=False)
+    saved_filename = Column(String(255))  # Name of the stored copy in data/uploads
+    file_hash = Column(String(64))  # SHA-256 of the uploaded file
     institution_id = Column(Integer, ForeignKey("institutions.id"))
+    institution_code = Column(String(50))  # Institution config id (csob, partners, wise) or "batch"
+    batch_files = Column(Text)  # JSON list of {filename, saved_filename, institution, sha256} for batch uploads
     status = Column(String(20), nullable=False)  # pending, processing, completed, failed
+    stage = Column(String(30))  # Pipeline stage of a processing job (parse, dedupe, categorize, write, post_process)
+
+    # Processing options
+    override_existing = Column(Boolean, default=False)
+    disable_ai_categorization = Column(Boolean, default=False)
 
     # Statistics
-    total_rows = Column(Integer)
-    processed_rows = Column(Integer)
+    total_rows = Column(Integer)  # Parsed rows
+    processed_rows = Column(Integer)  # Normalized rows
     failed_rows = Column(Integer)
     new_transactions = Column(Integer)
+    updated_transactions = Column(Integer)
     duplicate_transactions = Column(Integer)
+    message = Column(Text)
+    log = Column(Text)  # Processing log of jobs created before import_job_events (new lines are events)
 
     # Error tracking
     error_message = Column(Text)
     error_details = Column(Text)  # JSON with row-level errors
+    timings = Column(Text)  # JSON: total_seconds and seconds/rows/calls/rows_per_sec per pipeline stage
+
+    # Queue leasing and retries
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=3)
+    available_at = Column(DateTime)  # Not picked up before this time (retry backoff)
+    lease_owner = Column(String(100))  # Worker currently holding the job
+    lease_expires_at = Column(DateTime)  # Job is requeued if the lease is not renewed
 
     # Timestamps
     started_at = Column(DateTime)
@@ -216,10 +242,117 @@ class ImportJob(Base):
 
     __table_args__ = (
         Index("idx_import_jobs_status", "status"),
+        Index("idx_import_jobs_queue", "status", "available_at"),
         Index("idx_import_jobs_created", "created_at", postgresql_using="btree"),
     )
 
 
+class ImportJobEvent(Base):
+    """
+    Append-only event stream of an import job (log lines, stage changes, progress, status).
+
+    The autoincrement id is the stream offset: readers fetch the events after
+    the last id they saw (SSE Last-Event-ID), so an append is one INSERT and a
+    read never touches earlier events.
+    """
+    __tablename__ = "import_job_events"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(Integer, ForeignKey("import_jobs.id", ondelete="CASCADE"), nullable=False)
+    event = Column(String(20), nullable=False)  # log, stage, progress, status
+    data = Column(Text, nullable=False)  # JSON payload
+    created_at = Column(DateTime, default=datetime.now)
+
+    __table_args__ = (
+        Index("idx_import_job_events_job", "job_id", "id"),
+    )
+
+
+class ImportedFile(Base):
+    """Content hash of every successfully imported file (re-uploads are skipped)"""
+    __tablename__ = "imported_files"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    sha256 = Column(String(64), nullable=False, unique=True)
+    filename = Column(String(255), nullable=False)
+    institution_code = Column(String(50))
+    import_job_id = Column(Integer, ForeignKey("import_jobs.id", ondelete="SET NULL"))
+    imported_at = Column(DateTime, default=datetime.now)
+
+
+class DuplicateCandidate(Base):
+    """Two transactions that look like the same payment exported with different text"""
+    __tablename__ = "duplicate_candidates"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    original_id = Column(Integer, ForeignKey("transactions.id", ondelete="CASCADE"), nullable=False)  # Kept (imported first)
+    duplicate_id = Column(Integer, ForeignKey("transactions.id", ondelete="SET NULL"))  # NULL once merged (row deleted)
+    duplicate_transaction_id = Column(String(50), nullable=False)  # Hash ID of the duplicate; merged ones are skipped on re-import
+    similarity = Column(Numeric(5, 4))  # Text similarity 0-1
+    status = Column(String(20), nullable=False, default="pending")  # pending, dismissed, merged
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    # Relationships
+    original = relationship("Transaction", foreign_keys=[original_id])
+    duplicate = relationship("Transaction", foreign_keys=[duplicate_id])
+
+    __table_args__ = (
+        Index("idx_duplicate_candidates_pair", "original_id", "duplicate_id", unique=True),
+        Index("idx_duplicate_candidates_duplicate", "duplicate_id"),
+        Index("idx_duplicate_candidates_duplicate_txn", "duplicate_transaction_id"),
+        Index("idx_duplicate_candidates_status", "status"),
+    )
+
+
+class RecurringPayment(Base):
+    """Recurring payment (subscription, rent, salary) found by the recurring payment detector"""
+    __tablename__ = "recurring_payments"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    group_key = Column(String(150), nullable=False)  # Transaction.recurring_key the series was found in
+    counterparty = Column(String(255))  # Most common counterparty name of the series
+    direction = Column(String(10))  # expense, income
+    currency = Column(String(3))
+
+    # Amount (median of the series, signed) and its range, in cents like Transaction.amount
+    amount = Column(MinorUnits())
+    amount_czk = Column(MinorUnits())
+    amount_min = Column(MinorUnits())
+    amount_max = Column(MinorUnits())
+
+    # Periodicity
+    period = Column(String(20))  # weekly, biweekly, monthly, quarterly, semiannual, yearly
+    interval_days = Column(Numeric(7, 2))  # Median days between payments
+    occurrences = Column(Integer)
+    confidence = Column(Numeric(4, 3))  # 0-1: regularity of the intervals and length of the series
+    first_date = Column(DateTime)
+    last_date = Column(DateTime)
+    next_expected_date = Column(DateTime)
+    is_active = Column(Boolean, default=True)  # Last payment not overdue by more than half a period
+
+    # Of the latest payment
+    account_id = Column(Integer, ForeignKey("accounts.id"))
+    last_transaction_id = Column(Integer, ForeignKey("transactions.id", ondelete="SET NULL"))
+    category_tier1 = Column(String(100))
+    category_tier2 = Column(String(100))
+    category_tier3 = Column(String(100))
+
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("idx_recurring_payments_group", "group_key"),
+        Index("idx_recurring_payments_active", "is_active", "direction"),
+    )
+
+
+class CacheGeneration(Base):
+    """Change counter per group of tables that processes cache in memory (bumped by SQLite triggers)"""
+    __tablename__ = "cache_generations"
+
+    name = Column(String(50), primary_key=True)
+    generation = Column(Integer, nullable=False, default=0)
+
+
 class SyncLog(Base):
     """Track Google Sheets sync operations"""
     __tablename__ = "sync_log"
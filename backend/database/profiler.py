@@ -0,0 +1,279 @@
+"""
+SQL profiler: slow query log and per-request query summaries.
+
+Hooked on the engine's cursor execute events. Every statement is timed;
+statements slower than slow_query_ms are logged with their row count, the
+project function that issued them and SQLite's EXPLAIN QUERY PLAN.
+
+A request sent with the header `X-SQL-Profile: 1` (or `?sql_profile=1`)
+records all of its statements and gets the summary back in response
+headers:
+
+    X-SQL-Profile: {"queries": 54, "db_ms": 12.8, "n_plus_one": [{"statement": "SELECT accounts... WHERE accounts.id = ?",
+                    "count": 50, "caller": "backend/api/transactions.py:get_transactions:84"}], ...}
+    Server-Timing: db;dur=12.8;desc="54 queries"
+
+A SELECT run n_plus_one_threshold times or more from the same place is
+reported as an N+1 pattern (typically a lazy relationship load in a loop).
+
+Settings: settings.yaml -> database.profiler
+"""
+import json
+import logging
+import re
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+from urllib.parse import parse_qs
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILER_SETTINGS: Dict[str, Any] = {
+    "slow_query_ms": 200,          # Log statements slower than this (0 disables the slow query log)
+    "explain_slow_queries": True,  # Add EXPLAIN QUERY PLAN to slow query log entries (SQLite)
+    "request_profiling": True,     # Honour X-SQL-Profile / ?sql_profile=1
+    "n_plus_one_threshold": 5,     # Same SELECT from the same caller this many times = N+1
+}
+
+PROFILE_HEADER = "x-sql-profile"
+PROFILE_QUERY_PARAM = "sql_profile"
+_PROFILE_HEADER_BYTES = PROFILE_HEADER.encode()
+
+_PROJECT_ROOT = str(Path(__file__).resolve().parents[2])
+_SKIPPED_FILES = (str(Path(__file__).resolve()), str(Path(__file__).resolve().parent / "connection.py"))
+_PLACEHOLDER_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+_WHITESPACE = re.compile(r"\s+")
+
+_settings: Dict[str, Any] = dict(DEFAULT_PROFILER_SETTINGS)
+
+
+class QueryRecord:
+    """One executed statement"""
+    __slots__ = ("statement", "duration", "rows", "caller")
+
+    def __init__(self, statement: str, duration: float, rows: Optional[int], caller: str):
+        self.statement = statement
+        self.duration = duration
+        self.rows = rows
+        self.caller = caller
+
+
+class RequestProfile:
+    """Statements executed while handling one profiled request"""
+
+    def __init__(self):
+        self.queries: List[QueryRecord] = []
+
+    def summary(self, n_plus_one_threshold: int = 5, top: int = 5) -> Dict[str, Any]:
+        """Query count, total DB time, slowest statements and N+1 patterns"""
+        patterns = Counter(
+            (normalize_statement(query.statement), query.caller)
+            for query in self.queries
+            if query.statement.lstrip()[:6].lower() == "select"
+        )
+        n_plus_one = [
+            {"statement": _shorten(statement), "count": count, "caller": caller}
+            for (statement, caller), count in patterns.most_common()
+            if count >= n_plus_one_threshold
+        ]
+        slowest = sorted(self.queries, key=lambda query: query.duration, reverse=True)[:top]
+
+        return {
+            "queries": len(self.queries),
+            "db_ms": round(sum(query.duration for query in self.queries) * 1000, 2),
+            "n_plus_one": n_plus_one[:top],
+            "slowest": [
+                {
+                    "statement": _shorten(query.statement),
+                    "ms": round(query.duration * 1000, 2),
+                    "rows": query.rows,
+                    "caller": query.caller
+                }
+                for query in slowest
+            ]
+        }
+
+
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("sql_profile", default=None)
+
+
+def normalize_statement(statement: str) -> str:
+    """Statement with whitespace collapsed and IN (?, ?, ...) lists folded"""
+    return _PLACEHOLDER_LIST.sub("?...", _WHITESPACE.sub(" ", statement.strip()))
+
+
+def _shorten(statement: str, length: int = 300) -> str:
+    statement = normalize_statement(statement)
+    return statement if len(statement) <= length else statement[:length] + "..."
+
+
+def find_caller() -> str:
+    """path:function:line of the innermost project frame outside the database layer"""
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_PROJECT_ROOT) and "site-packages" not in filename and filename not in _SKIPPED_FILES:
+            relative = filename[len(_PROJECT_ROOT):].lstrip("/\\").replace("\\", "/")
+            return f"{relative}:{frame.f_code.co_name}:{frame.f_lineno}"
+        frame = frame.f_back
+    return "unknown"
+
+
+def _explain(cursor, statement: str, parameters) -> Optional[str]:
+    """EXPLAIN QUERY PLAN of a statement, on a separate cursor of the same connection"""
+    try:
+        explain_cursor = cursor.connection.cursor()
+        try:
+            explain_cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters or ())
+            return "; ".join(str(row[-1]) for row in explain_cursor.fetchall())
+        finally:
+            explain_cursor.close()
+    except Exception as e:
+        return f"unavailable ({e})"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("profiler_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("profiler_start")
+    if not starts:
+        return
+    duration = time.perf_counter() - starts.pop()
+
+    profile = _current_profile.get()
+    slow_ms = _settings["slow_query_ms"]
+    is_slow = bool(slow_ms) and duration * 1000 >= slow_ms
+    if profile is None and not is_slow:
+        return
+
+    # SQLite reports -1 for SELECT (rows are only known once fetched)
+    rows = cursor.rowcount if cursor.rowcount is not None and cursor.rowcount >= 0 else None
+    caller = find_caller()
+
+    if profile is not None:
+        profile.queries.append(QueryRecord(statement, duration, rows, caller))
+
+    if is_slow:
+        plan = None
+        if (
+            _settings["explain_slow_queries"]
+            and not executemany
+            and conn.dialect.name == "sqlite"
+            and statement.lstrip()[:6].lower().startswith(("select", "update", "delete", "with"))
+        ):
+            plan = _explain(cursor, statement, parameters)
+        logger.warning(
+            f"Slow query ({duration * 1000:.1f} ms, rows={rows if rows is not None else '?'}) "
+            f"from {caller}: {_shorten(statement, 1000)}"
+            + (f" | plan: {plan}" if plan else "")
+        )
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    starts = conn.info.get("profiler_start") if conn is not None else None
+    if starts:
+        starts.pop()
+
+
+def install_profiler(engine: Engine, settings: Optional[Dict[str, Any]] = None):
+    """
+    Attach the profiler to an engine.
+
+    Args:
+        engine: Engine to profile
+        settings: database.profiler settings (merged over DEFAULT_PROFILER_SETTINGS)
+    """
+    _settings.update({**DEFAULT_PROFILER_SETTINGS, **(settings or {})})
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+@contextmanager
+def profile_queries() -> Iterator[RequestProfile]:
+    """
+    Record the statements executed inside the block (scripts, benchmarks).
+
+        with profile_queries() as profile:
+            repo.get_transactions(...)
+        print(profile.summary())
+    """
+    profile = RequestProfile()
+    token = _current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _current_profile.reset(token)
+
+
+def _wants_profile(scope) -> bool:
+    for name, value in scope.get("headers") or ():
+        if name == _PROFILE_HEADER_BYTES:
+            return value.strip().lower() not in (b"", b"0", b"false")
+
+    query_string = scope.get("query_string") or b""
+    if PROFILE_QUERY_PARAM.encode() in query_string:
+        values = parse_qs(query_string.decode("latin-1")).get(PROFILE_QUERY_PARAM, [])
+        return bool(values) and values[-1].lower() not in ("", "0", "false")
+    return False
+
+
+class SQLProfilerMiddleware:
+    """
+    ASGI middleware profiling the SQL of requests that ask for it.
+
+    The summary is added to the response headers (X-SQL-Profile JSON and
+    Server-Timing) and logged. Requests without the header/flag only pay
+    for the header scan.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _settings["request_profiling"] or not _wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+        token = _current_profile.set(profile)
+        threshold = int(_settings["n_plus_one_threshold"])
+
+        async def send_with_profile(message):
+            if message["type"] == "http.response.start":
+                summary = profile.summary(threshold)
+                headers = list(message.get("headers") or [])
+                headers.append((_PROFILE_HEADER_BYTES, json.dumps(summary, ensure_ascii=True).encode("latin-1")))
+                headers.append((
+                    b"server-timing",
+                    f'db;dur={summary["db_ms"]};desc="{summary["queries"]} queries"'.encode("latin-1")
+                ))
+                message = {**message, "headers": headers}
+
+                logger.info(
+                    f"SQL profile {scope['method']} {scope['path']}: {summary['queries']} queries, "
+                    f"{summary['db_ms']} ms"
+                )
+                for pattern in summary["n_plus_one"]:
+                    logger.warning(
+                        f"Possible N+1 in {scope['method']} {scope['path']}: {pattern['count']}x from "
+                        f"{pattern['caller']}: {pattern['statement']}"
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            _current_profile.reset(token)
@@ -1,10 +1,11 @@
 """Transaction repository for database operations"""
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterable, Set, Tuple
 from datetime import datetime, date
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_, case
+from sqlalchemy import func, and_, or_, case, type_coerce
 
-from backend.database.models import Transaction, Account, Institution, Owner
+from backend.database.models import Transaction, Account, Institution, Owner, DuplicateCandidate
+from backend.database.types import MinorUnits
 
 
 class TransactionRepository:
@@ -21,6 +22,47 @@ class TransactionRepository:
         """Get transaction by transaction_id (TXN_20241015_001)"""
         return self.db.query(Transaction).filter(Transaction.transaction_id == txn_id).first()
 
+    def get_existing_transaction_ids(self, txn_ids: Iterable[str], chunk_size: int = 500) -> Set[str]:
+        """
+        Return which of the given transaction_ids are already stored.
+
+        IDs of near-duplicates merged into another transaction count as
+        stored. One indexed IN query per chunk keeps each statement well
+        below SQLite's bound-parameter limit for large statements.
+        """
+        txn_ids = list(dict.fromkeys(txn_ids))
+        existing = set()
+        for start in range(0, len(txn_ids), chunk_size):
+            chunk = txn_ids[start:start + chunk_size]
+            rows = self.db.query(Transaction.transaction_id).filter(
+                Transaction.transaction_id.in_(chunk)
+            ).all()
+            existing.update(row.transaction_id for row in rows)
+            merged = self.db.query(DuplicateCandidate.duplicate_transaction_id).filter(
+                DuplicateCandidate.duplicate_transaction_id.in_(chunk),
+                DuplicateCandidate.status == "merged"
+            ).all()
+            existing.update(row.duplicate_transaction_id for row in merged)
+        return existing
+
+    def get_date_range(
+        self,
+        txn_ids: Iterable[str],
+        chunk_size: int = 500
+    ) -> Tuple[Optional[datetime], Optional[datetime]]:
+        """First and last date of the given transaction_ids ((None, None) if none is stored)"""
+        txn_ids = list(txn_ids)
+        first = last = None
+        for start in range(0, len(txn_ids), chunk_size):
+            chunk_first, chunk_last = self.db.query(
+                func.min(Transaction.date), func.max(Transaction.date)
+            ).filter(Transaction.transaction_id.in_(txn_ids[start:start + chunk_size])).one()
+            if chunk_first is None:
+                continue
+            first = chunk_first if first is None else min(first, chunk_first)
+            last = chunk_last if last is None else max(last, chunk_last)
+        return first, last
+
     def get_all(
         self,
         skip: int = 0,
@@ -414,7 +456,8 @@ class TransactionRepository:
             Transaction.counterparty_name.label('counterparty'),
             func.sum(Transaction.amount_czk).label('total'),
             func.count(Transaction.id).label('count'),
-            func.avg(Transaction.amount_czk).label('average')
+            # avg() doesn't keep the column type: coerce to get Decimal, not cents
+            type_coerce(func.avg(Transaction.amount_czk), MinorUnits()).label('average')
         )
 
         # Apply filters
@@ -609,7 +652,8 @@ class TransactionRepository:
         query = self.db.query(
             month_label,
             category_field,
-            func.sum(func.abs(Transaction.amount_czk)).label('expenses')
+            # abs() doesn't keep the column type: coerce to get Decimal, not cents
+            type_coerce(func.sum(func.abs(Transaction.amount_czk)), MinorUnits()).label('expenses')
         )
 
         # Apply filters
@@ -0,0 +1,41 @@
+"""Custom column types"""
+from decimal import Decimal, ROUND_HALF_UP
+
+from sqlalchemy import BigInteger
+from sqlalchemy.types import TypeDecorator
+
+
+class MinorUnits(TypeDecorator):
+    """
+    Money amount stored as an integer count of minor units (cents).
+
+    The ORM sees Decimal with `scale` places; the database stores exact
+    integers, so SUM/MIN/MAX in SQL are exact and need no float rounding.
+    Binds accept Decimal, int, float and str (floats go through str, so
+    12.34 is stored as 1234, not 1233). Comparisons with literals are
+    scaled too: `Transaction.amount >= 100` compares against 10000.
+
+    SQL functions that don't return their argument's type (avg, abs) and
+    arithmetic on the column come back as raw minor units; wrap them with
+    `type_coerce(expr, MinorUnits())` to get Decimal amounts.
+    """
+
+    impl = BigInteger
+    cache_ok = True
+
+    def __init__(self, scale: int = 2):
+        super().__init__()
+        self.scale = scale
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        amount = value if isinstance(value, Decimal) else Decimal(str(value))
+        return int(amount.scaleb(self.scale).to_integral_value(ROUND_HALF_UP))
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        # Integers from SUM/MIN/MAX, floats from AVG
+        minor = Decimal(value) if isinstance(value, int) else Decimal(str(value))
+        return minor.scaleb(-self.scale)
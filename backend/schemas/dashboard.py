@@ -54,3 +54,26 @@ class ComparisonResponse(BaseModel):
     previous: PeriodMetrics
     change: PeriodMetrics
     change_percent: dict = Field(description="Percentage changes for each metric")
+
+
+class RecurringPaymentData(BaseModel):
+    """Recurring payment series"""
+    id: int
+    counterparty: Optional[str]
+    direction: str = Field(description="expense or income")
+    currency: str
+    amount: float = Field(description="Median amount of the series (signed)")
+    amount_czk: Optional[float]
+    amount_min: float
+    amount_max: float
+    period: str = Field(description="weekly, biweekly, monthly, quarterly, semiannual or yearly")
+    interval_days: float
+    occurrences: int
+    confidence: float
+    first_date: str
+    last_date: str
+    next_expected_date: str
+    is_active: bool
+    category_tier1: Optional[str]
+    category_tier2: Optional[str]
+    category_tier3: Optional[str]
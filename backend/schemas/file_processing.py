@@ -1,6 +1,6 @@
 """Pydantic schemas for file processing"""
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Any, Optional, List, Dict
 from datetime import datetime
 
 
@@ -17,18 +17,29 @@ class FileProcessingJob(BaseModel):
     id: str
     filename: str
     saved_filename: str
-    institution: str
+    file_hash: Optional[str] = None  # SHA-256 of the uploaded file
+    institution: str  # Institution ID, or 'batch' for multi-file uploads
+    files: List[Dict[str, str]] = []  # Batch uploads: filename, saved_filename, institution
     status: str  # 'pending', 'processing', 'completed', 'failed'
+    stage: Optional[str] = None  # Pipeline stage while processing: parse, dedupe, categorize, write, post_process
     created_at: str
     started_at: Optional[str] = None
     completed_at: Optional[str] = None
     override_existing: bool = False
+    disable_ai_categorization: bool = False
 
     # Processing metrics
     parsed_rows: int = 0
     normalized_rows: int = 0
     inserted_rows: int = 0
     updated_rows: int = 0
+    skipped_rows: int = 0
+    # Stage timings of the last attempt: {"total_seconds": ..., "stages": {stage: {seconds, rows, calls, rows_per_sec}}}
+    timings: Optional[Dict[str, Any]] = None
+
+    # Queue state
+    attempts: int = 0
+    max_attempts: int = 0
 
     # Results
     message: Optional[str] = None
@@ -38,6 +49,34 @@ class FileProcessingJob(BaseModel):
         from_attributes = True
 
 
+class UploadSessionCreate(BaseModel):
+    """Start a chunked upload"""
+    filename: str
+    institution: Optional[str] = None  # Default: detected from the file name
+    size: Optional[int] = None  # Total bytes, checked on complete
+    override_existing: bool = False
+    disable_ai_categorization: bool = False
+
+
+class UploadSession(BaseModel):
+    """State of a chunked upload"""
+    upload_id: str
+    filename: str
+    institution: str
+    size: Optional[int] = None
+    offset: int  # Bytes received; the next chunk is sent at this offset
+    chunk_size: int  # Suggested chunk size in bytes
+    format: Optional[str] = None  # Sniffed from the first chunk: csv, xlsx or xls
+    override_existing: bool = False
+    disable_ai_categorization: bool = False
+    created_at: str
+
+
+class UploadComplete(BaseModel):
+    """Commit a chunked upload"""
+    sha256: Optional[str] = None  # Verified against the received content if given
+
+
 class FileProcessingStatus(BaseModel):
     """Current status of file processing"""
     job_id: str
@@ -49,6 +49,7 @@ class TransactionResponse(TransactionBase):
     transaction_type: Optional[str]
     counterparty_account: Optional[str]
     counterparty_name: Optional[str]
+    transfer_pair_id: Optional[str] = None
     source_file: Optional[str]
     processed_date: datetime
     synced_to_sheets: bool
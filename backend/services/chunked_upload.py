@@ -0,0 +1,375 @@
+"""
+Chunked, resumable uploads of statement files.
+
+A client creates an upload session (POST /files/uploads), sends the file in
+chunks at explicit offsets (PUT /files/uploads/{id}?offset=N) and commits it
+(POST /files/uploads/{id}/complete), which queues the import like
+POST /files/upload. An interrupted upload continues from the offset returned
+by GET /files/uploads/{id} instead of starting over.
+
+A session is a partial file plus a JSON sidecar in data/uploads/partial, so
+it survives restarts and is shared by all API processes; the size of the
+partial file is the session's offset. The SHA-256 and the format of the
+content are computed as chunks arrive, so completing an upload doesn't read
+the file again (a process that didn't receive the earlier chunks rehashes
+the partial file once).
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from backend.services.file_processing import UPLOAD_DIR
+
+logger = logging.getLogger(__name__)
+
+PARTIAL_DIR = UPLOAD_DIR / "partial"
+
+DEFAULT_UPLOAD_SETTINGS: Dict[str, Any] = {
+    "chunk_size_mb": 8,
+    "max_file_mb": 200,
+    "session_hours": 24,
+    "max_archive_members": 100,
+    "max_archive_mb": 500,
+}
+
+# Bytes buffered from the request body before a write is handed to a thread
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+# Statement formats by leading bytes (CSV is anything else without NUL bytes)
+MAGIC_FORMATS = (
+    (b"PK\x03\x04", "xlsx"),
+    (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "xls"),
+)
+SNIFF_BYTES = 64 * 1024
+EXTENSION_FORMATS = {".csv": "csv", ".txt": "csv", ".xlsx": "xlsx", ".xls": "xls"}
+
+_UPLOAD_ID = re.compile(r"[0-9a-f]{32}")
+
+# upload_id -> (bytes hashed, sha256) of the chunks this process received
+_hashers: Dict[str, Tuple[int, Any]] = {}
+_hashers_lock = threading.Lock()
+# One chunk at a time per upload (within this process)
+_chunk_locks: Dict[str, asyncio.Lock] = {}
+
+
+class UploadOffsetError(Exception):
+    """A chunk was sent for an offset other than the upload's current one"""
+
+    def __init__(self, offset: int):
+        super().__init__(f"Upload is at offset {offset}")
+        self.offset = offset
+
+
+def load_upload_settings(settings_path: str = "config/settings.yaml") -> Dict[str, Any]:
+    """Load processing.uploads from settings.yaml merged over the defaults"""
+    settings: Dict[str, Any] = {}
+    path = Path(settings_path)
+    if path.exists():
+        try:
+            import yaml
+            with open(path, 'r', encoding='utf-8') as f:
+                settings = (yaml.safe_load(f) or {}).get('processing', {}).get('uploads', {}) or {}
+        except Exception as e:
+            logger.warning(f"Could not load upload settings from {settings_path}: {e}")
+
+    return {**DEFAULT_UPLOAD_SETTINGS, **settings}
+
+
+def stored_upload_name(original_filename: str, institution: str) -> str:
+    """Unique name of the stored copy of an upload in data/uploads"""
+    # Microseconds: a batch of uploads can land in the same second
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    return f"{institution}_{timestamp}{Path(original_filename).suffix}"
+
+
+def sniff_format(head: bytes) -> Optional[str]:
+    """'xlsx', 'xls' or 'csv' from the first bytes of a file (None if it's neither)"""
+    for magic, file_format in MAGIC_FORMATS:
+        if head.startswith(magic):
+            return file_format
+    return "csv" if b"\x00" not in head[:SNIFF_BYTES] else None
+
+
+def _paths(upload_id: str) -> Tuple[Path, Path]:
+    if not _UPLOAD_ID.fullmatch(upload_id or ""):
+        raise ValueError("Invalid upload id")
+    return PARTIAL_DIR / f"{upload_id}.part", PARTIAL_DIR / f"{upload_id}.json"
+
+
+def _read_session(upload_id: str) -> Optional[Dict[str, Any]]:
+    data_path, meta_path = _paths(upload_id)
+    if not meta_path.exists() or not data_path.exists():
+        return None
+    session = json.loads(meta_path.read_text(encoding="utf-8"))
+    session['offset'] = data_path.stat().st_size
+    return session
+
+
+def _write_session(session: Dict[str, Any]):
+    _, meta_path = _paths(session['upload_id'])
+    stored = {key: value for key, value in session.items() if key != 'offset'}
+    tmp = meta_path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(stored, ensure_ascii=False), encoding="utf-8")
+    tmp.replace(meta_path)
+
+
+def _forget(upload_id: str):
+    with _hashers_lock:
+        _hashers.pop(upload_id, None)
+    _chunk_locks.pop(upload_id, None)
+
+
+def create_upload(
+    filename: str,
+    institution: str,
+    size: Optional[int] = None,
+    override_existing: bool = False,
+    disable_ai_categorization: bool = False
+) -> Dict[str, Any]:
+    """
+    Start an upload session.
+
+    Args:
+        filename: Original file name
+        institution: Institution ID the file is imported as
+        size: Total size in bytes, if known (checked on complete)
+
+    Returns:
+        The session: upload_id, offset (0), chunk_size and the arguments
+    """
+    settings = load_upload_settings()
+    max_bytes = int(float(settings['max_file_mb']) * 1024 * 1024)
+    if size is not None and (size < 0 or size > max_bytes):
+        raise ValueError(f"File size must be between 0 and {settings['max_file_mb']} MB")
+    if Path(filename).suffix.lower() not in EXTENSION_FORMATS:
+        raise ValueError(f"Unsupported file type '{Path(filename).suffix}' (CSV or XLSX expected)")
+
+    purge_expired_uploads(float(settings['session_hours']))
+    PARTIAL_DIR.mkdir(parents=True, exist_ok=True)
+
+    upload_id = uuid.uuid4().hex
+    data_path, _ = _paths(upload_id)
+    data_path.touch()
+    session = {
+        'upload_id': upload_id,
+        'filename': Path(filename).name,
+        'institution': institution,
+        'size': size,
+        'override_existing': override_existing,
+        'disable_ai_categorization': disable_ai_categorization,
+        'format': None,
+        'created_at': datetime.now().isoformat(),
+        'chunk_size': int(float(settings['chunk_size_mb']) * 1024 * 1024),
+    }
+    _write_session(session)
+    logger.info(f"Started upload {upload_id}: {session['filename']} ({institution}, {size} bytes)")
+    return {**session, 'offset': 0}
+
+
+def get_upload(upload_id: str) -> Optional[Dict[str, Any]]:
+    """Session of an upload with its current offset (None if it doesn't exist)"""
+    return _read_session(upload_id)
+
+
+def _hasher(upload_id: str, data_path: Path, offset: int):
+    """SHA-256 of the first `offset` bytes, continued from this process's state if it has it"""
+    with _hashers_lock:
+        hashed, sha256 = _hashers.get(upload_id, (None, None))
+    if hashed == offset:
+        return sha256
+
+    sha256 = hashlib.sha256()
+    with open(data_path, "rb") as f:
+        remaining = offset
+        while remaining:
+            block = f.read(min(WRITE_BUFFER_SIZE, remaining))
+            if not block:
+                break
+            sha256.update(block)
+            remaining -= len(block)
+    return sha256
+
+
+def _append(data_path: Path, sha256, data: bytes):
+    with open(data_path, "ab") as f:
+        f.write(data)
+    sha256.update(data)
+
+
+async def append_chunk(upload_id: str, offset: int, body: AsyncIterator[bytes]) -> Dict[str, Any]:
+    """
+    Append the bytes of a request body at `offset`.
+
+    File writes and hashing run in the thread pool, a megabyte at a time, so
+    the event loop keeps serving while a chunk streams in. If the connection
+    drops mid-chunk the bytes received so far stay appended and the client
+    resumes from the new offset.
+
+    Raises:
+        UploadOffsetError: offset isn't the upload's current offset
+        ValueError: the first SNIFF_BYTES aren't a CSV/XLSX file, or the upload grew over max_file_mb
+
+    Returns:
+        The session with its new offset (None if the upload doesn't exist)
+    """
+    lock = _chunk_locks.setdefault(upload_id, asyncio.Lock())
+    async with lock:
+        session = await run_in_threadpool(_read_session, upload_id)
+        if session is None:
+            return None
+        if offset != session['offset']:
+            raise UploadOffsetError(session['offset'])
+
+        data_path, _ = _paths(upload_id)
+        max_bytes = int(float(load_upload_settings()['max_file_mb']) * 1024 * 1024)
+        sha256 = await run_in_threadpool(_hasher, upload_id, data_path, offset)
+        position = offset
+        buffer = bytearray()
+
+        async def flush():
+            nonlocal position
+            if not buffer:
+                return
+            if session['format'] is None and position + len(buffer) >= SNIFF_BYTES:
+                # Earlier chunks may have been smaller than the sniffed head
+                head = await run_in_threadpool(_read_head, data_path, position)
+                await _check_format(session, head + bytes(buffer[:SNIFF_BYTES - len(head)]))
+            data = bytes(buffer)
+            buffer.clear()
+            await run_in_threadpool(_append, data_path, sha256, data)
+            position += len(data)
+            with _hashers_lock:
+                _hashers[upload_id] = (position, sha256)
+
+        try:
+            async for piece in body:
+                if position + len(buffer) + len(piece) > max_bytes:
+                    raise ValueError(f"Upload exceeds the maximum size of {load_upload_settings()['max_file_mb']} MB")
+                buffer.extend(piece)
+                if len(buffer) >= WRITE_BUFFER_SIZE:
+                    await flush()
+            await flush()
+        except ValueError:
+            # Nothing of a rejected chunk is kept
+            buffer.clear()
+            await run_in_threadpool(_truncate, data_path, offset)
+            with _hashers_lock:
+                _hashers.pop(upload_id, None)
+            raise
+        except Exception:
+            # Client disconnected: the bytes received so far are kept
+            try:
+                await flush()
+            except ValueError:
+                await run_in_threadpool(_truncate, data_path, offset)
+                with _hashers_lock:
+                    _hashers.pop(upload_id, None)
+            raise
+
+        return {**session, 'offset': position}
+
+
+def _truncate(data_path: Path, size: int):
+    with open(data_path, "r+b") as f:
+        f.truncate(size)
+
+
+def _read_head(data_path: Path, size: int) -> bytes:
+    """First min(size, SNIFF_BYTES) bytes of a partial upload"""
+    with open(data_path, "rb") as f:
+        return f.read(min(size, SNIFF_BYTES))
+
+
+def _classify(session: Dict[str, Any], head: bytes) -> str:
+    """Format of an upload from its first SNIFF_BYTES (or all of it); rejects files that can't be statements"""
+    file_format = sniff_format(head)
+    expected = EXTENSION_FORMATS.get(Path(session['filename']).suffix.lower())
+    if file_format is None:
+        raise ValueError(f"'{session['filename']}' is not a CSV or XLSX file")
+    if file_format != expected:
+        raise ValueError(f"'{session['filename']}' has {file_format.upper()} content but a {expected.upper()} extension")
+    return file_format
+
+
+async def _check_format(session: Dict[str, Any], head: bytes):
+    """Sniff the format once SNIFF_BYTES have arrived and store it in the session"""
+    session['format'] = _classify(session, head)
+    await run_in_threadpool(_write_session, session)
+
+
+def complete_upload(upload_id: str, sha256: Optional[str] = None) -> Optional[Tuple[Dict[str, Any], str, str]]:
+    """
+    Finish an upload: move the file to data/uploads under a unique name.
+
+    Args:
+        sha256: Hex SHA-256 the client computed (optional, verified if given)
+
+    Raises:
+        ValueError: size or checksum don't match, the file is empty, or a file shorter
+            than SNIFF_BYTES isn't a CSV/XLSX file
+
+    Returns:
+        (session, stored file name, hex SHA-256), None if the upload doesn't exist
+    """
+    session = _read_session(upload_id)
+    if session is None:
+        return None
+    if session['size'] is not None and session['offset'] != session['size']:
+        raise ValueError(f"Upload incomplete: {session['offset']} of {session['size']} bytes received")
+    if session['offset'] == 0:
+        raise ValueError("Upload is empty")
+
+    data_path, meta_path = _paths(upload_id)
+    if session['format'] is None:
+        # Shorter than SNIFF_BYTES: the whole file is the head
+        session['format'] = _classify(session, _read_head(data_path, session['offset']))
+    file_hash = _hasher(upload_id, data_path, session['offset']).hexdigest()
+    if sha256 and sha256.lower() != file_hash:
+        raise ValueError(f"Checksum mismatch: received content has SHA-256 {file_hash}")
+
+    saved_filename = stored_upload_name(session['filename'], session['institution'])
+    data_path.replace(UPLOAD_DIR / saved_filename)
+    meta_path.unlink(missing_ok=True)
+    _forget(upload_id)
+    logger.info(f"Completed upload {upload_id}: {session['filename']} -> {saved_filename} ({session['offset']} bytes)")
+    return session, saved_filename, file_hash
+
+
+def abort_upload(upload_id: str) -> bool:
+    """Delete an upload session and its data (False if it doesn't exist)"""
+    data_path, meta_path = _paths(upload_id)
+    existed = meta_path.exists()
+    data_path.unlink(missing_ok=True)
+    meta_path.unlink(missing_ok=True)
+    _forget(upload_id)
+    return existed
+
+
+def purge_expired_uploads(session_hours: float) -> int:
+    """Delete upload sessions not written to for session_hours"""
+    if not PARTIAL_DIR.exists():
+        return 0
+
+    cutoff = time.time() - session_hours * 3600
+    purged = 0
+    for meta_path in PARTIAL_DIR.glob("*.json"):
+        data_path = meta_path.with_suffix(".part")
+        last_write = max(path.stat().st_mtime for path in (meta_path, data_path) if path.exists())
+        if last_write < cutoff:
+            data_path.unlink(missing_ok=True)
+            meta_path.unlink(missing_ok=True)
+            _forget(meta_path.stem)
+            purged += 1
+    if purged:
+        logger.info(f"Purged {purged} expired upload session(s)")
+    return purged
@@ -0,0 +1,337 @@
+"""
+Near-duplicate detection - the same payment imported twice under different IDs.
+
+transaction_id is a hash of date, amount, account, description and the
+optional text fields, so when a bank changes the wording between two
+exports (trimmed description, added note, counterparty spelled
+differently) an overlapping export creates a second transaction.
+
+Candidates are blocked by (account, currency, amount); within a block rows
+are sorted by date and only rows at most date_window_days apart are
+compared, so the whole history is scanned in near-linear time. A pair is a
+candidate when:
+
+- the rows come from different files (one export never repeats a row)
+- variable symbols, when both rows have one, are equal
+- the normalized text (description, counterparty, note) is at least
+  min_similarity alike (text_similarity)
+
+Candidates are stored in duplicate_candidates for review; with auto_merge
+enabled, same-day candidates of at least auto_merge_similarity are merged
+right away. A merge keeps the transaction imported first and remembers the
+other one's transaction_id, so it isn't imported again.
+
+Settings: settings.yaml -> processing.duplicate_detection
+"""
+import logging
+import re
+import unicodedata
+from datetime import date, datetime, timedelta
+from difflib import SequenceMatcher
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from backend.database.models import DuplicateCandidate, Transaction
+from backend.database.repositories.transaction_repo import TransactionRepository
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DUPLICATE_SETTINGS: Dict[str, Any] = {
+    "enabled": True,
+    "date_window_days": 3,
+    "min_similarity": 0.8,
+    "auto_merge": False,
+    "auto_merge_similarity": 0.95,
+}
+
+# Categorization a merge may replace with the duplicate's (rules and manual edits are kept)
+UNCATEGORIZED_SOURCES = (None, "", "uncategorized")
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def normalize_text(*parts: Optional[str]) -> str:
+    """Lowercase, strip accents and punctuation, collapse whitespace"""
+    text = " ".join(part for part in parts if part)
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return _NON_WORD.sub(" ", text).strip()
+
+
+def _token_overlap(tokens_a: frozenset, tokens_b: frozenset) -> float:
+    if not tokens_a or not tokens_b:
+        return 0.0
+    return len(tokens_a & tokens_b) / min(len(tokens_a), len(tokens_b))
+
+
+def text_similarity(a: str, b: str, min_similarity: float = 0.0) -> float:
+    """
+    Similarity of two normalized texts (0-1).
+
+    Mean of the difflib ratio (edits) and the token overlap coefficient, so
+    text a bank appended ("Shop A" -> "SHOP A s.r.o.") scores high while a
+    changed word ("Shop A" -> "Shop B") does not. Pairs that can't reach
+    min_similarity are rejected on cheap upper bounds and score 0.
+    """
+    return _similarity(a, frozenset(a.split()), b, frozenset(b.split()), min_similarity)
+
+
+def _similarity(a: str, tokens_a: frozenset, b: str, tokens_b: frozenset, min_similarity: float) -> float:
+    if a == b:
+        return 1.0
+    overlap = _token_overlap(tokens_a, tokens_b)
+    if (1 + overlap) / 2 < min_similarity:
+        return 0.0
+    matcher = SequenceMatcher(None, a, b, autojunk=False)
+    if (matcher.real_quick_ratio() + overlap) / 2 < min_similarity or (matcher.quick_ratio() + overlap) / 2 < min_similarity:
+        return 0.0
+    return (matcher.ratio() + overlap) / 2
+
+
+class DuplicateRow:
+    """The fields of a transaction that duplicate detection looks at"""
+    __slots__ = ("id", "transaction_id", "block", "day", "source_file", "variable_symbol", "text", "tokens")
+
+    def __init__(self, id: int, transaction_id: str, block: Tuple, day: int,
+                 source_file: Optional[str], variable_symbol: Optional[str], text: str):
+        self.id = id
+        self.transaction_id = transaction_id
+        self.block = block  # (account_id, currency, amount)
+        self.day = day  # date.toordinal()
+        self.source_file = source_file
+        self.variable_symbol = variable_symbol
+        self.text = text
+        self.tokens = frozenset(text.split())
+
+    @classmethod
+    def from_row(cls, row) -> "DuplicateRow":
+        return cls(
+            id=row.id,
+            transaction_id=row.transaction_id,
+            block=(row.account_id, row.currency, str(row.amount)),
+            day=row.date.toordinal(),
+            source_file=row.source_file,
+            variable_symbol=row.variable_symbol or None,
+            text=normalize_text(row.description, row.counterparty_name, row.note)
+        )
+
+
+def load_duplicate_settings() -> Dict[str, Any]:
+    """processing.duplicate_detection from settings.yaml merged over the defaults"""
+    from backend.services.pipeline_context import get_pipeline_context
+
+    processing = get_pipeline_context().settings().get('processing') or {}
+    return {**DEFAULT_DUPLICATE_SETTINGS, **(processing.get('duplicate_detection') or {})}
+
+
+def find_near_duplicates(
+    rows: Iterable[DuplicateRow],
+    settings: Dict[str, Any],
+    new_ids: Optional[Set[str]] = None
+) -> List[Tuple[DuplicateRow, DuplicateRow, float]]:
+    """
+    Find near-duplicate pairs.
+
+    Args:
+        rows: Rows to compare
+        settings: Detection settings
+        new_ids: If given, only pairs with at least one of these transaction_ids are reported
+
+    Returns:
+        (original, duplicate, similarity), original being the row imported
+        first; each duplicate is reported once, with its most similar original
+    """
+    window = int(settings['date_window_days'])
+    min_similarity = float(settings['min_similarity'])
+
+    blocks: Dict[Tuple, List[DuplicateRow]] = {}
+    for row in rows:
+        blocks.setdefault(row.block, []).append(row)
+
+    best: Dict[int, Tuple[float, DuplicateRow, DuplicateRow]] = {}
+    for block_rows in blocks.values():
+        if len(block_rows) < 2:
+            continue
+        if new_ids is not None and not any(row.transaction_id in new_ids for row in block_rows):
+            continue
+        block_rows.sort(key=lambda row: (row.day, row.id))
+
+        for i, first in enumerate(block_rows):
+            for second in block_rows[i + 1:]:
+                if second.day - first.day > window:
+                    break
+                if first.source_file and first.source_file == second.source_file:
+                    continue
+                if first.variable_symbol and second.variable_symbol and first.variable_symbol != second.variable_symbol:
+                    continue
+                if new_ids is not None and first.transaction_id not in new_ids and second.transaction_id not in new_ids:
+                    continue
+
+                similarity = _similarity(first.text, first.tokens, second.text, second.tokens, min_similarity)
+                if similarity < min_similarity:
+                    continue
+
+                original, duplicate = (first, second) if first.id < second.id else (second, first)
+                current = best.get(duplicate.id)
+                if current is None or similarity > current[0]:
+                    best[duplicate.id] = (similarity, original, duplicate)
+
+    return [(original, duplicate, similarity) for similarity, original, duplicate in best.values()]
+
+
+def merge_duplicate(db: Session, candidate: DuplicateCandidate):
+    """
+    Delete the duplicate of a candidate, keeping the original.
+
+    The original takes over the duplicate's category if it is uncategorized
+    itself, and its transfer pair if it has none. The candidate is kept as
+    "merged" with the duplicate's transaction_id, so later imports of the
+    same export text skip it. Not committed.
+    """
+    original = candidate.original
+    duplicate = candidate.duplicate
+
+    if original.categorization_source in UNCATEGORIZED_SOURCES and duplicate.categorization_source not in UNCATEGORIZED_SOURCES:
+        original.category_tier1 = duplicate.category_tier1
+        original.category_tier2 = duplicate.category_tier2
+        original.category_tier3 = duplicate.category_tier3
+        original.categorization_source = duplicate.categorization_source
+        original.ai_confidence = duplicate.ai_confidence
+        original.is_internal_transfer = duplicate.is_internal_transfer
+        if duplicate.owner_id:
+            original.owner_id = duplicate.owner_id
+
+    if duplicate.transfer_pair_id and not original.transfer_pair_id:
+        original.transfer_pair_id = duplicate.transfer_pair_id
+        original.is_internal_transfer = True
+
+    if duplicate.note and not original.note:
+        original.note = duplicate.note
+
+    # Other candidates of the deleted row go away; this one records the merge
+    # (SQLite doesn't enforce the foreign keys)
+    db.query(DuplicateCandidate).filter(
+        DuplicateCandidate.id != candidate.id,
+        or_(
+            DuplicateCandidate.original_id == duplicate.id,
+            DuplicateCandidate.duplicate_id == duplicate.id
+        )
+    ).delete(synchronize_session=False)
+    candidate.status = "merged"
+    candidate.duplicate_id = None
+    db.delete(duplicate)
+
+
+def detect_duplicates(
+    db: Session,
+    from_date: Optional[date] = None,
+    to_date: Optional[date] = None,
+    transaction_ids: Optional[List[str]] = None,
+    settings: Optional[Dict[str, Any]] = None
+) -> Dict[str, int]:
+    """
+    Find near-duplicates dated between from_date and to_date and store new candidates.
+
+    Args:
+        db: Database session (committed on success)
+        from_date: First date to consider (None = no limit)
+        to_date: Last date to consider (None = no limit)
+        transaction_ids: If given, only candidates involving these transaction_ids
+        settings: Detection settings (default: settings.yaml)
+
+    Returns:
+        Stats: scanned, found, new, merged
+    """
+    settings = settings or load_duplicate_settings()
+    stats = {"scanned": 0, "found": 0, "new": 0, "merged": 0}
+    if not settings['enabled']:
+        return stats
+
+    query = db.query(
+        Transaction.id, Transaction.transaction_id, Transaction.account_id, Transaction.currency,
+        Transaction.amount, Transaction.date, Transaction.source_file, Transaction.variable_symbol,
+        Transaction.description, Transaction.counterparty_name, Transaction.note
+    )
+    if from_date:
+        query = query.filter(Transaction.date >= datetime.combine(from_date, datetime.min.time()))
+    if to_date:
+        query = query.filter(Transaction.date < datetime.combine(to_date + timedelta(days=1), datetime.min.time()))
+
+    rows = [DuplicateRow.from_row(row) for row in query]
+    stats["scanned"] = len(rows)
+
+    new_ids = set(transaction_ids) if transaction_ids is not None else None
+    found = find_near_duplicates(rows, settings, new_ids)
+    stats["found"] = len(found)
+    if not found:
+        return stats
+
+    # Skip pairs already stored (pending or dismissed)
+    duplicate_ids = [duplicate.id for _, duplicate, _ in found]
+    known = set()
+    for start in range(0, len(duplicate_ids), 500):
+        known.update(
+            db.query(DuplicateCandidate.original_id, DuplicateCandidate.duplicate_id).filter(
+                DuplicateCandidate.duplicate_id.in_(duplicate_ids[start:start + 500])
+            ).all()
+        )
+
+    auto_merge = bool(settings['auto_merge'])
+    auto_merge_similarity = float(settings['auto_merge_similarity'])
+    to_merge = []
+    for original, duplicate, similarity in found:
+        if (original.id, duplicate.id) in known:
+            continue
+        candidate = DuplicateCandidate(
+            original_id=original.id,
+            duplicate_id=duplicate.id,
+            duplicate_transaction_id=duplicate.transaction_id,
+            similarity=round(similarity, 4),
+            status="pending"
+        )
+        db.add(candidate)
+        stats["new"] += 1
+        if auto_merge and original.day == duplicate.day and similarity >= auto_merge_similarity:
+            to_merge.append(candidate)
+
+    db.flush()
+    merged = set()
+    for candidate in to_merge:
+        # A row can't be merged away twice, nor kept after being merged away
+        if candidate.original_id in merged or candidate.duplicate_id in merged:
+            continue
+        merged.add(candidate.duplicate_id)
+        merge_duplicate(db, candidate)
+    stats["merged"] = len(merged)
+
+    db.commit()
+    logger.info(
+        f"Duplicate detection: {stats['found']} near-duplicates among {len(rows)} transactions "
+        f"({stats['new']} new, {stats['merged']} merged)"
+    )
+    return stats
+
+
+def detect_duplicates_for_import(db: Session, transaction_ids: List[str]) -> Dict[str, int]:
+    """
+    Incremental detection after an import.
+
+    Only the imported transactions' date range, widened by the date window,
+    is scanned, and only pairs involving an imported transaction are stored.
+
+    Args:
+        db: Database session
+        transaction_ids: transaction_id values written by the import
+    """
+    settings = load_duplicate_settings()
+    if not settings['enabled'] or not transaction_ids:
+        return {"scanned": 0, "found": 0, "new": 0, "merged": 0}
+
+    first, last = TransactionRepository(db).get_date_range(transaction_ids)
+    if first is None:
+        return {"scanned": 0, "found": 0, "new": 0, "merged": 0}
+
+    window = timedelta(days=int(settings['date_window_days']))
+    return detect_duplicates(db, (first - window).date(), (last + window).date(), transaction_ids, settings)
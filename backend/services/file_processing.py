@@ -0,0 +1,559 @@
+"""
+File import pipeline run by the import workers.
+
+Parse -> normalize -> categorize -> write to SQLite for one queued ImportJob.
+Runs inside a worker process, so all job state is read from and written to
+the import_jobs table rather than shared memory.
+"""
+import fnmatch
+import json
+import logging
+import time
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.database.connection import get_db_context
+from backend.database.models import ImportJob
+from backend.services.import_worker import load_worker_settings
+from backend.services.job_queue import JobProgress, append_job_log, record_imported_files, update_job
+from backend.services.pipeline_context import get_pipeline_context
+from src.utils.timing import StageTimer, collect_timings, current_timer, span, timed
+
+logger = logging.getLogger(__name__)
+
+# Storage paths
+UPLOAD_DIR = Path("data/uploads")
+
+
+class ImportIncompleteError(Exception):
+    """
+    Some rows of an import could not be normalized or written.
+
+    The rows that were written are kept (and post-processed), but the file
+    hash is not recorded, so the same file can be uploaded again once the
+    cause (e.g. an account of an unknown institution) is fixed. Not retried:
+    the same rows would fail again.
+    """
+    retryable = False
+
+
+def log_to_job(job_id: int, message: str, level: str = "INFO"):
+    """Add a log message to the job's processing log"""
+    append_job_log(job_id, message, level)
+
+
+def detect_institution(filename: str) -> Optional[str]:
+    """
+    Detect the institution of a file from file_detection.filename_patterns.
+
+    Args:
+        filename: Original file name (directories are ignored)
+
+    Returns:
+        Institution ID, or None if no pattern matches
+    """
+    name = Path(filename).name.lower()
+
+    for institution, patterns in get_pipeline_context().filename_patterns():
+        if any(fnmatch.fnmatch(name, pattern.lower()) for pattern in patterns):
+            return institution
+
+    return None
+
+
+def parse_and_normalize(file_path: str, original_filename: str, institution: str) -> Tuple[int, list, Dict[str, Any]]:
+    """
+    Parse and normalize one file.
+
+    Module-level so batch imports can run it in child processes. Configs,
+    the currency converter and the normalizer come from the process-wide
+    pipeline context, so only the first file of a process builds them.
+    Stage timings are collected here and returned, since a child process
+    can't add them to the job's timer.
+
+    Returns:
+        (number of parsed rows, normalized Transaction objects, stage timings)
+    """
+    from src.core.parser import FileParser
+
+    with collect_timings() as timer:
+        context = get_pipeline_context()
+        with span("pipeline_setup"):
+            parser = FileParser(context.institution_config(institution))
+        raw_data = parser.parse_file(file_path, original_filename=original_filename)
+
+        with span("pipeline_setup"):
+            normalizer = context.normalizer(institution)
+        # source_file is just for metadata in the transaction, use the saved file path
+        transactions = normalizer.normalize_transactions(raw_data, file_path)
+
+    return len(raw_data), transactions, timer.to_dict()
+
+
+@timed("categorize", rows=lambda job_id, transactions, *args: len(transactions))
+def _categorize(job_id: int, transactions: list, disable_ai: bool, progress: Optional[JobProgress] = None):
+    """Categorize transactions in place"""
+    from src.utils.logger import get_logger, log_row
+
+    categorizer = get_pipeline_context().categorizer()
+    app_logger = get_logger()
+
+    ai_status = "DISABLED" if disable_ai else "ENABLED"
+    log_to_job(job_id, f"Categorizing transactions (AI: {ai_status})...")
+    app_logger.info(f"===== Starting categorization of {len(transactions)} transactions (AI: {ai_status}) =====")
+
+    total = len(transactions)
+    for idx, txn in enumerate(transactions):
+        txn_dict = txn.to_dict()
+        tier1, tier2, tier3, owner, is_internal, source, confidence = categorizer.categorize(
+            txn_dict,
+            disable_ai=disable_ai
+        )
+        log_row(app_logger, idx, total, "desc=%s, counterparty=%s -> %s > %s > %s, internal=%s, source=%s",
+                txn_dict.get('description'), txn_dict.get('counterparty_name'), tier1, tier2, tier3, is_internal, source)
+        if progress:
+            progress.update(categorized=idx + 1)
+        txn.category_tier1 = tier1
+        txn.category_tier2 = tier2
+        txn.category_tier3 = tier3
+        txn.is_internal_transfer = is_internal
+        if owner and owner != 'Unknown':
+            txn.owner = owner
+        txn.categorization_source = source
+        if confidence:
+            txn.ai_confidence = confidence
+    app_logger.info(f"===== Completed categorization of {len(transactions)} transactions =====")
+    log_to_job(job_id, "✓ Categorization complete")
+
+
+@timed("dedupe", rows=lambda job_id, transactions, *args: len(transactions))
+def _dedupe_before_categorization(
+    job_id: int,
+    transactions: list,
+    override_existing: bool
+) -> Tuple[list, int]:
+    """
+    Drop rows the writer would skip, before they reach the categorizer.
+
+    In append mode, transactions whose transaction_id is already stored (one
+    IN query per chunk) and ids repeated within the input are removed, so
+    overlapping exports don't spend categorizer (and AI) time on rows that
+    are thrown away at write time. Overwrite mode updates existing rows, so
+    everything is categorized.
+
+    Returns:
+        (transactions to categorize and write, number of rows skipped)
+    """
+    if override_existing:
+        log_to_job(job_id, f"Overwrite mode: categorizing all {len(transactions)} transactions")
+        return transactions, 0
+
+    from backend.database.repositories.transaction_repo import TransactionRepository
+
+    chunk_size = int(load_worker_settings()['dedupe_chunk_size'])
+    with get_db_context() as db:
+        existing = TransactionRepository(db).get_existing_transaction_ids(
+            (txn.transaction_id for txn in transactions),
+            chunk_size=chunk_size
+        )
+
+    remaining = []
+    seen = set()
+    repeated = 0
+    for txn in transactions:
+        if txn.transaction_id in existing:
+            continue
+        if txn.transaction_id in seen:
+            repeated += 1
+            continue
+        seen.add(txn.transaction_id)
+        remaining.append(txn)
+
+    already_imported = len(transactions) - len(remaining) - repeated
+    log_to_job(
+        job_id,
+        f"✓ Dedupe before categorization: {len(remaining)} new, "
+        f"{already_imported} already in database, {repeated} repeated in file (skipped)"
+    )
+    return remaining, len(transactions) - len(remaining)
+
+
+def _record_write_result(job_id: int, result: dict):
+    """Log database write statistics and store them on the job"""
+    inserted = result.get('added', 0)
+    updated = result.get('updated', 0)
+    skipped = result.get('skipped', 0)
+    failed = result.get('failed', 0)
+    total = result.get('total', 0)
+
+    log_to_job(job_id, f"✓ Database write complete:")
+    log_to_job(job_id, f"  - Inserted: {inserted} new transactions")
+    log_to_job(job_id, f"  - Updated: {updated} existing transactions")
+    if skipped > 0:
+        log_to_job(job_id, f"  - Skipped: {skipped} duplicates")
+    if failed > 0:
+        log_to_job(job_id, f"  - Failed: {failed} transactions could not be imported", "ERROR")
+        for error in result.get('errors') or []:
+            log_to_job(job_id, f"    {error}", "ERROR")
+
+    # Build detailed message
+    msg_parts = []
+    if inserted > 0:
+        msg_parts.append(f"{inserted} new")
+    if updated > 0:
+        msg_parts.append(f"{updated} updated")
+    if skipped > 0:
+        msg_parts.append(f"{skipped} skipped (duplicates)")
+    if failed > 0:
+        msg_parts.append(f"{failed} failed")
+
+    if msg_parts:
+        msg = f"Processed {total} transactions: " + ", ".join(msg_parts)
+    else:
+        msg = "No transactions to process"
+
+    update_job(
+        job_id,
+        new_transactions=inserted,
+        updated_transactions=updated,
+        duplicate_transactions=skipped,
+        message=msg
+    )
+
+
+def _add_normalize_failures(result: dict, parsed_rows: int, normalized: int):
+    """Count parsed rows the normalizer dropped (invalid date or amount) as failed"""
+    dropped = parsed_rows - normalized
+    if dropped > 0:
+        result['failed'] = result.get('failed', 0) + dropped
+        result['errors'] = [f"{dropped} parsed rows could not be normalized (invalid date or amount)"] + \
+            list(result.get('errors') or [])
+
+
+def _finish_import(job_id: int, result: dict, files: List[Dict[str, str]]):
+    """
+    Remember the imported files, or fail the job if any row wasn't imported.
+
+    A recorded hash makes a later upload of the same file a no-op, so it is
+    only stored when every parsed row was inserted, updated or already there.
+    """
+    failed = result.get('failed', 0)
+    if failed:
+        raise ImportIncompleteError(
+            f"{failed} of {result.get('total', 0)} transactions could not be imported (see log); "
+            f"the file can be uploaded again after fixing the cause"
+        )
+    record_imported_files(job_id, files)
+
+
+@timed("duplicate_detection", rows=lambda job_id, transactions, *args: len(transactions))
+def _detect_duplicates(job_id: int, transactions: list):
+    """
+    Look for near-duplicates of the imported transactions.
+
+    Like transfer pairing, a failure is logged on the job but doesn't fail
+    the import.
+    """
+    from backend.services.duplicate_detection import detect_duplicates_for_import
+
+    try:
+        with get_db_context() as db:
+            stats = detect_duplicates_for_import(db, [txn.transaction_id for txn in transactions])
+        if stats['new']:
+            merged = f", {stats['merged']} merged" if stats['merged'] else " (review at /duplicates)"
+            log_to_job(job_id, f"⚠️ Near-duplicates: {stats['new']} possible duplicates{merged}", "WARNING")
+    except Exception as e:
+        logger.warning(f"Duplicate detection failed for job {job_id}: {e}")
+        log_to_job(job_id, f"⚠️ Duplicate detection failed: {str(e)}", "WARNING")
+
+
+@timed("transfer_pairing", rows=lambda job_id, transactions, *args: len(transactions))
+def _pair_transfers(job_id: int, transactions: list):
+    """
+    Pair internal transfer legs around the imported date range.
+
+    Pairing is a follow-up to the write: a failure is logged on the job but
+    doesn't fail the import.
+    """
+    from backend.services.transfer_pairing import pair_transfers_for_import
+
+    try:
+        with get_db_context() as db:
+            stats = pair_transfers_for_import(db, [txn.transaction_id for txn in transactions])
+        if stats['pairs']:
+            log_to_job(
+                job_id,
+                f"✓ Transfer pairing: {stats['pairs']} pairs ({stats['recategorized']} transactions recategorized)"
+            )
+    except Exception as e:
+        logger.warning(f"Transfer pairing failed for job {job_id}: {e}")
+        log_to_job(job_id, f"⚠️ Transfer pairing failed: {str(e)}", "WARNING")
+
+
+@timed("recurring_detection", rows=lambda job_id, transactions, *args: len(transactions))
+def _detect_recurring(job_id: int, transactions: list):
+    """Re-evaluate recurring payments of the counterparties in the import (failure doesn't fail the import)"""
+    from backend.services.recurring_payments import detect_recurring_for_import
+
+    try:
+        with get_db_context() as db:
+            stats = detect_recurring_for_import(db, [txn.transaction_id for txn in transactions])
+        if stats['groups']:
+            log_to_job(job_id, f"✓ Recurring payments: {stats['recurring']} series in {stats['groups']} counterparties checked")
+    except Exception as e:
+        logger.warning(f"Recurring payment detection failed for job {job_id}: {e}")
+        log_to_job(job_id, f"⚠️ Recurring payment detection failed: {str(e)}", "WARNING")
+
+
+def _job_progress(job_id: int) -> JobProgress:
+    return JobProgress(job_id, interval=float(load_worker_settings()['progress_interval']))
+
+
+def _record_timings(job_id: int, timer: StageTimer, total_seconds: float):
+    """Store the stage timings of the attempt on the job (kept when it fails)"""
+    try:
+        update_job(job_id, timings=json.dumps({
+            "total_seconds": round(total_seconds, 4),
+            "stages": timer.to_dict()
+        }))
+    except Exception as e:
+        logger.warning(f"Could not store timings of job {job_id}: {e}")
+
+
+def process_file_task(job_id: int) -> dict:
+    """
+    Process an uploaded file (or batch of files) for a leased import job.
+
+    Raises on failure so the worker pool can record the attempt and retry.
+
+    Returns:
+        Database write statistics (added, updated, skipped, total)
+    """
+    with get_db_context() as db:
+        job = db.query(ImportJob).filter(ImportJob.id == job_id).first()
+        if not job:
+            raise ValueError(f"Import job {job_id} not found")
+        original_filename = job.filename
+        institution = job.institution_code
+        override_existing = bool(job.override_existing)
+        disable_ai = bool(job.disable_ai_categorization)
+        attempt = job.attempts or 1
+        batch_files = json.loads(job.batch_files) if job.batch_files else None
+        file_hash = job.file_hash
+        file_path = str(UPLOAD_DIR / job.saved_filename) if job.saved_filename else ""
+
+    timer = StageTimer()
+    started = time.perf_counter()
+    try:
+        with collect_timings(timer):
+            if batch_files:
+                return process_batch_task(job_id, batch_files, override_existing, disable_ai, attempt)
+            return process_single_file(
+                job_id, file_path, original_filename, institution, file_hash,
+                override_existing, disable_ai, attempt
+            )
+    finally:
+        _record_timings(job_id, timer, time.perf_counter() - started)
+
+
+def process_single_file(
+    job_id: int,
+    file_path: str,
+    original_filename: str,
+    institution: str,
+    file_hash: Optional[str],
+    override_existing: bool,
+    disable_ai: bool,
+    attempt: int
+) -> dict:
+    """
+    Process a single uploaded file.
+
+    Returns:
+        Database write statistics (added, updated, skipped, total)
+    """
+    progress = _job_progress(job_id)
+    try:
+        log_to_job(job_id, f"Starting file processing for {original_filename} (attempt {attempt})")
+        log_to_job(job_id, f"Institution: {institution}, Override mode: {override_existing}")
+
+        if not Path(file_path).exists():
+            raise FileNotFoundError(f"Uploaded file not found: {file_path}")
+
+        currency_config = get_pipeline_context().currency_config()
+        use_cnb_api = currency_config.get('use_cnb_api', False)
+        base_currency = currency_config.get('base_currency', 'CZK')
+
+        progress.stage("parse")
+        log_to_job(job_id, "Parsing file...")
+        log_to_job(job_id, f"Currency conversion: CNB API {'ENABLED' if use_cnb_api else 'DISABLED'}, base={base_currency}")
+        parsed_rows, transactions, timings = parse_and_normalize(file_path, original_filename, institution)
+        current_timer().merge(timings)
+
+        update_job(job_id, total_rows=parsed_rows, processed_rows=len(transactions))
+        progress.update(parsed=parsed_rows, normalized=len(transactions))
+        log_to_job(job_id, f"✓ Parsed {parsed_rows} rows from file")
+        log_to_job(job_id, f"✓ Normalized {len(transactions)} transactions")
+
+        total = len(transactions)
+        progress.stage("dedupe")
+        transactions, skipped_before_write = _dedupe_before_categorization(job_id, transactions, override_existing)
+        progress.update(deduped=len(transactions))
+
+        progress.stage("categorize")
+        _categorize(job_id, transactions, disable_ai, progress)
+
+        # Write to SQLite database as PRIMARY destination
+        from src.core.database_writer import DatabaseWriter
+
+        mode = "overwrite" if override_existing else "append"
+        progress.stage("write")
+        log_to_job(job_id, f"Writing to database (mode: {mode})...")
+        logger.info(f"Writing {len(transactions)} transactions to database (mode: {mode})")
+
+        db_writer = DatabaseWriter()
+        result = db_writer.write_transactions(
+            transactions, mode=mode, progress=lambda written: progress.update(written=written)
+        )
+        result['skipped'] = result.get('skipped', 0) + skipped_before_write
+        result['total'] = parsed_rows
+        _add_normalize_failures(result, parsed_rows, total)
+        _record_write_result(job_id, result)
+
+        progress.stage("post_process")
+        _detect_duplicates(job_id, transactions)
+        _pair_transfers(job_id, transactions)
+        _detect_recurring(job_id, transactions)
+
+        _finish_import(job_id, result, [{'sha256': file_hash, 'filename': original_filename, 'institution': institution}])
+        progress.flush()
+        log_to_job(job_id, "✅ File processing completed successfully")
+        return result
+
+    except Exception as e:
+        logger.error(f"Error processing file {file_path}: {e}")
+        import traceback
+        error_trace = traceback.format_exc()
+        logger.error(error_trace)
+
+        log_to_job(job_id, f"❌ Error processing file: {str(e)}", "ERROR")
+        log_to_job(job_id, error_trace, "ERROR")
+        raise
+
+
+def process_batch_task(
+    job_id: int,
+    files: List[Dict[str, str]],
+    override_existing: bool,
+    disable_ai: bool,
+    attempt: int = 1
+) -> dict:
+    """
+    Import several files as one job.
+
+    Files are parsed and normalized in parallel child processes, merged in
+    upload order, de-duplicated by transaction_id, categorized once and
+    written with a single chunked bulk write.
+
+    Returns:
+        Database write statistics (added, updated, skipped, total)
+    """
+    from backend.services.import_worker import batch_parse_executor, discard_batch_parse_executor
+
+    progress = _job_progress(job_id)
+    try:
+        log_to_job(job_id, f"Starting batch import of {len(files)} files (attempt {attempt})")
+        for entry in files:
+            log_to_job(job_id, f"  - {entry['filename']} ({entry['institution']})")
+            if not (UPLOAD_DIR / entry['saved_filename']).exists():
+                raise FileNotFoundError(f"Uploaded file not found: {entry['saved_filename']}")
+
+        max_workers = max(1, min(len(files), int(load_worker_settings()['batch_parse_workers'])))
+
+        progress.stage("parse")
+        log_to_job(job_id, f"Parsing and normalizing files ({max_workers} processes)...")
+        # Wall time of the parallel stage; parse/normalize are summed over the child processes
+        executor = batch_parse_executor()
+        with span("parallel_parse_wall"):
+            futures = [
+                executor.submit(
+                    parse_and_normalize,
+                    str(UPLOAD_DIR / entry['saved_filename']),
+                    entry['filename'],
+                    entry['institution']
+                )
+                for entry in files
+            ]
+
+            # Collect in upload order so the merged result is deterministic
+            parsed_rows = 0
+            transactions = []
+            try:
+                for entry, future in zip(files, futures):
+                    file_parsed, file_transactions, file_timings = future.result()
+                    current_timer().merge(file_timings)
+                    parsed_rows += file_parsed
+                    transactions.extend(file_transactions)
+                    progress.update(parsed=parsed_rows, normalized=len(transactions))
+                    log_to_job(job_id, f"✓ {entry['filename']}: {file_parsed} rows parsed, {len(file_transactions)} normalized")
+            finally:
+                # A failed file fails the job; don't leave its siblings queued in the shared pool
+                for future in futures:
+                    future.cancel()
+
+        # Overlapping statements contain the same transactions - keep the first occurrence
+        seen = set()
+        unique = []
+        for txn in transactions:
+            if txn.transaction_id not in seen:
+                seen.add(txn.transaction_id)
+                unique.append(txn)
+        unique.sort(key=lambda txn: txn.date)
+
+        update_job(job_id, total_rows=parsed_rows, processed_rows=len(transactions))
+        log_to_job(job_id, f"✓ Normalized {len(transactions)} transactions ({len(transactions) - len(unique)} repeated across files)")
+
+        progress.stage("dedupe")
+        unique, skipped_before_write = _dedupe_before_categorization(job_id, unique, override_existing)
+        progress.update(deduped=len(unique))
+
+        progress.stage("categorize")
+        _categorize(job_id, unique, disable_ai, progress)
+
+        from src.core.database_writer import DatabaseWriter
+
+        mode = "overwrite" if override_existing else "append"
+        progress.stage("write")
+        log_to_job(job_id, f"Writing to database (mode: {mode})...")
+
+        db_writer = DatabaseWriter()
+        result = db_writer.bulk_write_transactions(
+            unique, mode=mode, progress=lambda written: progress.update(written=written)
+        )
+        result['skipped'] = result.get('skipped', 0) + skipped_before_write + len(transactions) - len(seen)
+        result['total'] = parsed_rows
+        _add_normalize_failures(result, parsed_rows, len(transactions))
+        _record_write_result(job_id, result)
+
+        progress.stage("post_process")
+        _detect_duplicates(job_id, unique)
+        _pair_transfers(job_id, unique)
+        _detect_recurring(job_id, unique)
+
+        _finish_import(job_id, result, files)
+        progress.flush()
+        log_to_job(job_id, "✅ Batch import completed successfully")
+        return result
+
+    except Exception as e:
+        if isinstance(e, BrokenProcessPool):
+            discard_batch_parse_executor()
+        logger.error(f"Error processing batch job {job_id}: {e}")
+        import traceback
+        error_trace = traceback.format_exc()
+        logger.error(error_trace)
+
+        log_to_job(job_id, f"❌ Error processing batch: {str(e)}", "ERROR")
+        log_to_job(job_id, error_trace, "ERROR")
+        raise
@@ -0,0 +1,397 @@
+"""
+Import worker pool - consumes the durable import job queue.
+
+A dispatcher thread leases pending ImportJobs and runs them on a
+ProcessPoolExecutor, so several statements are parsed and categorized in
+parallel on separate cores without competing with API requests for the GIL.
+
+Runs embedded in the API process (settings.yaml -> processing.import_workers.embedded)
+or standalone:
+
+    python -m backend.services.import_worker
+"""
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+import traceback
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from backend.services import job_queue
+from src.utils.metrics import REGISTRY, counter, histogram
+
+logger = logging.getLogger(__name__)
+
+IMPORT_JOBS = counter(
+    "finance_import_jobs_total",
+    "Import job attempts finished by the worker pool",
+    ("result",)
+)
+IMPORT_ROWS = counter(
+    "finance_import_rows_total",
+    "Transactions written by import jobs",
+    ("result",)
+)
+IMPORT_DURATION = histogram(
+    "finance_import_job_duration_seconds",
+    "Import job run time (dispatch to completion)",
+    buckets=(0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+)
+
+DEFAULT_WORKER_SETTINGS: Dict[str, Any] = {
+    "embedded": True,
+    "max_workers": 4,
+    "per_institution_limit": 2,
+    "institution_limits": {},
+    "lease_seconds": 300,
+    "max_attempts": 3,
+    "retry_base_delay": 10,
+    "poll_interval": 2.0,
+    "batch_parse_workers": 4,
+    "dedupe_chunk_size": 500,
+    "progress_interval": 0.5,
+    "events_poll_interval": 0.5,
+    "events_heartbeat_seconds": 15,
+}
+
+
+def load_worker_settings(settings_path: str = "config/settings.yaml") -> Dict[str, Any]:
+    """Load processing.import_workers from settings.yaml merged over the defaults"""
+    settings: Dict[str, Any] = {}
+    path = Path(settings_path)
+    if path.exists():
+        try:
+            import yaml
+            with open(path, 'r', encoding='utf-8') as f:
+                settings = (yaml.safe_load(f) or {}).get('processing', {}).get('import_workers', {}) or {}
+        except Exception as e:
+            logger.warning(f"Could not load import worker settings from {settings_path}: {e}")
+
+    return {**DEFAULT_WORKER_SETTINGS, **settings}
+
+
+def init_worker_process():
+    """Configure logging in a freshly spawned worker process"""
+    from src.utils.logger import configure_logging
+    configure_logging()
+    # The dispatcher handles Ctrl+C; workers finish their current job
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+# Pool parsing the files of batch jobs, one per worker process (see batch_parse_executor)
+_batch_executor: Optional[ProcessPoolExecutor] = None
+_batch_executor_lock = threading.Lock()
+
+
+def batch_parse_executor() -> ProcessPoolExecutor:
+    """
+    Process pool that parses and normalizes the files of batch jobs.
+
+    Created on the first batch job of this process and reused by the next
+    ones, so a batch doesn't spawn interpreters and import pandas again.
+    Child processes start on demand, up to batch_parse_workers.
+    """
+    global _batch_executor
+    with _batch_executor_lock:
+        if _batch_executor is None:
+            _batch_executor = ProcessPoolExecutor(
+                max_workers=max(1, int(load_worker_settings()['batch_parse_workers'])),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_worker_process
+            )
+        return _batch_executor
+
+
+def discard_batch_parse_executor():
+    """Drop a batch parse pool broken by a crashed child; the next batch creates a new one"""
+    global _batch_executor
+    with _batch_executor_lock:
+        old, _batch_executor = _batch_executor, None
+    if old:
+        old.shutdown(wait=False, cancel_futures=True)
+
+
+def _run_job(job_id: int) -> tuple:
+    """
+    Worker process entrypoint for one import job.
+
+    Returns the job result and the metrics this process recorded since its
+    previous job (SQL, AI calls), which the pool merges into its own
+    registry. Metrics of a failed job are carried by the next result.
+    """
+    from backend.services.file_processing import process_file_task
+    result = process_file_task(job_id)
+    return result, REGISTRY.drain()
+
+
+class ImportWorkerPool:
+    """Leases queued import jobs and runs them on a pool of worker processes"""
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        per_institution_limit: int = 2,
+        institution_limits: Optional[Dict[str, int]] = None,
+        lease_seconds: int = 300,
+        retry_base_delay: float = 10,
+        poll_interval: float = 2.0,
+        clear_cache: bool = True
+    ):
+        """
+        Initialize worker pool.
+
+        Args:
+            max_workers: Number of worker processes (jobs running at once)
+            per_institution_limit: Max concurrent jobs per institution
+            institution_limits: Per-institution overrides of per_institution_limit
+            lease_seconds: Lease duration; a job whose lease isn't renewed is requeued
+            retry_base_delay: Seconds before the first retry, doubled on each attempt
+            poll_interval: Seconds between queue polls when idle
+            clear_cache: Clear the in-process dashboard cache after each import
+        """
+        self.max_workers = max(1, int(max_workers or os.cpu_count() or 1))
+        self.per_institution_limit = max(1, int(per_institution_limit))
+        self.institution_limits = institution_limits or {}
+        self.lease_seconds = int(lease_seconds)
+        self.retry_base_delay = float(retry_base_delay)
+        self.poll_interval = float(poll_interval)
+        self.clear_cache = clear_cache
+
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._running: Dict[int, Future] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_settings(cls, settings: Optional[Dict[str, Any]] = None, **overrides) -> "ImportWorkerPool":
+        """Create a pool from processing.import_workers settings"""
+        settings = settings or load_worker_settings()
+        return cls(
+            max_workers=settings['max_workers'],
+            per_institution_limit=settings['per_institution_limit'],
+            institution_limits=settings.get('institution_limits'),
+            lease_seconds=settings['lease_seconds'],
+            retry_base_delay=settings['retry_base_delay'],
+            poll_interval=settings['poll_interval'],
+            **overrides
+        )
+
+    def start(self):
+        """Start the worker processes and the dispatcher thread"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop.clear()
+        self._executor = self._create_executor()
+        self._thread = threading.Thread(target=self._dispatch_loop, name="import-dispatcher", daemon=True)
+        self._thread.start()
+        logger.info(f"Import worker pool started ({self.max_workers} workers, owner={self.owner})")
+
+    def stop(self, wait: bool = True):
+        """
+        Stop dispatching and shut down the worker processes.
+
+        Jobs still running when wait=False keep their lease until it expires
+        and are then requeued by another worker.
+        """
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=10)
+            self._thread = None
+        if self._executor:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+        logger.info("Import worker pool stopped")
+
+    def wake(self):
+        """Poll the queue now (e.g. right after a job was enqueued)"""
+        self._wake.set()
+
+    @property
+    def running_jobs(self) -> int:
+        with self._lock:
+            return len(self._running)
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        # spawn: worker processes must not inherit the parent's SQLite connections or threads
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker_process
+        )
+
+    def _dispatch_loop(self):
+        while not self._stop.is_set():
+            try:
+                self._tick()
+            except Exception as e:
+                logger.error(f"Import dispatcher error: {e}")
+                logger.debug(traceback.format_exc())
+
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def _tick(self):
+        """Renew leases, recover expired jobs and lease work for free slots"""
+        with self._lock:
+            running_ids = list(self._running)
+
+        job_queue.renew_leases(self.owner, running_ids, self.lease_seconds)
+        job_queue.requeue_expired_leases()
+
+        free_slots = self.max_workers - len(running_ids)
+        job_ids = job_queue.lease_jobs(
+            self.owner,
+            free_slots,
+            self.lease_seconds,
+            self.per_institution_limit,
+            self.institution_limits
+        )
+
+        for job_id in job_ids:
+            self._submit(job_id)
+
+    def _submit(self, job_id: int):
+        logger.info(f"Dispatching import job {job_id}")
+        try:
+            future = self._executor.submit(_run_job, job_id)
+        except BrokenProcessPool as e:
+            self._handle_failure(job_id, e)
+            self._rebuild_executor()
+            return
+
+        with self._lock:
+            self._running[job_id] = future
+        started = time.perf_counter()
+        future.add_done_callback(lambda f, job_id=job_id: self._on_job_done(job_id, f, started))
+
+    def _on_job_done(self, job_id: int, future: Future, started: float):
+        with self._lock:
+            self._running.pop(job_id, None)
+
+        if future.cancelled():
+            # Pool shutting down - the lease expires and the job is picked up again
+            return
+
+        error = future.exception()
+        IMPORT_DURATION.observe(time.perf_counter() - started)
+        IMPORT_JOBS.labels("completed" if error is None else "failed").inc()
+        try:
+            if error is None:
+                result, metrics = future.result()
+                REGISTRY.merge(metrics)
+                for key, label in (("added", "inserted"), ("updated", "updated"), ("skipped", "skipped")):
+                    IMPORT_ROWS.labels(label).inc((result or {}).get(key, 0))
+                job_queue.complete_job(job_id, self.owner)
+                logger.info(f"Import job {job_id} completed")
+                if self.clear_cache:
+                    from backend.utils.cache import clear_dashboard_cache
+                    clear_dashboard_cache()
+            else:
+                self._handle_failure(job_id, error)
+                if isinstance(error, BrokenProcessPool):
+                    self._rebuild_executor()
+        except Exception as e:
+            logger.error(f"Error finalizing import job {job_id}: {e}")
+
+        self.wake()
+
+    def _handle_failure(self, job_id: int, error: BaseException):
+        details = "".join(traceback.format_exception(type(error), error, error.__traceback__))
+        status = job_queue.fail_job(
+            job_id,
+            self.owner,
+            str(error) or type(error).__name__,
+            error_details=details,
+            retry_base_delay=self.retry_base_delay,
+            retry=getattr(error, "retryable", True)
+        )
+        logger.warning(f"Import job {job_id} failed: {error} -> {status}")
+
+    def _rebuild_executor(self):
+        """Replace a pool broken by a crashed worker process"""
+        if self._stop.is_set():
+            return
+        logger.warning("Worker process died, restarting import worker pool")
+        old = self._executor
+        self._executor = self._create_executor()
+        if old:
+            old.shutdown(wait=False, cancel_futures=True)
+
+
+# Pool embedded in the API process (started from app startup)
+_embedded_pool: Optional[ImportWorkerPool] = None
+
+
+def start_embedded_pool() -> Optional[ImportWorkerPool]:
+    """Start the in-process worker pool if enabled in settings"""
+    global _embedded_pool
+    settings = load_worker_settings()
+    if not settings['embedded']:
+        logger.info("Embedded import workers disabled; run `python -m backend.services.import_worker`")
+        return None
+
+    if _embedded_pool is None:
+        _embedded_pool = ImportWorkerPool.from_settings(settings)
+        _embedded_pool.start()
+    return _embedded_pool
+
+
+def stop_embedded_pool():
+    """Stop the in-process worker pool"""
+    global _embedded_pool
+    if _embedded_pool is not None:
+        _embedded_pool.stop(wait=False)
+        _embedded_pool = None
+
+
+def notify_job_enqueued():
+    """Wake the embedded dispatcher so a new job starts without waiting for the next poll"""
+    if _embedded_pool is not None:
+        _embedded_pool.wake()
+
+
+def main():
+    """Run a standalone worker pool until interrupted"""
+    import argparse
+    from backend.database.connection import init_db
+
+    parser = argparse.ArgumentParser(description="Finance Consolidator import worker")
+    parser.add_argument("--workers", type=int, help="Number of worker processes (default: settings.yaml)")
+    args = parser.parse_args()
+
+    init_worker_process()
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    init_db()
+
+    settings = load_worker_settings()
+    if args.workers:
+        settings['max_workers'] = args.workers
+
+    # A separate process can't clear the API's in-memory cache; its TTL expires it
+    pool = ImportWorkerPool.from_settings(settings, clear_cache=False)
+    pool.start()
+
+    stopped = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopped.set())
+    try:
+        while not stopped.wait(1):
+            pass
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool.stop(wait=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,542 @@
+"""
+Durable file-import job queue backed by the import_jobs table.
+
+Jobs survive restarts: a worker leases a pending job (status -> processing,
+lease_owner/lease_expires_at set), renews the lease while it runs and either
+completes it or fails it. Failed attempts are retried with exponential
+backoff until max_attempts; jobs whose lease expired (crashed worker) are
+put back in the queue.
+
+Everything a job reports while it runs (log lines, stage changes, progress
+counters, status changes) is appended to import_job_events; the id of an
+event is its offset in the job's stream, which GET /files/jobs/{id}/events
+tails.
+"""
+import json
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import func, or_
+
+from backend.database.connection import get_db_context
+from backend.database.models import ImportedFile, ImportJob, ImportJobEvent
+
+logger = logging.getLogger(__name__)
+
+
+def job_to_dict(job: ImportJob) -> Dict[str, Any]:
+    """Convert an ImportJob row to the API job representation"""
+    def iso(value: Optional[datetime]) -> Optional[str]:
+        return value.isoformat() if value else None
+
+    return {
+        'id': str(job.id),
+        'filename': job.filename,
+        'saved_filename': job.saved_filename or '',
+        'file_hash': job.file_hash,
+        'institution': job.institution_code or '',
+        'files': json.loads(job.batch_files) if job.batch_files else [],
+        'status': job.status,
+        'stage': job.stage,
+        'created_at': iso(job.created_at),
+        'started_at': iso(job.started_at),
+        'completed_at': iso(job.completed_at),
+        'override_existing': bool(job.override_existing),
+        'disable_ai_categorization': bool(job.disable_ai_categorization),
+        'parsed_rows': job.total_rows or 0,
+        'normalized_rows': job.processed_rows or 0,
+        'inserted_rows': job.new_transactions or 0,
+        'updated_rows': job.updated_transactions or 0,
+        'skipped_rows': job.duplicate_transactions or 0,
+        'attempts': job.attempts or 0,
+        'max_attempts': job.max_attempts or 0,
+        'message': job.message,
+        'error': job.error_message,
+        'timings': json.loads(job.timings) if job.timings else None,
+    }
+
+
+def format_log_line(message: str, level: str = "INFO") -> str:
+    """Format a job log line the way the processing log has always looked"""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return f"[{timestamp}] [{level}] {message}"
+
+
+def _event(job_id: int, event: str, data: Dict[str, Any]) -> ImportJobEvent:
+    return ImportJobEvent(
+        job_id=job_id, event=event, data=json.dumps(data, ensure_ascii=False), created_at=datetime.now()
+    )
+
+
+def _log_event(job_id: int, message: str, level: str = "INFO") -> ImportJobEvent:
+    return _event(job_id, 'log', {'line': format_log_line(message, level), 'level': level})
+
+
+def _status_event(job_id: int, status: str, **data) -> ImportJobEvent:
+    return _event(job_id, 'status', {'status': status, **data})
+
+
+def enqueue_job(
+    filename: str,
+    saved_filename: str,
+    institution: str,
+    override_existing: bool = False,
+    disable_ai_categorization: bool = False,
+    max_attempts: int = 3,
+    batch_files: Optional[List[Dict[str, str]]] = None,
+    file_hash: Optional[str] = None
+) -> int:
+    """
+    Add a new import job to the queue.
+
+    Args:
+        batch_files: For batch uploads, the files to import together
+                     ({filename, saved_filename, institution, sha256} each)
+        file_hash: SHA-256 of the uploaded file
+
+    Returns:
+        Job ID
+    """
+    with get_db_context() as db:
+        job = ImportJob(
+            filename=filename,
+            saved_filename=saved_filename,
+            file_hash=file_hash,
+            institution_code=institution,
+            status='pending',
+            override_existing=override_existing,
+            disable_ai_categorization=disable_ai_categorization,
+            total_rows=0,
+            processed_rows=0,
+            new_transactions=0,
+            updated_transactions=0,
+            duplicate_transactions=0,
+            attempts=0,
+            max_attempts=max_attempts,
+            batch_files=json.dumps(batch_files) if batch_files else None,
+            created_at=datetime.now(),
+        )
+        db.add(job)
+        db.flush()
+        db.add(_status_event(job.id, 'pending'))
+        db.commit()
+        logger.info(f"Queued import job {job.id}: {filename} ({institution})")
+        return job.id
+
+
+def record_skipped_upload(
+    filename: str,
+    institution: str,
+    message: str,
+    file_hash: Optional[str] = None
+) -> int:
+    """
+    Record an upload that needed no processing as an already completed job.
+
+    Returns:
+        Job ID
+    """
+    now = datetime.now()
+    with get_db_context() as db:
+        job = ImportJob(
+            filename=filename,
+            saved_filename='',
+            file_hash=file_hash,
+            institution_code=institution,
+            status='completed',
+            total_rows=0,
+            processed_rows=0,
+            new_transactions=0,
+            updated_transactions=0,
+            duplicate_transactions=0,
+            attempts=0,
+            max_attempts=0,
+            message=message,
+            created_at=now,
+            started_at=now,
+            completed_at=now,
+        )
+        db.add(job)
+        db.flush()
+        db.add(_log_event(job.id, message))
+        db.add(_status_event(job.id, 'completed'))
+        db.commit()
+        logger.info(f"Skipped upload {filename}: {message}")
+        return job.id
+
+
+def find_imported_file(sha256: str) -> Optional[Dict[str, Any]]:
+    """Look up a successfully imported file by content hash"""
+    with get_db_context() as db:
+        imported = db.query(ImportedFile).filter(ImportedFile.sha256 == sha256).first()
+        if not imported:
+            return None
+        return {
+            'filename': imported.filename,
+            'institution': imported.institution_code,
+            'import_job_id': imported.import_job_id,
+            'imported_at': imported.imported_at.isoformat() if imported.imported_at else None,
+        }
+
+
+def record_imported_files(job_id: int, files: Iterable[Dict[str, str]]):
+    """
+    Remember the content hashes of files a job imported successfully.
+
+    Args:
+        files: Dicts with sha256, filename and institution
+    """
+    files = [f for f in files if f.get('sha256')]
+    if not files:
+        return
+
+    with get_db_context() as db:
+        known = {
+            row.sha256 for row in db.query(ImportedFile.sha256).filter(
+                ImportedFile.sha256.in_([f['sha256'] for f in files])
+            )
+        }
+        for f in files:
+            if f['sha256'] in known:
+                continue
+            known.add(f['sha256'])
+            db.add(ImportedFile(
+                sha256=f['sha256'],
+                filename=f['filename'],
+                institution_code=f.get('institution'),
+                import_job_id=job_id,
+                imported_at=datetime.now(),
+            ))
+        db.commit()
+
+
+def get_job(job_id: int) -> Optional[Dict[str, Any]]:
+    """Get a job as a dict (None if it doesn't exist)"""
+    with get_db_context() as db:
+        job = db.query(ImportJob).filter(ImportJob.id == job_id).first()
+        return job_to_dict(job) if job else None
+
+
+def get_job_log(job_id: int) -> Optional[List[str]]:
+    """Get the processing log lines of a job (None if it doesn't exist)"""
+    with get_db_context() as db:
+        row = db.query(ImportJob.log).filter(ImportJob.id == job_id).first()
+        if row is None:
+            return None
+        lines = row.log.splitlines() if row.log else []
+        events = db.query(ImportJobEvent.data).filter(
+            ImportJobEvent.job_id == job_id,
+            ImportJobEvent.event == 'log'
+        ).order_by(ImportJobEvent.id)
+        lines.extend(json.loads(data)['line'] for data, in events)
+        return lines
+
+
+def get_job_events(job_id: int, after_id: int = 0, limit: int = 500) -> List[Dict[str, Any]]:
+    """
+    Events of a job after an offset, oldest first.
+
+    Args:
+        after_id: Id of the last event already seen (0 = from the start)
+        limit: Max events returned; ask again from the last id for more
+
+    Returns:
+        [{id, event, data}] with data decoded
+    """
+    with get_db_context() as db:
+        rows = db.query(ImportJobEvent.id, ImportJobEvent.event, ImportJobEvent.data).filter(
+            ImportJobEvent.job_id == job_id,
+            ImportJobEvent.id > after_id
+        ).order_by(ImportJobEvent.id).limit(limit).all()
+        return [{'id': row.id, 'event': row.event, 'data': json.loads(row.data)} for row in rows]
+
+
+def list_jobs(limit: int = 50) -> List[Dict[str, Any]]:
+    """Get most recent jobs first"""
+    with get_db_context() as db:
+        jobs = db.query(ImportJob).order_by(
+            ImportJob.created_at.desc(), ImportJob.id.desc()
+        ).limit(limit).all()
+        return [job_to_dict(job) for job in jobs]
+
+
+def count_jobs_by_status() -> Dict[str, int]:
+    """Number of jobs per status (queue depth for monitoring)"""
+    with get_db_context() as db:
+        rows = db.query(ImportJob.status, func.count(ImportJob.id)).group_by(ImportJob.status).all()
+        return {status: count for status, count in rows}
+
+
+def delete_job(job_id: int) -> Optional[Dict[str, Any]]:
+    """Delete a job, returning its last state (None if it doesn't exist)"""
+    with get_db_context() as db:
+        job = db.query(ImportJob).filter(ImportJob.id == job_id).first()
+        if not job:
+            return None
+        job_dict = job_to_dict(job)
+        db.query(ImportJobEvent).filter(ImportJobEvent.job_id == job_id).delete(synchronize_session=False)
+        db.delete(job)
+        db.commit()
+        return job_dict
+
+
+def update_job(job_id: int, **fields):
+    """Update columns of a job"""
+    with get_db_context() as db:
+        db.query(ImportJob).filter(ImportJob.id == job_id).update(fields, synchronize_session=False)
+        db.commit()
+
+
+def append_job_log(job_id: int, message: str, level: str = "INFO"):
+    """Append a line to the job's processing log (single INSERT)"""
+    with get_db_context() as db:
+        db.add(_log_event(job_id, message, level))
+        db.commit()
+
+
+def append_job_event(job_id: int, event: str, data: Dict[str, Any]):
+    """Append an event (log, stage, progress, status) to the job's stream"""
+    with get_db_context() as db:
+        db.add(_event(job_id, event, data))
+        db.commit()
+
+
+def set_job_stage(job_id: int, stage: str):
+    """Record the pipeline stage a job entered"""
+    with get_db_context() as db:
+        db.query(ImportJob).filter(ImportJob.id == job_id).update(
+            {ImportJob.stage: stage}, synchronize_session=False
+        )
+        db.add(_event(job_id, 'stage', {'stage': stage}))
+        db.commit()
+
+
+class JobProgress:
+    """
+    Stage and row counters of a running job, published as events.
+
+    Pipeline loops call update() as often as they like; a 'progress' event
+    is written at most every `interval` seconds, and pending counters are
+    flushed on every stage change, so progress reporting costs one INSERT
+    per interval rather than per row.
+
+    Counters: parsed, normalized, deduped (rows left to categorize and
+    write), categorized, written.
+    """
+
+    def __init__(self, job_id: int, interval: float = 0.5):
+        self.job_id = job_id
+        self.interval = interval
+        self.counters: Dict[str, int] = {}
+        self._last_sent = 0.0
+        self._dirty = False
+
+    def update(self, **counters: int):
+        self.counters.update(counters)
+        self._dirty = True
+        if time.monotonic() - self._last_sent >= self.interval:
+            self.flush()
+
+    def flush(self):
+        """Write the counters if they changed since the last event"""
+        if not self._dirty:
+            return
+        self._dirty = False
+        self._last_sent = time.monotonic()
+        append_job_event(self.job_id, 'progress', dict(self.counters))
+
+    def stage(self, stage: str):
+        """Flush the counters and move the job to the next pipeline stage"""
+        self.flush()
+        set_job_stage(self.job_id, stage)
+
+
+def lease_jobs(
+    owner: str,
+    slots: int,
+    lease_seconds: int,
+    per_institution_limit: int,
+    institution_limits: Optional[Dict[str, int]] = None
+) -> List[int]:
+    """
+    Lease up to `slots` pending jobs for a worker.
+
+    Respects per-institution concurrency limits across all workers sharing the
+    database. Leasing is a conditional UPDATE (status must still be 'pending'),
+    so concurrent dispatchers never lease the same job twice.
+
+    Returns:
+        IDs of the leased jobs, oldest first
+    """
+    if slots <= 0:
+        return []
+
+    institution_limits = institution_limits or {}
+    now = datetime.now()
+    leased = []
+
+    with get_db_context() as db:
+        # Jobs currently running anywhere, by institution
+        running = dict(
+            db.query(ImportJob.institution_code, func.count(ImportJob.id)).filter(
+                ImportJob.status == 'processing',
+                ImportJob.lease_expires_at > now
+            ).group_by(ImportJob.institution_code).all()
+        )
+
+        candidates = db.query(ImportJob.id, ImportJob.institution_code).filter(
+            ImportJob.status == 'pending',
+            or_(ImportJob.available_at.is_(None), ImportJob.available_at <= now)
+        ).order_by(ImportJob.created_at.asc(), ImportJob.id.asc()).limit(slots * 10).all()
+
+        for job_id, institution in candidates:
+            limit = institution_limits.get(institution, per_institution_limit)
+            if running.get(institution, 0) >= limit:
+                continue
+
+            updated = db.query(ImportJob).filter(
+                ImportJob.id == job_id,
+                ImportJob.status == 'pending'
+            ).update({
+                ImportJob.status: 'processing',
+                ImportJob.lease_owner: owner,
+                ImportJob.lease_expires_at: now + timedelta(seconds=lease_seconds),
+                ImportJob.attempts: func.coalesce(ImportJob.attempts, 0) + 1,
+                ImportJob.started_at: now,
+                ImportJob.completed_at: None,
+                ImportJob.error_message: None,
+                ImportJob.stage: None,
+            }, synchronize_session=False)
+            if updated:
+                db.add(_status_event(job_id, 'processing', owner=owner))
+            db.commit()
+
+            if updated:
+                leased.append(job_id)
+                running[institution] = running.get(institution, 0) + 1
+                if len(leased) >= slots:
+                    break
+
+    return leased
+
+
+def renew_leases(owner: str, job_ids: Iterable[int], lease_seconds: int):
+    """Extend the leases a worker holds on its running jobs"""
+    job_ids = list(job_ids)
+    if not job_ids:
+        return
+
+    with get_db_context() as db:
+        db.query(ImportJob).filter(
+            ImportJob.id.in_(job_ids),
+            ImportJob.lease_owner == owner,
+            ImportJob.status == 'processing'
+        ).update({
+            ImportJob.lease_expires_at: datetime.now() + timedelta(seconds=lease_seconds)
+        }, synchronize_session=False)
+        db.commit()
+
+
+def complete_job(job_id: int, owner: str):
+    """Mark a leased job as completed"""
+    with get_db_context() as db:
+        updated = db.query(ImportJob).filter(
+            ImportJob.id == job_id,
+            ImportJob.lease_owner == owner
+        ).update({
+            ImportJob.status: 'completed',
+            ImportJob.stage: None,
+            ImportJob.completed_at: datetime.now(),
+            ImportJob.lease_owner: None,
+            ImportJob.lease_expires_at: None,
+        }, synchronize_session=False)
+        if updated:
+            db.add(_status_event(job_id, 'completed'))
+        db.commit()
+
+
+def fail_job(
+    job_id: int,
+    owner: str,
+    error: str,
+    error_details: Optional[str] = None,
+    retry_base_delay: float = 10,
+    retry: bool = True
+) -> str:
+    """
+    Record a failed attempt and either schedule a retry or fail the job.
+
+    Args:
+        retry: False fails the job right away (errors another attempt can't fix)
+
+    Returns:
+        New job status ('pending' when a retry is scheduled, otherwise 'failed')
+    """
+    with get_db_context() as db:
+        job = db.query(ImportJob).filter(
+            ImportJob.id == job_id,
+            ImportJob.lease_owner == owner
+        ).first()
+        if not job:
+            return 'failed'
+
+        attempts = job.attempts or 0
+        max_attempts = job.max_attempts or 1
+        job.error_message = error
+        job.error_details = error_details
+        job.lease_owner = None
+        job.lease_expires_at = None
+
+        if retry and attempts < max_attempts:
+            delay = retry_base_delay * (2 ** (attempts - 1))
+            job.status = 'pending'
+            job.stage = None
+            job.available_at = datetime.now() + timedelta(seconds=delay)
+            db.add(_log_event(job_id, f"Attempt {attempts}/{max_attempts} failed, retrying in {delay:g}s", "WARNING"))
+        else:
+            job.status = 'failed'
+            job.completed_at = datetime.now()
+            db.add(_log_event(job_id, f"Giving up after {attempts} attempt(s)", "ERROR"))
+
+        db.add(_status_event(job_id, job.status, error=error))
+        db.commit()
+        return job.status
+
+
+def requeue_expired_leases() -> int:
+    """
+    Return jobs whose worker stopped renewing its lease to the queue.
+
+    Handles crashed workers and jobs interrupted by a restart.
+
+    Returns:
+        Number of jobs requeued or failed
+    """
+    now = datetime.now()
+    with get_db_context() as db:
+        expired = db.query(ImportJob).filter(
+            ImportJob.status == 'processing',
+            or_(ImportJob.lease_expires_at.is_(None), ImportJob.lease_expires_at < now)
+        ).all()
+
+        for job in expired:
+            attempts = job.attempts or 0
+            job.lease_owner = None
+            job.lease_expires_at = None
+            if attempts < (job.max_attempts or 1):
+                job.status = 'pending'
+                job.stage = None
+                job.available_at = now
+                db.add(_log_event(job.id, "Worker lease expired, job requeued", "WARNING"))
+            else:
+                job.status = 'failed'
+                job.error_message = "Worker lease expired"
+                job.completed_at = now
+                db.add(_log_event(job.id, "Worker lease expired, giving up", "ERROR"))
+            db.add(_status_event(job.id, job.status, error=job.error_message))
+            logger.warning(f"Import job {job.id} lease expired -> {job.status}")
+
+        db.commit()
+        return len(expired)
@@ -0,0 +1,189 @@
+"""
+Process-wide cache of the objects the import pipeline is built from.
+
+Setting up the pipeline is most of the cost of a small import: parsing
+settings.yaml and the institution YAML, the CurrencyConverter (CNB rate
+cache), a DataNormalizer (accounts.yaml) and the TransactionCategorizer
+(categorization.yaml, accounts.yaml, every rule and the category tree from
+SQLite). Worker processes keep these between jobs and rebuild an object
+only when a file it was built from changed (mtime) or, for the
+categorizer, when rules, categories or owners changed in the database
+(cache_generations counter, bumped by triggers from any process).
+"""
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+SETTINGS_PATH = Path("config/settings.yaml")
+ACCOUNTS_PATH = Path("config/accounts.yaml")
+CATEGORIZATION_PATH = Path("config/categorization.yaml")
+INSTITUTIONS_DIR = Path("config/institutions")
+
+
+def _mtime(path: Path) -> Optional[int]:
+    """Modification time of a file (None if it doesn't exist)"""
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _load_yaml(path: Path) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f) or {}
+
+
+class PipelineContext:
+    """
+    Cached pipeline objects, each stored with the version it was built from.
+
+    A version is a tuple of file mtimes (plus the database generation for the
+    categorizer); an object is rebuilt on the first request after its version
+    changes.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._entries: Dict[Hashable, Tuple[Hashable, Any]] = {}
+
+    def _cached(self, key: Hashable, version: Hashable, build: Callable[[], Any]) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                return entry[1]
+
+            value = build()
+            self._entries[key] = (version, value)
+            logger.debug(f"Pipeline context: built {key}")
+            return value
+
+    def clear(self):
+        """Drop every cached object"""
+        with self._lock:
+            self._entries.clear()
+
+    def settings(self) -> Dict[str, Any]:
+        """Parsed settings.yaml"""
+        return self._cached("settings", _mtime(SETTINGS_PATH), lambda: _load_yaml(SETTINGS_PATH))
+
+    def categorization_config(self) -> Dict[str, Any]:
+        """Parsed categorization.yaml"""
+        return self._cached(
+            "categorization_config",
+            _mtime(CATEGORIZATION_PATH),
+            lambda: _load_yaml(CATEGORIZATION_PATH) if CATEGORIZATION_PATH.exists() else {}
+        )
+
+    def own_accounts(self) -> frozenset:
+        """Account numbers of accounts.yaml (the owners' own accounts)"""
+        return self._cached(
+            "own_accounts",
+            _mtime(ACCOUNTS_PATH),
+            lambda: frozenset((_load_yaml(ACCOUNTS_PATH).get('accounts') or {}) if ACCOUNTS_PATH.exists() else ())
+        )
+
+    def currency_config(self) -> Dict[str, Any]:
+        return self.settings().get('currency', {}) or {}
+
+    def institution_config(self, institution: str) -> Dict[str, Any]:
+        """Parsed config/institutions/<institution>.yaml"""
+        path = INSTITUTIONS_DIR / f"{institution}.yaml"
+        return self._cached(("institution", institution), _mtime(path), lambda: _load_yaml(path))
+
+    def filename_patterns(self) -> List[Tuple[str, List[str]]]:
+        """(institution, file_detection.filename_patterns) of every institution config"""
+        config_files = sorted(INSTITUTIONS_DIR.glob("*.yaml"))
+        version = tuple((config_file.name, _mtime(config_file)) for config_file in config_files)
+
+        def build():
+            patterns = []
+            for config_file in config_files:
+                try:
+                    config = self.institution_config(config_file.stem)
+                except Exception as e:
+                    logger.error(f"Error loading institution config {config_file}: {e}")
+                    continue
+                patterns.append((
+                    config_file.stem,
+                    (config.get('file_detection') or {}).get('filename_patterns') or []
+                ))
+            return patterns
+
+        return self._cached("filename_patterns", version, build)
+
+    def currency_converter(self):
+        """
+        CurrencyConverter configured from settings.yaml -> currency.
+
+        Memoized factors are cleared on every call: a factor for a recent date
+        may come from an earlier fixing than the one a later import would get.
+        """
+        from src.utils.currency import CurrencyConverter
+
+        def build():
+            currency_config = self.currency_config()
+            cnb_config = currency_config.get('cnb_api', {}) or {}
+            return CurrencyConverter(
+                rates=currency_config.get('rates', {}),
+                base_currency=currency_config.get('base_currency', 'CZK'),
+                use_cnb_api=currency_config.get('use_cnb_api', False),
+                cnb_cache_dir=cnb_config.get('cache_dir', 'data/cache'),
+                cnb_year_url=cnb_config.get('year_url')
+            )
+
+        converter = self._cached("currency_converter", _mtime(SETTINGS_PATH), build)
+        converter.clear_cache()
+        return converter
+
+    def normalizer(self, institution: str):
+        """DataNormalizer of an institution (uses the shared currency converter)"""
+        from src.core.normalizer import DataNormalizer
+
+        version = (
+            _mtime(SETTINGS_PATH),
+            _mtime(ACCOUNTS_PATH),
+            _mtime(INSTITUTIONS_DIR / f"{institution}.yaml")
+        )
+        converter = self.currency_converter()
+        return self._cached(
+            ("normalizer", institution),
+            version,
+            lambda: DataNormalizer(converter, self.institution_config(institution))
+        )
+
+    def categorizer(self):
+        """TransactionCategorizer, rebuilt when its config files or rules/categories/owners change"""
+        from backend.database.connection import get_cache_generation
+        from src.utils.categorizer import get_categorizer
+
+        generation = get_cache_generation("categorization")
+        if generation is None:
+            # Not tracked on this database - never reuse
+            return get_categorizer()
+
+        version = (
+            _mtime(CATEGORIZATION_PATH),
+            _mtime(SETTINGS_PATH),
+            _mtime(ACCOUNTS_PATH),
+            generation
+        )
+        return self._cached("categorizer", version, get_categorizer)
+
+
+_context: Optional[PipelineContext] = None
+_context_lock = threading.Lock()
+
+
+def get_pipeline_context() -> PipelineContext:
+    """The PipelineContext of this process"""
+    global _context
+    if _context is None:
+        with _context_lock:
+            if _context is None:
+                _context = PipelineContext()
+    return _context
@@ -0,0 +1,337 @@
+"""
+Recurring payment detection - subscriptions, rent, utilities, insurance, salary.
+
+Every transaction gets a recurring_key: direction, currency and the
+normalized counterparty (counterparty name, or the description when the
+statement has none, without digits and legal-form suffixes). Within a key,
+amounts are split into bands (a new band starts when an amount exceeds the
+band's smallest by more than amount_band_pct), and each band's date series
+is tested for periodicity: the median interval must be close to a known
+period and at least min_regularity of the intervals must match it.
+
+Results are stored in recurring_payments, one row per detected series, so
+the dashboard reads them without scanning the history. After an import
+only the keys of the imported transactions (and of any transactions still
+without a key) are re-evaluated; a full run rebuilds the table:
+
+    python -m backend.services.recurring_payments
+
+Settings: settings.yaml -> processing.recurring_detection
+"""
+import logging
+import statistics
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from backend.database.models import RecurringPayment, Transaction
+from backend.services.duplicate_detection import normalize_text
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RECURRING_SETTINGS: Dict[str, Any] = {
+    "enabled": True,
+    "min_occurrences": 3,
+    "amount_band_pct": 20.0,
+    "min_regularity": 0.6,
+}
+
+# (name, period in days, tolerance in days)
+PERIODS: Tuple[Tuple[str, float, float], ...] = (
+    ("weekly", 7.0, 1.5),
+    ("biweekly", 14.0, 2.5),
+    ("monthly", 30.44, 5.0),
+    ("quarterly", 91.31, 12.0),
+    ("semiannual", 182.62, 18.0),
+    ("yearly", 365.25, 25.0),
+)
+
+# Tokens that don't identify a counterparty (legal forms)
+_IGNORED_TOKENS = frozenset({
+    "s", "r", "o", "sro", "a", "as", "spol", "se", "k", "v", "inc", "ltd", "llc", "gmbh", "ag", "bv", "plc", "co", "com"
+})
+_KEY_TOKENS = 4
+
+_GROUP_COLUMNS = (
+    Transaction.id, Transaction.recurring_key, Transaction.date, Transaction.amount, Transaction.amount_czk,
+    Transaction.counterparty_name, Transaction.description, Transaction.account_id,
+    Transaction.category_tier1, Transaction.category_tier2, Transaction.category_tier3
+)
+
+
+def load_recurring_settings() -> Dict[str, Any]:
+    """processing.recurring_detection from settings.yaml merged over the defaults"""
+    from backend.services.pipeline_context import get_pipeline_context
+
+    processing = get_pipeline_context().settings().get('processing') or {}
+    return {**DEFAULT_RECURRING_SETTINGS, **(processing.get('recurring_detection') or {})}
+
+
+def recurring_key(counterparty_name: Optional[str], description: Optional[str], amount, currency: Optional[str]) -> str:
+    """
+    Group key of a transaction: "expense|CZK|netflix".
+
+    Empty if neither the counterparty nor the description has a usable word.
+    """
+    tokens = []
+    for token in normalize_text(counterparty_name or description).split():
+        if token in _IGNORED_TOKENS or any(char.isdigit() for char in token):
+            continue
+        tokens.append(token)
+        if len(tokens) == _KEY_TOKENS:
+            break
+
+    if not tokens:
+        return ""
+    direction = "expense" if amount < 0 else "income"
+    return f"{direction}|{currency or ''}|{' '.join(tokens)}"
+
+
+def split_amount_bands(rows: List, band_pct: float) -> List[List]:
+    """Split rows into bands of similar absolute amount"""
+    rows = sorted(rows, key=lambda row: abs(row.amount))
+    factor = 1 + band_pct / 100
+    bands = []
+    band_floor = None
+    for row in rows:
+        amount = abs(float(row.amount))
+        if band_floor is None or amount > band_floor * factor:
+            bands.append([])
+            band_floor = amount
+        bands[-1].append(row)
+    return bands
+
+
+def detect_period(days: List[int], settings: Dict[str, Any]) -> Optional[Tuple[str, float, float, float]]:
+    """
+    Test a series of day ordinals for periodicity.
+
+    Returns:
+        (period name, period days, median interval, regularity) or None
+    """
+    days = sorted(set(days))
+    if len(days) < int(settings['min_occurrences']):
+        return None
+
+    intervals = [later - earlier for earlier, later in zip(days, days[1:])]
+    median_interval = statistics.median(intervals)
+
+    for name, period_days, tolerance in PERIODS:
+        if abs(median_interval - period_days) > tolerance:
+            continue
+        regular = sum(1 for interval in intervals if abs(interval - period_days) <= tolerance)
+        regularity = regular / len(intervals)
+        if regularity >= float(settings['min_regularity']):
+            return name, period_days, median_interval, regularity
+        return None
+
+    return None
+
+
+def analyze_group(group_key: str, rows: List, settings: Dict[str, Any], today: Optional[datetime] = None) -> List[RecurringPayment]:
+    """Recurring series among the transactions of one key"""
+    today = today or datetime.now()
+    min_occurrences = int(settings['min_occurrences'])
+    if len(rows) < min_occurrences:
+        return []
+
+    direction, currency, _ = group_key.split("|", 2)
+    results = []
+
+    for band in split_amount_bands(rows, float(settings['amount_band_pct'])):
+        if len(band) < min_occurrences:
+            continue
+        detected = detect_period([row.date.toordinal() for row in band], settings)
+        if detected is None:
+            continue
+
+        name, period_days, median_interval, regularity = detected
+        band.sort(key=lambda row: (row.date, row.id))
+        latest = band[-1]
+        occurrences = len({row.date.toordinal() for row in band})
+        amounts = [row.amount for row in band]
+        amounts_czk = [row.amount_czk for row in band if row.amount_czk is not None]
+        names = Counter(row.counterparty_name or row.description for row in band)
+
+        overdue = (today - latest.date).days - period_days
+        results.append(RecurringPayment(
+            group_key=group_key,
+            counterparty=names.most_common(1)[0][0],
+            direction=direction,
+            currency=currency,
+            amount=statistics.median(amounts),
+            amount_czk=statistics.median(amounts_czk) if amounts_czk else None,
+            amount_min=min(amounts),
+            amount_max=max(amounts),
+            period=name,
+            interval_days=round(median_interval, 2),
+            occurrences=occurrences,
+            confidence=round(regularity * min(1.0, occurrences / 6), 3),
+            first_date=band[0].date,
+            last_date=latest.date,
+            next_expected_date=latest.date + timedelta(days=round(period_days)),
+            is_active=overdue <= period_days / 2,
+            account_id=latest.account_id,
+            last_transaction_id=latest.id,
+            category_tier1=latest.category_tier1,
+            category_tier2=latest.category_tier2,
+            category_tier3=latest.category_tier3,
+            updated_at=datetime.utcnow()
+        ))
+
+    return results
+
+
+def _group_rows(rows: Iterable) -> Dict[str, List]:
+    groups: Dict[str, List] = {}
+    for row in rows:
+        if row.recurring_key:
+            groups.setdefault(row.recurring_key, []).append(row)
+    return groups
+
+
+def refresh_groups(db: Session, group_keys: Set[str], settings: Optional[Dict[str, Any]] = None) -> Dict[str, int]:
+    """
+    Re-evaluate the given keys and replace their recurring_payments rows.
+
+    Returns:
+        Stats: groups, transactions, recurring
+    """
+    settings = settings or load_recurring_settings()
+    stats = {"groups": 0, "transactions": 0, "recurring": 0}
+    keys = sorted(key for key in group_keys if key)
+
+    for start in range(0, len(keys), 500):
+        chunk = keys[start:start + 500]
+        rows = db.query(*_GROUP_COLUMNS).filter(
+            Transaction.recurring_key.in_(chunk),
+            Transaction.is_internal_transfer.isnot(True)
+        ).all()
+        stats["transactions"] += len(rows)
+
+        db.query(RecurringPayment).filter(RecurringPayment.group_key.in_(chunk)).delete(synchronize_session=False)
+        for group_key, group_rows in _group_rows(rows).items():
+            results = analyze_group(group_key, group_rows, settings)
+            db.add_all(results)
+            stats["recurring"] += len(results)
+        stats["groups"] += len(chunk)
+
+    db.commit()
+    return stats
+
+
+def assign_recurring_keys(db: Session, transaction_ids: Optional[List[str]] = None, chunk_size: int = 5000) -> Set[str]:
+    """
+    Compute recurring_key of the given transactions (None = those without a key).
+
+    Returns:
+        Keys touched: the new keys and any key a transaction moved away from
+    """
+    touched: Set[str] = set()
+    query = db.query(
+        Transaction.id, Transaction.counterparty_name, Transaction.description,
+        Transaction.amount, Transaction.currency, Transaction.recurring_key
+    )
+
+    if transaction_ids is None:
+        batches = [query.filter(Transaction.recurring_key.is_(None)).all()]
+    else:
+        batches = (
+            query.filter(Transaction.transaction_id.in_(transaction_ids[start:start + 500])).all()
+            for start in range(0, len(transaction_ids), 500)
+        )
+
+    updates = []
+    for rows in batches:
+        for row in rows:
+            key = recurring_key(row.counterparty_name, row.description, row.amount, row.currency)
+            if key != row.recurring_key:
+                updates.append({"id": row.id, "recurring_key": key})
+                if row.recurring_key:
+                    touched.add(row.recurring_key)
+            touched.add(key)
+
+    for start in range(0, len(updates), chunk_size):
+        db.bulk_update_mappings(Transaction, updates[start:start + chunk_size])
+    db.commit()
+
+    touched.discard("")
+    return touched
+
+
+def detect_recurring_for_import(db: Session, transaction_ids: List[str]) -> Dict[str, int]:
+    """
+    Incremental detection after an import: only the keys of the imported transactions.
+
+    Transactions without a key (history from before recurring detection, rows
+    added outside imports) are keyed first and their groups refreshed too, so a
+    group is never re-evaluated from the imported rows alone. On an existing
+    database the first import after the upgrade therefore rebuilds every group.
+
+    Args:
+        db: Database session
+        transaction_ids: transaction_id values written by the import
+    """
+    settings = load_recurring_settings()
+    if not settings['enabled'] or not transaction_ids:
+        return {"groups": 0, "transactions": 0, "recurring": 0}
+
+    touched = assign_recurring_keys(db)
+    touched |= assign_recurring_keys(db, transaction_ids)
+    return refresh_groups(db, touched, settings)
+
+
+def rebuild_recurring_payments(db: Session, settings: Optional[Dict[str, Any]] = None) -> Dict[str, int]:
+    """
+    Full run: key every transaction without one and rebuild recurring_payments.
+
+    Returns:
+        Stats: groups, transactions, recurring
+    """
+    settings = settings or load_recurring_settings()
+    assign_recurring_keys(db)
+
+    rows = db.query(*_GROUP_COLUMNS).filter(
+        Transaction.recurring_key.isnot(None),
+        Transaction.recurring_key != "",
+        Transaction.is_internal_transfer.isnot(True)
+    ).all()
+    groups = _group_rows(rows)
+
+    db.query(RecurringPayment).delete(synchronize_session=False)
+    recurring = 0
+    for group_key, group_rows in groups.items():
+        results = analyze_group(group_key, group_rows, settings)
+        db.add_all(results)
+        recurring += len(results)
+    db.commit()
+
+    logger.info(f"Recurring payments: {recurring} series in {len(groups)} groups ({len(rows)} transactions)")
+    return {"groups": len(groups), "transactions": len(rows), "recurring": recurring}
+
+
+def main():
+    """Rebuild recurring_payments from the whole transaction history"""
+    import argparse
+    import time
+    from backend.database.connection import get_db_context, init_db
+
+    parser = argparse.ArgumentParser(description="Rebuild the recurring payments table")
+    parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    init_db()
+
+    start = time.perf_counter()
+    with get_db_context() as db:
+        stats = rebuild_recurring_payments(db)
+    print(
+        f"{stats['recurring']} recurring payments in {stats['groups']} groups "
+        f"({stats['transactions']} transactions, {time.perf_counter() - start:.1f}s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+"""
+Internal transfer pairing - links the two legs of a transfer between own accounts.
+
+Per-transaction detection (TransactionCategorizer._is_internal_transfer)
+needs the counterparty account, which some statements don't carry (e.g. a
+Wise top-up from ČSOB). Pairing instead looks for a debit on one account and
+a credit of the same amount on another account within a few days:
+
+- same currency: amounts must match within amount_tolerance (absolute)
+- different currencies: amount_czk must match within fx_tolerance_pct,
+  since both legs were converted at the CNB rate, not the bank's
+
+Amounts alone pair card payments with unrelated refunds, so only legs that
+look like a transfer are considered (TransferEvidence): both accounts known,
+the counterparty account one of the own accounts, a transfer keyword in the
+description, type or counterparty name, or no counterparty at all. Rows that
+rules, AI or a manual edit categorized are never touched, and a debit pairs
+only when it has exactly one candidate credit that has no other candidate
+debit.
+
+Credits are indexed by (date, abs amount_czk); each debit bisects to its
+amount range on every day of its window, so a run over n transactions is
+O(n log n). Both legs get the same transfer_pair_id and are marked as
+internal transfers; uncategorized legs also get the internal transfer
+category.
+
+Settings: categorization.yaml -> internal_transfers.pairing
+"""
+import logging
+import re
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from backend.database.models import Transaction
+from backend.database.repositories.transaction_repo import TransactionRepository
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAIRING_SETTINGS: Dict[str, Any] = {
+    "enabled": True,
+    "date_window_days": 3,
+    "amount_tolerance": 1.0,
+    "fx_tolerance_pct": 2.0,
+}
+
+# Sources a pairing may recategorize (rules and manual edits are kept)
+RECATEGORIZE_SOURCES = (None, "", "uncategorized")
+# Sources of the legs pairing considers: the above plus transfers found by the categorizer
+PAIRABLE_SOURCES = ("", "uncategorized", "internal_transfer")
+
+
+class TransferEvidence:
+    """
+    Whether a transaction looks like one leg of a transfer between own accounts.
+
+    Evidence is any of: the counterparty account is an own account (exact or
+    base number without bank code), a transfer keyword (internal_transfers
+    description_keywords, used here even when that detection method is off)
+    in the description, transaction type or counterparty name, or no
+    counterparty at all. A counterparty account that isn't an own account and
+    the internal_transfers exclusions rule a transaction out.
+    """
+
+    def __init__(self, categorization_config: Dict[str, Any], own_accounts: Iterable[str]):
+        transfer_config = categorization_config.get('internal_transfers') or {}
+        exclusions = transfer_config.get('exclusions') or {}
+        self.excluded_names = frozenset(exclusions.get('counterparty_names') or [])
+        self.excluded_types = frozenset(exclusions.get('transaction_types') or [])
+
+        self.own_accounts = frozenset(own_accounts)
+        self.own_bases = frozenset(account.split('/')[0] for account in self.own_accounts)
+
+        keywords = {
+            keyword
+            for method in transfer_config.get('detection_methods') or []
+            if method.get('type') == 'description_keywords'
+            for keyword in method.get('keywords') or [] if keyword
+        }
+        self.keyword_pattern = re.compile(
+            '|'.join(re.escape(keyword) for keyword in sorted(keywords, key=len, reverse=True)), re.IGNORECASE
+        ) if keywords else None
+
+    def __call__(self, row) -> bool:
+        name = row.counterparty_name or ''
+        if name in self.excluded_names or (row.transaction_type or '') in self.excluded_types:
+            return False
+
+        counterparty = row.counterparty_account
+        if counterparty:
+            return counterparty in self.own_accounts or counterparty.split('/')[0] in self.own_bases
+
+        if self.keyword_pattern and any(
+            self.keyword_pattern.search(text) for text in (row.description, row.transaction_type, name) if text
+        ):
+            return True
+
+        return not name
+
+
+class TransferLeg:
+    """The fields of a transaction that pairing looks at"""
+    __slots__ = ("id", "account_id", "day", "amount", "currency", "abs_czk")
+
+    def __init__(self, id: int, account_id: Optional[int], day: int,
+                 amount: float, currency: str, abs_czk: float):
+        self.id = id
+        self.account_id = account_id
+        self.day = day  # date.toordinal()
+        self.amount = amount
+        self.currency = currency
+        self.abs_czk = abs_czk
+
+    @classmethod
+    def from_row(cls, row) -> "TransferLeg":
+        return cls(
+            id=row.id,
+            account_id=row.account_id,
+            day=row.date.toordinal(),
+            amount=float(row.amount),
+            currency=row.currency,
+            abs_czk=abs(float(row.amount_czk))
+        )
+
+
+def load_pairing_settings(categorization_config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """internal_transfers.pairing merged over the defaults"""
+    if categorization_config is None:
+        from backend.services.pipeline_context import get_pipeline_context
+        categorization_config = get_pipeline_context().categorization_config()
+
+    settings = (categorization_config.get('internal_transfers') or {}).get('pairing') or {}
+    return {**DEFAULT_PAIRING_SETTINGS, **settings}
+
+
+def match_transfer_legs(legs: Iterable[TransferLeg], settings: Dict[str, Any]) -> List[Tuple[TransferLeg, TransferLeg]]:
+    """
+    Pair debits with credits on other known accounts.
+
+    A debit is paired only with its single candidate credit, and only if no
+    other debit has that credit as a candidate: when several legs match each
+    other the amounts don't tell which belong together, so none is paired.
+
+    Returns:
+        (debit, credit) pairs
+    """
+    window = int(settings['date_window_days'])
+    amount_tolerance = float(settings['amount_tolerance'])
+    fx_tolerance = float(settings['fx_tolerance_pct']) / 100
+
+    debits = []
+    credits = []
+    for leg in legs:
+        if leg.account_id is None:
+            continue
+        if leg.amount < 0:
+            debits.append(leg)
+        elif leg.amount > 0:
+            credits.append(leg)
+
+    # Credits of each day, sorted by amount: a debit bisects only the days
+    # inside its window instead of every credit of a similar amount
+    credits_by_day: Dict[int, List[TransferLeg]] = {}
+    for leg in sorted(credits, key=lambda leg: (leg.abs_czk, leg.id)):
+        credits_by_day.setdefault(leg.day, []).append(leg)
+    amounts_by_day = {day: [leg.abs_czk for leg in day_credits] for day, day_credits in credits_by_day.items()}
+
+    candidates: Dict[int, List[TransferLeg]] = {}  # debit id -> matching credits
+    debits_per_credit: Dict[int, int] = {}
+    for debit in debits:
+        amount = debit.abs_czk
+        max_difference = amount * fx_tolerance + amount_tolerance
+        matches = []
+
+        for day in range(debit.day - window, debit.day + window + 1):
+            day_credits = credits_by_day.get(day)
+            if not day_credits:
+                continue
+            amounts = amounts_by_day[day]
+
+            for index in range(bisect_left(amounts, amount - max_difference),
+                               bisect_right(amounts, amount + max_difference)):
+                credit = day_credits[index]
+                if credit.account_id == debit.account_id:
+                    continue
+                if credit.currency == debit.currency and abs(credit.amount + debit.amount) > amount_tolerance:
+                    continue
+                matches.append(credit)
+
+        if matches:
+            candidates[debit.id] = matches
+            for credit in matches:
+                debits_per_credit[credit.id] = debits_per_credit.get(credit.id, 0) + 1
+
+    pairs = []
+    for debit in sorted(debits, key=lambda leg: (leg.day, leg.id)):
+        matches = candidates.get(debit.id)
+        if matches and len(matches) == 1 and debits_per_credit[matches[0].id] == 1:
+            pairs.append((debit, matches[0]))
+
+    return pairs
+
+
+def pair_transfers(
+    db: Session,
+    from_date: Optional[date] = None,
+    to_date: Optional[date] = None,
+    settings: Optional[Dict[str, Any]] = None,
+    categorization_config: Optional[Dict[str, Any]] = None,
+    own_accounts: Optional[Iterable[str]] = None
+) -> Dict[str, int]:
+    """
+    Pair unpaired transactions dated between from_date and to_date.
+
+    Args:
+        db: Database session (committed on success)
+        from_date: First date to consider (None = no limit)
+        to_date: Last date to consider (None = no limit)
+        settings: Pairing settings (default: categorization.yaml)
+        categorization_config: Parsed categorization.yaml (for settings, keywords, exclusions and the transfer category)
+        own_accounts: Own account numbers (default: accounts.yaml)
+
+    Returns:
+        Stats: candidates, pairs, recategorized
+    """
+    if categorization_config is None or own_accounts is None:
+        from backend.services.pipeline_context import get_pipeline_context
+        context = get_pipeline_context()
+        if categorization_config is None:
+            categorization_config = context.categorization_config()
+        if own_accounts is None:
+            own_accounts = context.own_accounts()
+    settings = settings or load_pairing_settings(categorization_config)
+
+    stats = {"candidates": 0, "pairs": 0, "recategorized": 0}
+    if not settings['enabled']:
+        return stats
+
+    query = db.query(
+        Transaction.id, Transaction.account_id, Transaction.date,
+        Transaction.amount, Transaction.currency, Transaction.amount_czk,
+        Transaction.counterparty_account, Transaction.counterparty_name,
+        Transaction.transaction_type, Transaction.description
+    ).filter(
+        Transaction.transfer_pair_id.is_(None),
+        Transaction.account_id.isnot(None),
+        Transaction.amount_czk.isnot(None),
+        Transaction.amount != 0,
+        or_(Transaction.categorization_source.is_(None), Transaction.categorization_source.in_(PAIRABLE_SOURCES))
+    )
+    if from_date:
+        query = query.filter(Transaction.date >= datetime.combine(from_date, datetime.min.time()))
+    if to_date:
+        query = query.filter(Transaction.date < datetime.combine(to_date + timedelta(days=1), datetime.min.time()))
+
+    evidence = TransferEvidence(categorization_config, own_accounts)
+    legs = [TransferLeg.from_row(row) for row in query if evidence(row)]
+    stats["candidates"] = len(legs)
+
+    pairs = match_transfer_legs(legs, settings)
+    if not pairs:
+        return stats
+
+    category = (categorization_config.get('internal_transfers') or {}).get('category') or {}
+    transfer_category = {
+        "category_tier1": category.get('tier1', 'Transfers'),
+        "category_tier2": category.get('tier2', 'Internal Transfer'),
+        "category_tier3": category.get('tier3', 'Between Own Accounts'),
+    }
+
+    pair_ids = {}
+    for debit, credit in pairs:
+        pair_id = f"TRF_{min(debit.id, credit.id)}_{max(debit.id, credit.id)}"
+        pair_ids[debit.id] = pair_id
+        pair_ids[credit.id] = pair_id
+
+    ids = list(pair_ids)
+    for start in range(0, len(ids), 500):
+        for txn in db.query(Transaction).filter(Transaction.id.in_(ids[start:start + 500])):
+            txn.transfer_pair_id = pair_ids[txn.id]
+            txn.is_internal_transfer = True
+            if txn.categorization_source in RECATEGORIZE_SOURCES:
+                for key, value in transfer_category.items():
+                    setattr(txn, key, value)
+                txn.categorization_source = 'internal_transfer'
+                stats["recategorized"] += 1
+
+    db.commit()
+    stats["pairs"] = len(pairs)
+    logger.info(f"Paired {len(pairs)} internal transfers among {len(legs)} candidates")
+    return stats
+
+
+def pair_transfers_for_import(db: Session, transaction_ids: List[str]) -> Dict[str, int]:
+    """
+    Incremental pairing after an import.
+
+    Only the date range of the imported transactions, widened by the date
+    window, is considered, so existing unpaired transactions can pair with
+    the new ones without rescanning the whole table.
+
+    Args:
+        db: Database session
+        transaction_ids: transaction_id values written by the import
+    """
+    settings = load_pairing_settings()
+    if not settings['enabled'] or not transaction_ids:
+        return {"candidates": 0, "pairs": 0, "recategorized": 0}
+
+    first, last = TransactionRepository(db).get_date_range(transaction_ids)
+    if first is None:
+        return {"candidates": 0, "pairs": 0, "recategorized": 0}
+
+    window = timedelta(days=int(settings['date_window_days']))
+    return pair_transfers(db, (first - window).date(), (last + window).date(), settings)
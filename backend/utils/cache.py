@@ -1,6 +1,7 @@
 """Simple in-memory cache with TTL support for dashboard endpoints"""
 from functools import wraps
 from typing import Any, Callable, Optional
+import asyncio
 from datetime import datetime, timedelta
 import hashlib
 import json
@@ -20,16 +21,24 @@ class TTLCache:
     """Time-to-live cache implementation"""
     def __init__(self):
         self._cache = {}
+        # Statistics for /metrics (plain counters, may miss an increment under concurrent access)
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.cleared = 0
 
     def get(self, key: str) -> Optional[Any]:
         """Get value from cache if not expired"""
-        if key in self._cache:
-            entry = self._cache[key]
+        entry = self._cache.get(key)
+        if entry is not None:
             if not entry.is_expired():
+                self.hits += 1
                 return entry.value
             else:
-                # Clean up expired entry
-                del self._cache[key]
+                # Clean up expired entry (another thread may have removed it already)
+                if self._cache.pop(key, None) is not None:
+                    self.expired += 1
+        self.misses += 1
         return None
 
     def set(self, key: str, value: Any, ttl_seconds: int):
@@ -38,16 +47,29 @@ class TTLCache:
 
     def clear(self):
         """Clear all cache entries"""
+        self.cleared += len(self._cache)
         self._cache.clear()
 
     def clear_expired(self):
         """Remove all expired entries"""
+        # Snapshot: request threads add and evict entries while this runs
         expired_keys = [
-            key for key, entry in self._cache.items()
+            key for key, entry in list(self._cache.items())
             if entry.is_expired()
         ]
         for key in expired_keys:
-            del self._cache[key]
+            if self._cache.pop(key, None) is not None:
+                self.expired += 1
+
+    def stats(self) -> dict:
+        """Hits, misses, evicted entries (expired / cleared on invalidation) and current size"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "cleared": self.cleared,
+            "entries": len(self._cache)
+        }
 
 
 # Global cache instance
@@ -77,20 +99,36 @@ def cached(ttl_seconds: int = 300):
         ttl_seconds: Time to live in seconds (default: 300 = 5 minutes)
     """
     def decorator(func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                # Generate cache key
+                cache_key = f"{func.__name__}:{cache_key_from_params(**kwargs)}"
+
+                # Try to get from cache
+                cached_value = _dashboard_cache.get(cache_key)
+                if cached_value is not None:
+                    return cached_value
+
+                # Call original function
+                result = await func(*args, **kwargs)
+
+                # Store in cache
+                _dashboard_cache.set(cache_key, result, ttl_seconds)
+
+                return result
+            return async_wrapper
+
+        # Sync endpoints stay sync so FastAPI runs them in its threadpool
         @wraps(func)
-        async def wrapper(*args, **kwargs):
-            # Generate cache key
+        def wrapper(*args, **kwargs):
             cache_key = f"{func.__name__}:{cache_key_from_params(**kwargs)}"
 
-            # Try to get from cache
             cached_value = _dashboard_cache.get(cache_key)
             if cached_value is not None:
                 return cached_value
 
-            # Call original function
-            result = await func(*args, **kwargs)
-
-            # Store in cache
+            result = func(*args, **kwargs)
             _dashboard_cache.set(cache_key, result, ttl_seconds)
 
             return result
@@ -103,6 +141,11 @@ def clear_dashboard_cache():
     _dashboard_cache.clear()
 
 
+def get_dashboard_cache_stats() -> dict:
+    """Statistics of the dashboard cache"""
+    return _dashboard_cache.stats()
+
+
 def clear_expired_cache():
     """Remove expired cache entries (for periodic cleanup)"""
     _dashboard_cache.clear_expired()
@@ -0,0 +1,181 @@
+"""
+Prometheus metrics of the API: HTTP routes, SQL statements, dashboard cache
+and the import queue. Served by GET /metrics (see src/utils/metrics.py).
+
+Requests are labelled with the template of the route that handled them,
+rebuilt from the path and the matched path parameters, so the middleware
+doesn't match routes itself. In-flight requests are labelled when /metrics
+is scraped, from the scope the router has filled in by then.
+"""
+import time
+from typing import Dict, Iterable, List, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.utils.metrics import REGISTRY, counter, histogram, metric_lines
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+HTTP_LATENCY = histogram(
+    "finance_http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ("method", "route", "status")
+)
+
+# Scopes of the requests being handled, by id(scope); routes seen since start
+_IN_FLIGHT: Dict[int, dict] = {}
+_IN_FLIGHT_SEEN: Set[Tuple[str, str]] = set()
+
+SQL_DURATION = histogram(
+    "finance_sql_query_duration_seconds",
+    "SQL statement execution time by statement type",
+    ("statement",),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+SQL_ERRORS = counter(
+    "finance_sql_errors_total",
+    "SQL statements that raised an error",
+    ("statement",)
+)
+
+_SQL_STATEMENTS = frozenset({"select", "insert", "update", "delete", "pragma", "create", "alter", "drop", "with"})
+
+
+def route_template(scope) -> str:
+    """
+    Path template of the route that handled a request (/api/v1/transactions/{transaction_id}).
+
+    Rebuilt from the request path and the matched path parameters, so labels
+    stay bounded whatever ids are requested. "unmatched" if no route matched.
+    """
+    if "endpoint" not in scope:
+        return "unmatched"
+
+    path = scope["path"]
+    for name, value in (scope.get("path_params") or {}).items():
+        value = str(value)
+        if not value:
+            continue
+        if "/" in value:
+            if path.endswith(value):
+                path = path[:-len(value)] + "{" + name + "}"
+            continue
+        segments = path.split("/")
+        for index in range(len(segments) - 1, -1, -1):
+            if segments[index] == value:
+                segments[index] = "{" + name + "}"
+                break
+        path = "/".join(segments)
+    return path
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency and in-flight requests per route template.
+
+    Plain ASGI (not BaseHTTPMiddleware): per request it costs two
+    perf_counter() calls and a few dict lookups.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        _IN_FLIGHT[id(scope)] = scope
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            del _IN_FLIGHT[id(scope)]
+            HTTP_LATENCY.labels(scope["method"], route_template(scope), status).observe(time.perf_counter() - start)
+
+
+def _statement_type(statement: str) -> str:
+    verb = statement.lstrip()[:8].split(None, 1)
+    verb = verb[0].lower() if verb else ""
+    return verb if verb in _SQL_STATEMENTS else "other"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("query_start")
+    if starts:
+        SQL_DURATION.labels(_statement_type(statement)).observe(time.perf_counter() - starts.pop())
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    starts = conn.info.get("query_start") if conn is not None else None
+    if starts:
+        starts.pop()
+    SQL_ERRORS.labels(_statement_type(exception_context.statement or "")).inc()
+
+
+def instrument_engine(engine: Engine):
+    """Time every statement executed on an engine (no-op if already instrumented)"""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+def _in_flight_lines() -> List[str]:
+    """In-flight requests by the route the router picked for them (0 for routes seen before)"""
+    counts = dict.fromkeys(_IN_FLIGHT_SEEN, 0)
+    for scope in list(_IN_FLIGHT.values()):
+        key = (scope["method"], route_template(scope))
+        counts[key] = counts.get(key, 0) + 1
+    _IN_FLIGHT_SEEN.update(counts)
+    return metric_lines("finance_http_requests_in_progress", "HTTP requests being handled by route template", "gauge",
+                        [({"method": method, "route": route}, count) for (method, route), count in sorted(counts.items())])
+
+
+def _dashboard_cache_lines() -> List[str]:
+    from backend.utils.cache import get_dashboard_cache_stats
+
+    stats = get_dashboard_cache_stats()
+    lines = metric_lines("finance_dashboard_cache_hits_total", "Dashboard cache hits", "counter",
+                         [({}, stats["hits"])])
+    lines += metric_lines("finance_dashboard_cache_misses_total", "Dashboard cache misses", "counter",
+                          [({}, stats["misses"])])
+    lines += metric_lines("finance_dashboard_cache_evictions_total", "Dashboard cache entries removed", "counter",
+                          [({"reason": "expired"}, stats["expired"]), ({"reason": "cleared"}, stats["cleared"])])
+    lines += metric_lines("finance_dashboard_cache_entries", "Dashboard cache entries", "gauge",
+                          [({}, stats["entries"])])
+    return lines
+
+
+def _import_queue_lines() -> Iterable[str]:
+    from backend.services.job_queue import count_jobs_by_status
+
+    counts = count_jobs_by_status()
+    statuses = sorted(set(counts) | {"pending", "processing", "completed", "failed"})
+    return metric_lines("finance_import_jobs", "Import jobs by status", "gauge",
+                        [({"status": status}, counts.get(status, 0)) for status in statuses])
+
+
+REGISTRY.add_collector(_in_flight_lines)
+REGISTRY.add_collector(_dashboard_cache_lines)
+REGISTRY.add_collector(_import_queue_lines)
+
+
+def render_metrics() -> str:
+    """Metrics of this process (including those merged from import workers)"""
+    return REGISTRY.render()
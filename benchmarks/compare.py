@@ -0,0 +1,83 @@
+"""
+Compare two benchmark result files of benchmarks/run.py.
+
+Prints the change of every benchmark present in both files and exits with
+status 1 if any got slower than the threshold, so it can gate a commit:
+
+    python benchmarks/compare.py benchmarks/results/abc1234-....json benchmarks/results/def5678-....json
+    python benchmarks/compare.py old.json new.json --threshold 0.2 --metric median_seconds
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Parameters that change what is measured (repeat/only just change how much)
+SIZE_PARAMS = ("rows", "db_rows", "rules", "seed")
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], metric: str = "min_seconds",
+            threshold: float = 0.1) -> List[Dict[str, Any]]:
+    """
+    Relative change per benchmark.
+
+    Returns:
+        [{name, baseline, current, change, status}] where change is current/baseline - 1
+        and status is "regression", "improvement" or "ok"
+    """
+    rows = []
+    for name in sorted(set(baseline["results"]) | set(current["results"])):
+        old = baseline["results"].get(name, {}).get(metric)
+        new = current["results"].get(name, {}).get(metric)
+        if old is None or new is None:
+            rows.append({"name": name, "baseline": old, "current": new, "change": None,
+                         "status": "added" if old is None else "removed"})
+            continue
+        change = new / old - 1 if old else 0.0
+        status = "regression" if change > threshold else "improvement" if change < -threshold else "ok"
+        rows.append({"name": name, "baseline": old, "current": new, "change": change, "status": status})
+    return rows
+
+
+def _label(meta: Dict[str, Any]) -> str:
+    return f"{meta.get('commit') or '?'}{'+dirty' if meta.get('dirty') else ''} ({meta.get('timestamp', '?')})"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline", help="Result JSON of the reference commit")
+    parser.add_argument("current", help="Result JSON to check")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Relative slowdown reported as regression")
+    parser.add_argument("--metric", default="min_seconds", choices=("min_seconds", "median_seconds", "mean_seconds"))
+    args = parser.parse_args(argv)
+
+    baseline, current = load(args.baseline), load(args.current)
+    print(f"Baseline: {_label(baseline['meta'])}  {Path(args.baseline).name}")
+    print(f"Current:  {_label(current['meta'])}  {Path(args.current).name}")
+    sizes = [{key: meta.get("params", {}).get(key) for key in SIZE_PARAMS} for meta in (baseline["meta"], current["meta"])]
+    if sizes[0] != sizes[1]:
+        print(f"WARNING: results of different data sizes {sizes[0]} vs {sizes[1]}")
+    print()
+
+    rows = compare(baseline, current, args.metric, args.threshold)
+    for row in rows:
+        if row["change"] is None:
+            print(f"  {row['name']:<34} {row['status']}")
+            continue
+        print(f"  {row['name']:<34} {row['baseline'] * 1000:>10.1f} ms -> {row['current'] * 1000:>10.1f} ms  "
+              f"{row['change'] * 100:>+7.1f}%  {row['status'] if row['status'] != 'ok' else ''}")
+
+    regressions = [row for row in rows if row["status"] == "regression"]
+    print()
+    print(f"{len(regressions)} regression(s) above {args.threshold:.0%} ({args.metric})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
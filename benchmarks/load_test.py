@@ -0,0 +1,550 @@
+"""
+HTTP load test of a locally stubbed deployment.
+
+Starts `backend.app:app` with uvicorn in a throwaway deployment directory
+(copy of config/, seeded database from benchmarks/seed_db.py, its own
+data/uploads) and replays a weighted mix of user journeys with concurrent
+virtual users:
+
+    browse     page through /transactions and open a transaction
+    search     full-text search and filtered listings
+    dashboard  open the dashboard (summary, categories, trends, top counterparties, savings rate)
+    bulk       bulk-update the categories of a selection
+    upload     upload a generated ČSOB or Wise statement (imported by the worker pool)
+
+Gemini and the CNB rate service are replaced by local fake servers (the
+copied config points at them), so uploads run the full pipeline including
+AI categorization without network access or quota. A probe requests
+/api/v1/health every 100 ms during the run: a handler blocking the event
+loop shows up as a probe p99 close to that handler's duration.
+
+Reports throughput and latency percentiles per endpoint, and the outcome
+and duration of the imports started by uploads.
+
+Usage:
+    python benchmarks/load_test.py                                   # 10 users, 60 s, 100k row database
+    python benchmarks/load_test.py --users 50 --duration 300 --workers 2
+    python benchmarks/load_test.py --mix browse=50,dashboard=50 --gemini-latency-ms 800
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import requests
+import yaml
+
+from benchmarks.seed_db import AI_CATEGORY, seeded_database
+from benchmarks.synthetic import APPROX_RATES, MERCHANTS, write_csob_csv, write_wise_csv
+
+DEFAULT_MIX = {"browse": 35, "search": 20, "dashboard": 30, "bulk": 10, "upload": 5}
+DATE_RANGES = (
+    (None, None),
+    ("2023-01-01", "2023-12-31"),
+    ("2024-01-01", "2024-12-31"),
+    ("2024-07-01", "2024-09-30"),
+)
+CNB_CURRENCIES = ("1 AUD", "1 EUR", "1 GBP", "100 HUF", "100 JPY", "1 USD")
+
+
+def free_port() -> int:
+    """Pick an unused local TCP port"""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+# Fake upstream services
+
+class FakeGeminiHandler(BaseHTTPRequestHandler):
+    """generateContent answering every prompt with a valid category after a fixed latency"""
+    latency = 0.3
+    calls = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        with FakeGeminiHandler.lock:
+            FakeGeminiHandler.calls += 1
+        time.sleep(self.latency)
+        text = f"Tier1: {AI_CATEGORY[0]}\nTier2: {AI_CATEGORY[1]}\nTier3: {AI_CATEGORY[2]}\nConfidence: 90"
+        body = json.dumps({"candidates": [{"content": {"parts": [{"text": text}]}}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def cnb_year_text(year: int) -> str:
+    """CNB year.txt of a year: a fixing every weekday, rates close to APPROX_RATES"""
+    base = {"1 AUD": 15.1, "1 EUR": APPROX_RATES["EUR"], "1 GBP": APPROX_RATES["GBP"],
+            "100 HUF": 6.4, "100 JPY": 15.9, "1 USD": APPROX_RATES["USD"]}
+    rng = random.Random(year)
+    lines = ["Date|" + "|".join(CNB_CURRENCIES)]
+    day = date(year, 1, 2)
+    last = min(date(year, 12, 31), date.today())
+    while day <= last:
+        if day.weekday() < 5:
+            rates = [f"{base[currency] * (1 + rng.uniform(-0.02, 0.02)):.3f}" for currency in CNB_CURRENCIES]
+            lines.append(f"{day:%d.%m.%Y}|" + "|".join(rates))
+        day += timedelta(days=1)
+    return "\n".join(lines) + "\n"
+
+
+class FakeCNBHandler(BaseHTTPRequestHandler):
+    """year.txt?year=N with generated fixings"""
+    calls = 0
+
+    def do_GET(self):
+        FakeCNBHandler.calls += 1
+        year = parse_qs(urlparse(self.path).query).get("year", [""])[0]
+        if not year.isdigit():
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = cnb_year_text(int(year)).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fake_server(handler) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# Deployment
+
+def prepare_deployment(deploy_dir: Path, template_db: Path, gemini_url: str, cnb_url: str, gemini_rpm: int):
+    """Config copy pointing at the fake services, and a copy of the seeded database"""
+    shutil.copytree(PROJECT_ROOT / "config", deploy_dir / "config")
+    (deploy_dir / "data" / "uploads").mkdir(parents=True)
+    shutil.copyfile(template_db, deploy_dir / "data" / "finance.db")
+
+    categorization_path = deploy_dir / "config" / "categorization.yaml"
+    categorization = yaml.safe_load(categorization_path.read_text(encoding="utf-8")) or {}
+    ai = categorization.setdefault("ai_fallback", {})
+    ai.update({"enabled": True, "api_url": gemini_url, "max_retries": 1})
+    ai.setdefault("rate_limit", {}).update({"requests_per_minute": gemini_rpm, "requests_per_day": 10 ** 7})
+    categorization_path.write_text(yaml.safe_dump(categorization, allow_unicode=True, sort_keys=False), encoding="utf-8")
+
+    settings_path = deploy_dir / "config" / "settings.yaml"
+    settings = yaml.safe_load(settings_path.read_text(encoding="utf-8")) or {}
+    currency = settings.setdefault("currency", {})
+    currency["use_cnb_api"] = True
+    currency.setdefault("cnb_api", {}).update({"year_url": cnb_url, "cache_dir": "data/cache"})
+    settings_path.write_text(yaml.safe_dump(settings, allow_unicode=True, sort_keys=False), encoding="utf-8")
+
+
+def start_server(deploy_dir: Path, port: int, workers: int) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(PROJECT_ROOT), os.environ.get("PYTHONPATH")])),
+        "DATABASE_URL": f"sqlite:///{deploy_dir / 'data' / 'finance.db'}",
+        "GEMINI_API_KEY": "load-test",
+    }
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.app:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        cwd=deploy_dir, env=env, stdout=open(deploy_dir / "server.log", "wb"), stderr=subprocess.STDOUT,
+        # Own process group: uvicorn workers and import worker processes are stopped with the server
+        start_new_session=True
+    )
+
+
+def stop_server(server: subprocess.Popen, timeout: float = 30):
+    """SIGTERM the server's process group, then SIGKILL whatever is still running after `timeout`"""
+    if not hasattr(os, "killpg"):
+        server.terminate()
+        try:
+            server.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            server.kill()
+        return
+
+    def signal_group(sig) -> bool:
+        try:
+            os.killpg(server.pid, sig)
+            return True
+        except ProcessLookupError:
+            return False
+
+    signal_group(signal.SIGTERM)
+    deadline = time.time() + timeout
+    try:
+        server.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        pass
+    # Workers can outlive the uvicorn supervisor; signal 0 checks whether any are left
+    while time.time() < deadline and signal_group(0):
+        time.sleep(0.2)
+    if signal_group(signal.SIGKILL):
+        print("Server did not stop in time, killed its processes")
+    server.wait()
+
+
+def wait_ready(base_url: str, server: subprocess.Popen, timeout: float = 60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited with code {server.returncode}")
+        try:
+            if requests.get(f"{base_url}/api/v1/health", timeout=2).ok:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server not ready after {timeout:.0f}s")
+
+
+# Traffic
+
+class Stats:
+    """Latencies and errors per endpoint label"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+
+    def add(self, label: str, seconds: float, ok: bool):
+        with self.lock:
+            self.latencies.setdefault(label, []).append(seconds * 1000)
+            if not ok:
+                self.errors[label] = self.errors.get(label, 0) + 1
+
+    def report(self, duration: float) -> Dict[str, Dict[str, Any]]:
+        with self.lock:
+            items = {label: list(values) for label, values in self.latencies.items()}
+        return {
+            label: {
+                "requests": len(values),
+                "errors": self.errors.get(label, 0),
+                "rps": round(len(values) / duration, 2),
+                "p50_ms": round(percentile(values, 50), 1),
+                "p90_ms": round(percentile(values, 90), 1),
+                "p95_ms": round(percentile(values, 95), 1),
+                "p99_ms": round(percentile(values, 99), 1),
+                "max_ms": round(max(values), 1),
+            }
+            for label, values in sorted(items.items())
+        }
+
+
+class VirtualUser:
+    """One user running weighted journeys against the API until stopped"""
+
+    def __init__(self, index: int, base_url: str, args: argparse.Namespace, stats: Stats,
+                 uploads: "UploadTracker", stop: threading.Event):
+        self.rng = random.Random(args.seed * 1000 + index)
+        self.index = index
+        self.base_url = base_url
+        self.args = args
+        self.stats = stats
+        self.uploads = uploads
+        self.stop = stop
+        self.session = requests.Session()
+        self.mix = list(args.mix.items())
+
+    def request(self, label: str, method: str, path: str, **kwargs) -> Optional[requests.Response]:
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, f"{self.base_url}{path}", timeout=self.args.timeout, **kwargs)
+        except requests.RequestException:
+            self.stats.add(label, time.perf_counter() - start, False)
+            return None
+        self.stats.add(label, time.perf_counter() - start, response.status_code < 400)
+        return response
+
+    def think(self):
+        if self.args.think_ms:
+            self.stop.wait(self.rng.expovariate(1000 / self.args.think_ms))
+
+    def run(self):
+        names, weights = zip(*self.mix)
+        while not self.stop.is_set():
+            journey = self.rng.choices(names, weights=weights)[0]
+            getattr(self, f"journey_{journey}")()
+            self.think()
+
+    def journey_browse(self):
+        for _ in range(self.rng.randint(1, 4)):
+            page = self.rng.randint(0, max(0, self.args.db_rows // 50 - 1)) if self.rng.random() < 0.3 else 0
+            response = self.request("GET /transactions (page)", "GET", "/api/v1/transactions",
+                                    params={"skip": page * 50, "limit": 50})
+            self.think()
+        if response is not None and response.ok and self.rng.random() < 0.5:
+            self.request("GET /transactions/{id}", "GET",
+                         f"/api/v1/transactions/{self.rng.randint(1, self.args.db_rows)}")
+
+    def journey_search(self):
+        merchant = self.rng.choice(MERCHANTS)
+        from_date, to_date = self.rng.choice(DATE_RANGES)
+        params = {"limit": 50, "from_date": from_date, "to_date": to_date}
+        if self.rng.random() < 0.6:
+            params["search"] = merchant[0].split()[0]
+            label = "GET /transactions (search)"
+        else:
+            params.update(category_tier1=merchant[1][0], min_amount=-5000, max_amount=0)
+            label = "GET /transactions (filter)"
+        self.request(label, "GET", "/api/v1/transactions", params={k: v for k, v in params.items() if v is not None})
+
+    def journey_dashboard(self):
+        from_date, to_date = self.rng.choice(DATE_RANGES)
+        params = {k: v for k, v in {"from_date": from_date, "to_date": to_date}.items() if v}
+        for path in ("summary", "categories", "trends/monthly", "top-counterparties", "savings-rate"):
+            self.request(f"GET /dashboard/{path}", "GET", f"/api/v1/dashboard/{path}", params=params)
+
+    def journey_bulk(self):
+        ids = self.rng.sample(range(1, self.args.db_rows + 1), min(self.args.db_rows, self.rng.randint(5, 50)))
+        merchant = self.rng.choice(MERCHANTS)
+        self.request("POST /transactions/bulk-update", "POST", "/api/v1/transactions/bulk-update", json={
+            "transaction_ids": ids,
+            "updates": dict(zip(("category_tier1", "category_tier2", "category_tier3"), merchant[1]))
+        })
+
+    def journey_upload(self):
+        institution, path = self.uploads.next_file(self.rng)
+        with open(path, "rb") as f:
+            response = self.request(
+                "POST /files/upload", "POST", "/api/v1/files/upload",
+                files={"file": (path.name, f, "text/csv")}, data={"institution": institution}
+            )
+        if response is not None and response.ok:
+            self.uploads.started(response.json().get("job_id"))
+
+
+class UploadTracker:
+    """Generates a new statement per upload (different seed = different file hash) and tracks the jobs"""
+
+    def __init__(self, out_dir: Path, rows: int, seed: int):
+        self.out_dir = out_dir
+        self.rows = rows
+        self.seed = seed
+        self.lock = threading.Lock()
+        self.counter = 0
+        self.job_ids: List[str] = []
+        out_dir.mkdir(parents=True, exist_ok=True)
+
+    def next_file(self, rng: random.Random) -> Tuple[str, Path]:
+        with self.lock:
+            self.counter += 1
+            number = self.counter
+        seed = self.seed * 100000 + number
+        if rng.random() < 0.5:
+            return "csob", write_csob_csv(self.out_dir / f"csob_export_pohyby_{number}.csv", self.rows, seed)
+        return "wise", write_wise_csv(self.out_dir / f"wise_{number}.csv", self.rows, seed)
+
+    def started(self, job_id: Optional[str]):
+        if job_id:
+            with self.lock:
+                self.job_ids.append(job_id)
+
+    def summary(self, base_url: str, wait: float) -> Dict[str, Any]:
+        """Status and duration of the started imports (waits up to `wait` seconds for them to finish)"""
+        deadline = time.time() + wait
+        jobs = []
+        while True:
+            jobs = []
+            for job_id in self.job_ids:
+                try:
+                    jobs.append(requests.get(f"{base_url}/api/v1/files/jobs/{job_id}", timeout=30).json())
+                except (requests.RequestException, ValueError):
+                    jobs.append({"status": "unknown"})
+            if all(job.get("status") in ("completed", "failed", "unknown") for job in jobs) or time.time() > deadline:
+                break
+            time.sleep(1)
+
+        statuses: Dict[str, int] = {}
+        for job in jobs:
+            statuses[job.get("status")] = statuses.get(job.get("status"), 0) + 1
+        durations = [
+            (job.get("timings") or {}).get("total_seconds")
+            for job in jobs if job.get("status") == "completed"
+        ]
+        durations = [duration for duration in durations if duration is not None]
+        return {
+            "uploads": len(self.job_ids),
+            "statuses": statuses,
+            "rows_per_file": self.rows,
+            "p50_seconds": round(percentile(durations, 50), 2) if durations else None,
+            "max_seconds": round(max(durations), 2) if durations else None,
+        }
+
+
+def probe(base_url: str, stats: Stats, stop: threading.Event, interval: float = 0.1):
+    """Request /health at a fixed rate: its latency is the event loop's responsiveness"""
+    session = requests.Session()
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            ok = session.get(f"{base_url}/api/v1/health", timeout=60).ok
+        except requests.RequestException:
+            ok = False
+        stats.add("probe GET /health", time.perf_counter() - start, ok)
+        stop.wait(interval)
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"Unknown journey '{name}' (available: {', '.join(DEFAULT_MIX)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds of traffic")
+    parser.add_argument("--think-ms", type=float, default=200, help="Mean pause between a user's requests (0 = none)")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX,
+                        help="Journey weights, e.g. browse=35,search=20,dashboard=30,bulk=10,upload=5")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--db-rows", type=int, default=100000, help="Transactions in the seeded database")
+    parser.add_argument("--rules", type=int, default=200, help="Categorization rules in the seeded database")
+    parser.add_argument("--upload-rows", type=int, default=500, help="Transactions per uploaded statement")
+    parser.add_argument("--gemini-latency-ms", type=float, default=300, help="Response time of the fake Gemini")
+    parser.add_argument("--gemini-rpm", type=int, default=100000, help="AI rate limit of the stubbed deployment")
+    parser.add_argument("--import-wait", type=float, default=120, help="Seconds to wait for imports after the run")
+    parser.add_argument("--timeout", type=float, default=120, help="Request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data", default=str(PROJECT_ROOT / "benchmarks" / ".data"),
+                        help="Cache of seeded databases")
+    parser.add_argument("--output", help="Write the report as JSON")
+    parser.add_argument("--keep", action="store_true", help="Keep the deployment directory (server.log, database)")
+    args = parser.parse_args(argv)
+
+    print(f"Preparing database: {args.db_rows} transactions, {args.rules} rules...")
+    template_db = seeded_database(Path(args.data), args.db_rows, args.rules, args.seed)
+
+    FakeGeminiHandler.latency = args.gemini_latency_ms / 1000
+    gemini = start_fake_server(FakeGeminiHandler)
+    cnb = start_fake_server(FakeCNBHandler)
+
+    deploy_dir = Path(tempfile.mkdtemp(prefix="finance_load_"))
+    prepare_deployment(
+        deploy_dir, template_db,
+        gemini_url=f"http://127.0.0.1:{gemini.server_port}/v1beta",
+        cnb_url=f"http://127.0.0.1:{cnb.server_port}/year.txt",
+        gemini_rpm=args.gemini_rpm
+    )
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = start_server(deploy_dir, port, args.workers)
+    try:
+        wait_ready(base_url, server)
+        print(f"Server {base_url} ({args.workers} worker(s)), deployment in {deploy_dir}")
+        print(f"Traffic: {args.users} users for {args.duration:.0f}s, mix "
+              + ", ".join(f"{name}={weight:g}" for name, weight in args.mix.items()))
+
+        stats = Stats()
+        uploads = UploadTracker(deploy_dir / "statements", args.upload_rows, args.seed)
+        stop = threading.Event()
+        threads = [threading.Thread(target=probe, args=(base_url, stats, stop), daemon=True)]
+        threads += [
+            threading.Thread(
+                target=VirtualUser(index, base_url, args, stats, uploads, stop).run, daemon=True
+            )
+            for index in range(args.users)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        stop.wait(args.duration)
+        stop.set()
+        for thread in threads:
+            thread.join(timeout=args.timeout)
+        elapsed = time.perf_counter() - started
+
+        endpoints = stats.report(elapsed)
+        imports = uploads.summary(base_url, args.import_wait) if uploads.job_ids else None
+    finally:
+        stop_server(server)
+        gemini.shutdown()
+        cnb.shutdown()
+
+    total = sum(row["requests"] for label, row in endpoints.items() if not label.startswith("probe"))
+    errors = sum(row["errors"] for label, row in endpoints.items() if not label.startswith("probe"))
+    print()
+    print(f"{'endpoint':<34} {'req':>7} {'err':>5} {'req/s':>8} {'p50':>8} {'p90':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for label, row in endpoints.items():
+        print(f"{label:<34} {row['requests']:>7} {row['errors']:>5} {row['rps']:>8.1f} {row['p50_ms']:>8.1f} "
+              f"{row['p90_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} {row['max_ms']:>8.1f}")
+    print(f"\nTotal: {total} requests, {errors} errors, {total / elapsed:.1f} req/s (latencies in ms)")
+    print(f"Fake Gemini calls: {FakeGeminiHandler.calls}, fake CNB downloads: {FakeCNBHandler.calls}")
+    if imports:
+        print(f"Imports: {imports['uploads']} uploaded, {imports['statuses']}, "
+              f"p50 {imports['p50_seconds']}s, max {imports['max_seconds']}s per {imports['rows_per_file']} rows")
+
+    if args.output:
+        report = {
+            "meta": {
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpus": os.cpu_count(),
+                "params": {
+                    "users": args.users, "duration": args.duration, "think_ms": args.think_ms, "mix": args.mix,
+                    "workers": args.workers, "db_rows": args.db_rows, "rules": args.rules,
+                    "upload_rows": args.upload_rows, "gemini_latency_ms": args.gemini_latency_ms, "seed": args.seed
+                },
+            },
+            "total": {"requests": total, "errors": errors, "rps": round(total / elapsed, 2)},
+            "endpoints": endpoints,
+            "imports": imports,
+            "fake_services": {"gemini_calls": FakeGeminiHandler.calls, "cnb_downloads": FakeCNBHandler.calls},
+        }
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        print(f"Report: {args.output}")
+
+    if args.keep:
+        print(f"Deployment kept in {deploy_dir}")
+    else:
+        shutil.rmtree(deploy_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,463 @@
+"""
+Reproducible benchmarks of the import pipeline and the API.
+
+Runs every stage on deterministic synthetic data (benchmarks/synthetic.py)
+and a seeded database (benchmarks/seed_db.py) and writes the timings as
+JSON, so results of two commits can be compared with benchmarks/compare.py.
+
+Benchmarks (per institution where it applies):
+    parse.<institution>       FileParser on a generated export
+    normalize.<institution>   DataNormalizer (static rates, no CNB API)
+    categorize.<institution>  TransactionCategorizer with --rules rules, AI disabled
+    logging.queue.<institution>  categorize with logging at INFO to a file through the
+                              queue listener and sampled per-row DEBUG logs (the import loop)
+    logging.sync.<institution>   the same with a FileHandler on the calling thread and two
+                              INFO f-string logs per row (the previous import loop, for reference)
+    write.<institution>       DatabaseWriter into a copy of the seeded database
+    reapply_rules             POST /transactions/reapply-rules
+    dashboard.<endpoint>      GET of each dashboard endpoint, cache cleared before every call
+    recurring.rebuild         POST /dashboard/recurring/rebuild
+    transactions.list         GET /transactions of 10k rows (the bulk read path)
+    amounts.sum_cents         monthly SUM(amount_czk) per category over integer cents, read as Decimal
+    amounts.sum_real          the same over the NUMERIC/REAL columns before migration 0002 (for
+                              reference); drifted_totals counts sums that differ from the exact ones
+    amounts.migrate           Alembic upgrade of a REAL-amount copy of the database to integer cents
+
+Usage:
+    python benchmarks/run.py                                  # 10k row files, 100k row database
+    python benchmarks/run.py --rows 100000 --db-rows 1000000 --rules 1000
+    python benchmarks/run.py --only parse normalize --repeat 5
+    python benchmarks/compare.py benchmarks/results/<old>.json benchmarks/results/<new>.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from benchmarks.seed_db import seeded_database
+from benchmarks.synthetic import INSTITUTIONS, generate_file
+
+DASHBOARD_ENDPOINTS = {
+    "summary": ("/api/v1/dashboard/summary", {}),
+    "categories": ("/api/v1/dashboard/categories", {}),
+    "trends_monthly": ("/api/v1/dashboard/trends/monthly", {}),
+    "top_counterparties": ("/api/v1/dashboard/top-counterparties", {"limit": 50}),
+    "savings_rate": ("/api/v1/dashboard/savings-rate", {}),
+    "comparison": ("/api/v1/dashboard/comparison", {
+        "current_start": "2024-01-01", "current_end": "2024-12-31",
+        "previous_start": "2023-01-01", "previous_end": "2023-12-31"
+    }),
+    "category_time_series": ("/api/v1/dashboard/category-time-series", {}),
+    "recurring": ("/api/v1/dashboard/recurring", {}),
+}
+GROUPS = ("parse", "normalize", "categorize", "logging", "write", "reapply_rules", "dashboard", "recurring", "transactions",
+          "amounts")
+
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", *args], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def measure(fn: Callable[[], Any], repeat: int, setup: Optional[Callable[[], Any]] = None) -> Dict[str, Any]:
+    """Time fn repeat times (setup runs untimed before each call and its result is passed to fn)"""
+    durations = []
+    for _ in range(repeat):
+        argument = setup() if setup else None
+        start = time.perf_counter()
+        fn(argument) if setup else fn()
+        durations.append(time.perf_counter() - start)
+    return {
+        "min_seconds": round(min(durations), 6),
+        "median_seconds": round(statistics.median(durations), 6),
+        "mean_seconds": round(statistics.fmean(durations), 6),
+        "runs": [round(duration, 6) for duration in durations],
+    }
+
+
+class BenchmarkRun:
+    """Benchmarks of one invocation against a working copy of the seeded database"""
+
+    def __init__(self, args: argparse.Namespace, data_dir: Path, work_dir: Path, template_db: Path):
+        self.args = args
+        self.data_dir = data_dir
+        self.work_dir = work_dir
+        self.template_db = template_db
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self._parsed: Dict[str, list] = {}
+        self._normalized: Dict[str, list] = {}
+
+    def wanted(self, name: str) -> bool:
+        return not self.args.only or any(name == group or name.startswith(group + ".") for group in self.args.only)
+
+    def record(self, name: str, rows: int, fn: Callable, setup: Optional[Callable] = None):
+        if not self.wanted(name):
+            return
+        result = measure(fn, self.args.repeat, setup)
+        result["rows"] = rows
+        result["rows_per_sec"] = round(rows / result["min_seconds"], 1) if rows and result["min_seconds"] else None
+        self.results[name] = result
+        rate = f"{result['rows_per_sec']:>12,.0f} rows/s" if result["rows_per_sec"] else ""
+        print(f"  {name:<34} min {result['min_seconds'] * 1000:>10.1f} ms  median "
+              f"{result['median_seconds'] * 1000:>10.1f} ms  {rate}")
+
+    # Import pipeline
+
+    def institution_config(self, institution: str) -> Dict[str, Any]:
+        from backend.services.pipeline_context import get_pipeline_context
+
+        config = get_pipeline_context().institution_config(institution.replace("_xlsx", ""))
+        if institution == "partners_xlsx":
+            # The Partners config describes the CSV export; the XLSX one is parsed with the same layout
+            config = {**config, "csv_format": {**config["csv_format"], "type": "xlsx"}}
+        return config
+
+    def parsed(self, institution: str) -> list:
+        if institution not in self._parsed:
+            from src.core.parser import FileParser
+
+            path = generate_file(institution, self.args.rows, self.data_dir, self.args.seed)
+            parser = FileParser(self.institution_config(institution))
+            self._parsed[institution] = parser.parse_file(str(path), original_filename=path.name)
+        return self._parsed[institution]
+
+    def normalized(self, institution: str) -> list:
+        if institution not in self._normalized:
+            self._normalized[institution] = self.normalizer(institution).normalize_transactions(
+                self.parsed(institution), f"{institution}_benchmark"
+            )
+        return self._normalized[institution]
+
+    def normalizer(self, institution: str):
+        from backend.services.pipeline_context import get_pipeline_context
+        from src.core.normalizer import DataNormalizer
+        from src.utils.currency import CurrencyConverter
+
+        currency = get_pipeline_context().currency_config()
+        converter = CurrencyConverter(
+            rates=currency.get("rates", {}), base_currency=currency.get("base_currency", "CZK"), use_cnb_api=False
+        )
+        return DataNormalizer(converter, self.institution_config(institution))
+
+    def run_pipeline(self):
+        from src.core.parser import FileParser
+        from src.utils.categorizer import get_categorizer
+
+        categorizer = None
+        for institution in INSTITUTIONS:
+            if self.wanted(f"parse.{institution}"):
+                path = generate_file(institution, self.args.rows, self.data_dir, self.args.seed)
+                config = self.institution_config(institution)
+                self.record(
+                    f"parse.{institution}", self.args.rows,
+                    lambda: FileParser(config).parse_file(str(path), original_filename=path.name)
+                )
+
+            if institution == "partners_xlsx":
+                # Same rows as the Partners CSV after parsing
+                continue
+
+            if self.wanted(f"normalize.{institution}"):
+                raw = self.parsed(institution)
+                normalizer = self.normalizer(institution)
+                self.record(
+                    f"normalize.{institution}", len(raw),
+                    lambda: normalizer.normalize_transactions(raw, f"{institution}_benchmark")
+                )
+
+            if self.wanted(f"categorize.{institution}"):
+                transactions = self.normalized(institution)
+                categorizer = categorizer or get_categorizer(ai_enabled=False)
+                self.record(
+                    f"categorize.{institution}", len(transactions),
+                    lambda: [categorizer.categorize(txn.to_dict(), disable_ai=True) for txn in transactions]
+                )
+
+            if self.wanted(f"logging.queue.{institution}") or self.wanted(f"logging.sync.{institution}"):
+                categorizer = categorizer or get_categorizer(ai_enabled=False)
+                self._record_logging(institution, categorizer)
+
+            if self.wanted(f"write.{institution}"):
+                transactions = self.normalized(institution)
+                self.record(
+                    f"write.{institution}", len(transactions),
+                    lambda session: self._write(session, transactions),
+                    setup=self._fresh_write_session
+                )
+
+    def _record_logging(self, institution: str, categorizer):
+        """Categorization throughput with logging enabled at INFO, queued vs. synchronous"""
+        from src.utils.logger import LOG_DATE_FORMAT, LOG_FORMAT, configure_logging, log_row, stop_logging
+
+        transactions = self.normalized(institution)
+        total = len(transactions)
+        app_logger = logging.getLogger("finance_consolidator")
+        root = logging.getLogger()
+        log_file = self.work_dir / "logs" / f"{institution}.log"
+
+        def queued():
+            for idx, txn in enumerate(transactions):
+                txn_dict = txn.to_dict()
+                tier1, tier2, tier3, owner, is_internal, source, confidence = categorizer.categorize(
+                    txn_dict, disable_ai=True
+                )
+                log_row(app_logger, idx, total, "desc=%s, counterparty=%s -> %s > %s > %s, internal=%s, source=%s",
+                        txn_dict.get('description'), txn_dict.get('counterparty_name'), tier1, tier2, tier3,
+                        is_internal, source)
+
+        def synchronous():
+            for idx, txn in enumerate(transactions):
+                txn_dict = txn.to_dict()
+                app_logger.info(f"[{idx+1}/{total}] Processing: desc={txn_dict.get('description')}, "
+                                f"type={txn_dict.get('type')}, counterparty={txn_dict.get('counterparty_name')}")
+                tier1, tier2, tier3, owner, is_internal, source, confidence = categorizer.categorize(
+                    txn_dict, disable_ai=True
+                )
+                app_logger.info(f"[{idx+1}/{total}] Result: Tier1={tier1}, Tier2={tier2}, Tier3={tier3}, "
+                                f"internal={is_internal}, source={source}")
+
+        logging.disable(logging.NOTSET)
+        try:
+            configure_logging({"level": "INFO", "file": str(log_file), "console": False})
+            try:
+                self.record(f"logging.queue.{institution}", total, queued)
+            finally:
+                stop_logging()
+
+            handler = logging.FileHandler(log_file, encoding="utf-8")
+            handler.setFormatter(logging.Formatter(LOG_FORMAT, datefmt=LOG_DATE_FORMAT))
+            for existing in list(root.handlers):
+                root.removeHandler(existing)
+            root.addHandler(handler)
+            try:
+                self.record(f"logging.sync.{institution}", total, synchronous)
+            finally:
+                root.removeHandler(handler)
+                handler.close()
+        finally:
+            logging.disable(logging.WARNING)
+
+    def _fresh_write_session(self):
+        from sqlalchemy.orm import sessionmaker
+
+        from backend.database.connection import create_db_engine
+
+        if getattr(self, "_write_engine", None) is not None:
+            self._write_engine.dispose()
+        path = self.work_dir / "write.db"
+        for suffix in ("-wal", "-shm"):
+            Path(f"{path}{suffix}").unlink(missing_ok=True)
+        shutil.copyfile(self.template_db, path)
+        self._write_engine = create_db_engine(f"sqlite:///{path}")
+        return sessionmaker(bind=self._write_engine, autoflush=False)()
+
+    @staticmethod
+    def _write(session, transactions: list):
+        from src.core.database_writer import DatabaseWriter
+
+        try:
+            DatabaseWriter(db_session=session).write_transactions(transactions, mode="append")
+        finally:
+            session.close()
+
+    # API
+
+    def run_api(self):
+        from fastapi.testclient import TestClient
+
+        from backend.app import app
+        from backend.utils.cache import clear_dashboard_cache
+
+        # No `with`: startup (and the import worker pool) is not needed
+        client = TestClient(app)
+        db_rows = self.args.db_rows
+
+        def get(path: str, params: Dict[str, Any]):
+            clear_dashboard_cache()
+            response = client.get(path, params=params)
+            response.raise_for_status()
+
+        def post(path: str, params: Optional[Dict[str, Any]] = None):
+            response = client.post(path, params=params or {})
+            response.raise_for_status()
+
+        self.record("recurring.rebuild", db_rows, lambda: post("/api/v1/dashboard/recurring/rebuild"))
+
+        for name, (path, params) in DASHBOARD_ENDPOINTS.items():
+            self.record(f"dashboard.{name}", db_rows, lambda path=path, params=params: get(path, params))
+
+        self.record(
+            "transactions.list", min(db_rows, 10000),
+            lambda: get("/api/v1/transactions", {"limit": 10000})
+        )
+
+        # Re-applies rules to the newest 10k transactions (the endpoint's own cap)
+        self.record(
+            "reapply_rules", min(db_rows, 10000),
+            lambda: post("/api/v1/transactions/reapply-rules")
+        )
+
+    # Amount storage
+
+    def run_amounts(self):
+        if not any(self.wanted(f"amounts.{name}") for name in ("sum_cents", "sum_real", "migrate")):
+            return
+        from alembic import command
+        from sqlalchemy import Numeric, column, func, select, table
+
+        from backend.database.connection import BASELINE_REVISION, alembic_config, create_db_engine, engine
+        from backend.database.types import MinorUnits
+
+        # REAL-amount copy: the template (integer cents) downgraded to the baseline schema
+        real_db = self.work_dir / "real.db"
+        shutil.copyfile(self.template_db, real_db)
+        real_engine = create_db_engine(f"sqlite:///{real_db}")
+        with real_engine.begin() as conn:
+            config = alembic_config(conn)
+            command.stamp(config, "head")
+            command.downgrade(config, BASELINE_REVISION)
+        with real_engine.begin() as conn:
+            # Copies of the file below must not miss rows still in the WAL
+            conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+
+        def monthly_totals(bind, amount_type):
+            transactions = table("transactions", column("date"), column("category_tier1"),
+                                 column("amount_czk", amount_type))
+            month = func.strftime("%Y-%m", transactions.c.date)
+            query = (
+                select(month, transactions.c.category_tier1, func.sum(transactions.c.amount_czk))
+                .group_by(month, transactions.c.category_tier1)
+            )
+            with bind.connect() as conn:
+                return {(row[0], row[1]): row[2] for row in conn.execute(query)}
+
+        db_rows = self.args.db_rows
+        try:
+            self.record("amounts.sum_cents", db_rows, lambda: monthly_totals(engine, MinorUnits()))
+            self.record("amounts.sum_real", db_rows, lambda: monthly_totals(real_engine, Numeric(15, 2)))
+            if "amounts.sum_real" in self.results:
+                # Raw float sums, as the dashboard got them where no Decimal conversion rounded them
+                exact = monthly_totals(engine, MinorUnits())
+                drifted = sum(
+                    1 for key, total in monthly_totals(real_engine, Numeric(15, 2, asdecimal=False)).items()
+                    if total != float(exact[key])
+                )
+                self.results["amounts.sum_real"]["drifted_totals"] = drifted
+                print(f"  {'':<34} {drifted} of {len(exact)} REAL totals differ from the exact sum")
+
+            self.record(
+                "amounts.migrate", db_rows,
+                lambda migrate_engine: self._migrate(migrate_engine),
+                setup=lambda: self._fresh_copy(real_db, "migrate.db")
+            )
+        finally:
+            real_engine.dispose()
+
+    def _fresh_copy(self, source: Path, name: str):
+        from backend.database.connection import create_db_engine
+
+        path = self.work_dir / name
+        for suffix in ("-wal", "-shm"):
+            Path(f"{path}{suffix}").unlink(missing_ok=True)
+        shutil.copyfile(source, path)
+        return create_db_engine(f"sqlite:///{path}")
+
+    def _migrate(self, migrate_engine):
+        from alembic import command
+
+        from backend.database.connection import alembic_config
+
+        try:
+            with migrate_engine.begin() as conn:
+                command.upgrade(alembic_config(conn), "head")
+        finally:
+            migrate_engine.dispose()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000, help="Transactions per generated statement")
+    parser.add_argument("--db-rows", type=int, default=100000, help="Transactions in the seeded database")
+    parser.add_argument("--rules", type=int, default=200, help="Categorization rules in the seeded database")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", nargs="*", choices=GROUPS, help="Run only these benchmark groups")
+    parser.add_argument("--data", default=str(PROJECT_ROOT / "benchmarks" / ".data"),
+                        help="Cache of generated statements and databases")
+    parser.add_argument("--output", help="Result JSON (default: benchmarks/results/<commit>-<timestamp>.json)")
+    args = parser.parse_args(argv)
+
+    os.chdir(PROJECT_ROOT)
+    data_dir = Path(args.data)
+    started = datetime.now()
+
+    work_dir = Path(tempfile.mkdtemp(prefix="finance_bench_"))
+    # Must be set before backend.database.connection is imported (building the template imports it)
+    os.environ["DATABASE_URL"] = f"sqlite:///{work_dir / 'finance.db'}"
+
+    print(f"Preparing database: {args.db_rows} transactions, {args.rules} rules...")
+    template_db = seeded_database(data_dir, args.db_rows, args.rules, args.seed)
+    shutil.copyfile(template_db, work_dir / "finance.db")
+    logging.disable(logging.WARNING)
+
+    from backend.database.connection import engine, init_db
+    init_db()
+
+    run = BenchmarkRun(args, data_dir, work_dir, template_db)
+    try:
+        print(f"Pipeline ({args.rows} rows per statement, {args.repeat} runs):")
+        run.run_pipeline()
+        print(f"API ({args.db_rows} transactions):")
+        run.run_api()
+        print(f"Amounts ({args.db_rows} transactions):")
+        run.run_amounts()
+    finally:
+        if getattr(run, "_write_engine", None) is not None:
+            run._write_engine.dispose()
+        engine.dispose()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    commit = _git("rev-parse", "--short", "HEAD")
+    report = {
+        "meta": {
+            "commit": commit,
+            "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+            "timestamp": started.isoformat(timespec="seconds"),
+            "duration_seconds": round((datetime.now() - started).total_seconds(), 1),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "params": {
+                "rows": args.rows, "db_rows": args.db_rows, "rules": args.rules,
+                "repeat": args.repeat, "seed": args.seed, "only": args.only
+            },
+        },
+        "results": run.results,
+    }
+
+    output = Path(args.output) if args.output else (
+        PROJECT_ROOT / "benchmarks" / "results" / f"{commit or 'unknown'}-{started:%Y%m%d-%H%M%S}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    print(f"Results: {output}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+"""
+Seeded SQLite databases of configurable size for benchmarks.
+
+Builds a database with the schema of backend/database/models.py holding
+the three institutions, two owners, the accounts of config/accounts.yaml,
+a category tree, N categorization rules and the requested number of
+transactions (60% ČSOB, 30% Partners, 10% Wise in EUR) from the synthetic
+statement generator. Transactions are bulk inserted through SQLAlchemy
+Core, so a 1M row database takes about a minute to build.
+
+Rules are the realistic ones first (one counterparty_name_contains rule
+per known merchant / recurring payee) topped up with filler rules that
+never match, so categorization cost can be measured against rule count.
+
+Databases are cached by (rows, rules, seed) and SCHEMA: benchmarks copy
+the cached template instead of rebuilding it.
+
+Usage:
+    python benchmarks/seed_db.py --rows 100000 --rules 200 --out benchmarks/.data
+"""
+import argparse
+import json
+import random
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.synthetic import (
+    APPROX_RATES, CSOB_ACCOUNTS, INTERNAL_CATEGORY, MERCHANTS, PARTNERS_ACCOUNTS, RECURRING, generate_specs
+)
+
+INSTITUTIONS = (
+    {"code": "csob", "name": "ČSOB", "type": "bank", "country": "CZ"},
+    {"code": "partners", "name": "Partners Bank", "type": "bank", "country": "CZ"},
+    {"code": "wise", "name": "Wise", "type": "bank", "country": "GB"},
+)
+OWNERS = ("Branislav", "Mirka")
+ACCOUNT_INSTITUTIONS = {"0300": "csob", "6363": "partners"}
+
+# Share of the transactions per institution: (code, own accounts, currencies, seed offset)
+STREAMS = (
+    ("csob", CSOB_ACCOUNTS, ("CZK",), 0, 0.6),
+    ("partners", PARTNERS_ACCOUNTS, ("CZK",), 1, 0.3),
+    ("wise", (None,), ("EUR", "CZK", "USD", "GBP"), 2, 0.1),
+)
+UNCATEGORIZED = ("Uncategorized", "Needs Review", "Unknown Transaction")
+AI_CATEGORY = ("Spotreba", "Nákupy", "Ostatné")
+CHUNK_SIZE = 10000
+# Part of the cache name: change when the models change in a way old templates can't be used with
+SCHEMA = "cents"
+
+
+def database_path(out_dir: Path, rows: int, rules: int, seed: int) -> Path:
+    """Path of the cached template database of a size"""
+    return out_dir / f"finance_{rows}_{rules}_{seed}_{SCHEMA}.db"
+
+
+def _load_accounts() -> List[str]:
+    import yaml
+
+    with open("config/accounts.yaml", "r", encoding="utf-8") as f:
+        accounts = (yaml.safe_load(f) or {}).get("accounts") or {}
+    return [number for number in accounts if number.rsplit("/", 1)[-1] in ACCOUNT_INSTITUTIONS]
+
+
+def _rules(count: int) -> List[Dict]:
+    """Realistic rules first, then filler rules that match nothing"""
+    payees = [(name, category) for name, category, _, _ in MERCHANTS]
+    payees += [(name, category) for name, category, _, _ in RECURRING]
+
+    rules = []
+    for priority, (name, category) in enumerate(payees[:count]):
+        rules.append({
+            "name": f"{name[:80]}",
+            "priority": len(payees) - priority,
+            "conditions": {"counterparty_name_contains": name.split()[0]},
+            "category": category,
+        })
+
+    fillers = (
+        lambda i: {"description_contains": f"BENCH-NOMATCH-{i:05d}"},
+        lambda i: {"counterparty_name_contains": f"Nonexistent merchant {i:05d}"},
+        lambda i: {"counterparty_account_exact": f"{9000000000 + i}"},
+        lambda i: {"variable_symbol_exact": f"9{i:08d}", "amount_czk_min": -100000},
+    )
+    for index in range(count - len(rules)):
+        rules.append({
+            "name": f"Filler rule {index:05d}",
+            "priority": 0,
+            "conditions": fillers[index % len(fillers)](index),
+            "category": ("Spotreba", "Filler", f"Filler {index % 20}"),
+        })
+    return rules
+
+
+def build_database(path: Path, rows: int, rules: int = 200, seed: int = 42) -> Path:
+    """
+    Create a seeded database at path (replaced if it exists).
+
+    Args:
+        path: SQLite file to create
+        rows: Number of transactions
+        rules: Number of categorization rules
+        seed: Random seed (same seed = same database)
+    """
+    from sqlalchemy import insert
+
+    from backend.database.connection import create_db_engine
+    from backend.database.models import (
+        Account, Base, CategorizationRule, Category, Institution, Owner, Transaction
+    )
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    for suffix in ("", "-wal", "-shm"):
+        Path(f"{path}{suffix}").unlink(missing_ok=True)
+
+    engine = create_db_engine(f"sqlite:///{path}", database_settings={"profiler": {"slow_query_ms": 0}})
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(seed)
+    now = datetime(2025, 1, 1)
+
+    with engine.begin() as conn:
+        institution_ids = {}
+        for institution in INSTITUTIONS:
+            institution_ids[institution["code"]] = conn.execute(
+                insert(Institution).values(**institution, is_active=True, created_at=now)
+            ).inserted_primary_key[0]
+
+        owner_ids = [
+            conn.execute(insert(Owner).values(name=name, display_name=name, is_active=True, created_at=now))
+            .inserted_primary_key[0]
+            for name in OWNERS
+        ]
+
+        account_ids = {}
+        for index, number in enumerate(_load_accounts()):
+            code = ACCOUNT_INSTITUTIONS[number.rsplit("/", 1)[-1]]
+            account_ids[number] = (conn.execute(insert(Account).values(
+                account_number=number, account_name=f"{code} {index + 1}", institution_id=institution_ids[code],
+                owner_id=owner_ids[index % len(owner_ids)], is_active=True, created_at=now
+            )).inserted_primary_key[0], owner_ids[index % len(owner_ids)])
+
+        categories = {merchant[1] for merchant in MERCHANTS} | {payee[1] for payee in RECURRING}
+        categories |= {INTERNAL_CATEGORY, AI_CATEGORY}
+        conn.execute(insert(Category), [
+            {"tier1": t1, "tier2": t2, "tier3": t3, "is_active": True, "created_at": now}
+            for t1, t2, t3 in sorted(categories)
+        ])
+
+        rule_rows = _rules(rules)
+        if rule_rows:
+            conn.execute(insert(CategorizationRule), [
+                {
+                    "name": rule["name"], "description": "Benchmark rule", "priority": rule["priority"],
+                    "is_active": True, "conditions": json.dumps(rule["conditions"], ensure_ascii=False),
+                    "category_tier1": rule["category"][0], "category_tier2": rule["category"][1],
+                    "category_tier3": rule["category"][2], "mark_as_internal": False,
+                    "created_by": "benchmark", "created_at": now, "updated_at": now
+                }
+                for rule in rule_rows
+            ])
+
+    allocated = 0
+    for position, (code, own_accounts, currencies, offset, share) in enumerate(STREAMS):
+        count = rows - allocated if position == len(STREAMS) - 1 else int(rows * share)
+        allocated += count
+        chunk: List[Dict] = []
+        for spec in generate_specs(count, seed + offset, own_accounts, currencies):
+            chunk.append(_transaction_row(spec, code, institution_ids[code], account_ids, owner_ids, rng, offset))
+            if len(chunk) >= CHUNK_SIZE:
+                with engine.begin() as conn:
+                    conn.execute(insert(Transaction), chunk)
+                chunk = []
+        if chunk:
+            with engine.begin() as conn:
+                conn.execute(insert(Transaction), chunk)
+
+    with engine.begin() as conn:
+        conn.exec_driver_sql("ANALYZE")
+        conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+    engine.dispose()
+    return path
+
+
+def _transaction_row(spec, code: str, institution_id: int, account_ids: Dict, owner_ids: List[int],
+                     rng: random.Random, stream: int) -> Dict:
+    account_id, owner_id = account_ids.get(spec.account, (None, owner_ids[0]))
+    category, source, confidence = spec.category, "manual_rule", None
+    if spec.internal:
+        source = "internal_transfer"
+    elif not any(category):
+        if rng.random() < 0.3:
+            category, source, confidence = AI_CATEGORY, "ai", rng.randint(60, 95)
+        else:
+            category, source = UNCATEGORIZED, "uncategorized"
+
+    amount = float(spec.amount)
+    rate = APPROX_RATES.get(spec.currency, 1.0)
+    return {
+        "transaction_id": f"TXN_{spec.date:%Y%m%d}_{stream:x}{spec.index:07x}",
+        "date": spec.date,
+        "description": spec.message,
+        "amount": amount,
+        "currency": spec.currency,
+        "amount_czk": round(amount * rate, 2),
+        "exchange_rate": rate,
+        "category_tier1": category[0],
+        "category_tier2": category[1],
+        "category_tier3": category[2],
+        "is_internal_transfer": spec.internal,
+        "categorization_source": source,
+        "ai_confidence": confidence,
+        "account_id": account_id,
+        "institution_id": institution_id,
+        "owner_id": owner_id,
+        "transaction_type": spec.transaction_type,
+        "counterparty_account": spec.counterparty_account,
+        "counterparty_name": spec.counterparty_name,
+        "counterparty_bank": spec.counterparty_bank,
+        "variable_symbol": spec.variable_symbol,
+        "source_file": f"{code}_benchmark",
+        "processed_date": spec.date,
+        "synced_to_sheets": False,
+    }
+
+
+def seeded_database(out_dir: Path, rows: int, rules: int = 200, seed: int = 42) -> Path:
+    """Cached template database of a size (built on first use)"""
+    path = database_path(out_dir, rows, rules, seed)
+    if path.exists():
+        return path
+    partial = path.with_suffix(".partial")
+    build_database(partial, rows, rules, seed)
+    partial.replace(path)
+    return path
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000, help="Transactions")
+    parser.add_argument("--rules", type=int, default=200, help="Categorization rules")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="benchmarks/.data", help="Output directory")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild even if a cached database exists")
+    args = parser.parse_args(argv)
+
+    out_dir = Path(args.out)
+    if args.rebuild:
+        database_path(out_dir, args.rows, args.rules, args.seed).unlink(missing_ok=True)
+    started = datetime.now()
+    path = seeded_database(out_dir, args.rows, args.rules, args.seed)
+    print(f"{args.rows} transactions, {args.rules} rules -> {path} ({(datetime.now() - started).total_seconds():.1f}s)")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,389 @@
+"""
+Deterministic synthetic bank statements for benchmarks.
+
+Generates exports in the formats described by config/institutions/:
+
+    ČSOB      csob_export_pohyby_<n>.csv          (title + empty row + header, ';', "1 234,50", 31.10.2025)
+    Partners  vypis_1330299329_<from>_<to>.csv    (';', "1 234,50", 27. 10. 2025, Odchozí/Příchozí)
+              vypis_1330299329_<from>_<to>.xlsx   (the same rows, ';'-joined and spread over columns A-D)
+    Wise      wise_<n>.csv                        (',' CSV, IN/OUT direction, 2025-10-31 12:00:00)
+
+The same seed always produces the same files. Transactions follow a
+realistic mix: a long tail of card payments at a Zipf-distributed set of
+merchants, monthly recurring payments (rent, salary, subscriptions,
+utilities) and internal transfers between the accounts of accounts.yaml.
+
+Usage:
+    python benchmarks/synthetic.py --institution csob --rows 100000 --out benchmarks/.data
+    python benchmarks/synthetic.py --institution all --rows 10000
+"""
+import argparse
+import csv
+import random
+import sys
+import zlib
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+# partners_xlsx: the XLSX variant of the Partners export (parsed with format type xlsx)
+INSTITUTIONS = ("csob", "partners", "partners_xlsx", "wise")
+
+START_DATE = datetime(2023, 1, 1)
+TRANSACTIONS_PER_DAY = 25
+
+# Own accounts (config/accounts.yaml and the institution owner mappings)
+CSOB_ACCOUNT = "210621040/0300"
+CSOB_ACCOUNTS = ("210621040/0300", "243160770/0300", "283337817/0300")
+PARTNERS_ACCOUNT_NUMBER = "1330299329"
+PARTNERS_ACCOUNTS = ("1330299329/6363", "3581422554/6363", "2106210400/6363")
+
+BANK_CODES = ("0100", "0300", "0600", "0800", "2010", "2700", "3030", "5500", "6210", "6363")
+
+# name, category (tier1, tier2, tier3), amount range in CZK, weight
+MERCHANTS: Tuple[Tuple[str, Tuple[str, str, str], Tuple[float, float], float], ...] = (
+    ("Albert", ("Spotreba", "Potraviny", "Supermarket"), (80, 2500), 40),
+    ("Lidl Česká republika v.o.s.", ("Spotreba", "Potraviny", "Supermarket"), (60, 3000), 35),
+    ("Billa", ("Spotreba", "Potraviny", "Supermarket"), (50, 1800), 30),
+    ("Kaufland", ("Spotreba", "Potraviny", "Supermarket"), (100, 3500), 25),
+    ("Tesco Stores ČR a.s.", ("Spotreba", "Potraviny", "Supermarket"), (70, 2800), 20),
+    ("Rohlik.cz", ("Spotreba", "Potraviny", "Online nákup"), (400, 4500), 15),
+    ("DM drogerie markt", ("Spotreba", "Drogéria", "Drogéria"), (50, 900), 12),
+    ("Rossmann", ("Spotreba", "Drogéria", "Drogéria"), (40, 800), 10),
+    ("Dr.Max Lékárna", ("Zdravie", "Lekáreň", "Lieky"), (90, 1500), 8),
+    ("Benzina", ("Doprava", "Auto", "Palivo"), (800, 2500), 10),
+    ("Shell", ("Doprava", "Auto", "Palivo"), (900, 2700), 9),
+    ("Bolt", ("Doprava", "Taxi", "Taxi"), (90, 600), 12),
+    ("Uber", ("Doprava", "Taxi", "Taxi"), (100, 700), 8),
+    ("Dopravní podnik hl. m. Prahy", ("Doprava", "MHD", "Lístky"), (30, 120), 14),
+    ("Alza.cz a.s.", ("Spotreba", "Elektronika", "Online nákup"), (200, 25000), 6),
+    ("IKEA Česká republika", ("Bývanie", "Domácnosť", "Nábytok"), (150, 12000), 3),
+    ("Decathlon", ("Voľný čas", "Šport", "Vybavenie"), (200, 5000), 4),
+    ("Starbucks", ("Zábava", "Kaviarne", "Káva"), (80, 250), 10),
+    ("McDonald's", ("Zábava", "Reštaurácie", "Fast food"), (120, 400), 9),
+    ("Restaurace U Fleků", ("Zábava", "Reštaurácie", "Reštaurácia"), (300, 2500), 5),
+    ("Wolt", ("Zábava", "Reštaurácie", "Donáška"), (250, 900), 8),
+    ("Zásilkovna s.r.o.", ("Spotreba", "Služby", "Doprava zásielok"), (60, 150), 4),
+    ("Cinema City", ("Zábava", "Kultúra", "Kino"), (180, 600), 3),
+    ("Booking.com", ("Voľný čas", "Cestovanie", "Ubytovanie"), (1500, 15000), 1),
+    ("České dráhy a.s.", ("Doprava", "Vlak", "Lístky"), (90, 900), 4),
+)
+
+# name, category, amount in CZK (negative = expense), day of month
+RECURRING: Tuple[Tuple[str, Tuple[str, str, str], float, int], ...] = (
+    ("ACME Software s.r.o.", ("Príjmy", "Mzda", "Výplata"), 68500.0, 10),
+    ("Bytové družstvo Praha 6", ("Bývanie", "Nájom", "Nájomné"), -18500.0, 15),
+    ("Netflix", ("Zábava", "Predplatné", "Streaming"), -299.0, 3),
+    ("Spotify", ("Zábava", "Predplatné", "Hudba"), -199.0, 7),
+    ("O2 Czech Republic a.s.", ("Bývanie", "Energie a služby", "Telefón"), -649.0, 20),
+    ("ČEZ Prodej a.s.", ("Bývanie", "Energie a služby", "Elektrina"), -2100.0, 25),
+    ("Pražská plynárenská a.s.", ("Bývanie", "Energie a služby", "Plyn"), -1450.0, 25),
+    ("Kooperativa pojišťovna", ("Financie", "Poistenie", "Poistenie domácnosti"), -540.0, 1),
+    ("Fitness Form Factory", ("Voľný čas", "Šport", "Permanentka"), -1290.0, 5),
+)
+
+INTERNAL_CATEGORY = ("Presuny (Neutrálne)", "Interné prevody", "Medzi účtami")
+APPROX_RATES = {"CZK": 1.0, "EUR": 24.5, "USD": 22.8, "GBP": 28.5}
+
+
+def _zipf_weights(weights: List[float], rng: random.Random) -> List[float]:
+    """Merchant weights with a random Zipf-like long tail of minor merchants"""
+    tail = [1.0 / (rank + 2) for rank in range(200)]
+    rng.shuffle(tail)
+    return list(weights) + tail
+
+
+class TransactionSpec:
+    """Institution-independent description of one generated transaction"""
+    __slots__ = (
+        "index", "date", "amount", "currency", "counterparty_name", "counterparty_account",
+        "counterparty_bank", "message", "variable_symbol", "transaction_type", "category", "account", "internal"
+    )
+
+    def __init__(self, **values):
+        for name in self.__slots__:
+            setattr(self, name, values.get(name))
+
+
+def generate_specs(rows: int, seed: int = 42, own_accounts: Tuple[str, ...] = CSOB_ACCOUNTS,
+                   currencies: Tuple[str, ...] = ("CZK",), start: datetime = START_DATE) -> Iterator[TransactionSpec]:
+    """
+    Yield rows transactions in date order.
+
+    Args:
+        rows: Number of transactions
+        seed: Random seed (same seed = same transactions)
+        own_accounts: Accounts the statement belongs to (first = main) and internal transfer targets
+        currencies: Currencies of card payments (first = account currency)
+        start: Date of the first transaction
+    """
+    rng = random.Random(seed)
+    merchant_weights = _zipf_weights([merchant[3] for merchant in MERCHANTS], rng)
+    minor_merchants = [f"Obchod {rng.choice('ABCDEFGHIJKLMNOPRSTUVZ')}{index:03d}" for index in range(200)]
+    merchant_accounts = {}
+
+    def account_of(name: str) -> Tuple[str, str]:
+        if name not in merchant_accounts:
+            merchant_accounts[name] = (f"{rng.randint(10000000, 9999999999)}", rng.choice(BANK_CODES))
+        return merchant_accounts[name]
+
+    days = max(1, rows // TRANSACTIONS_PER_DAY)
+    emitted = 0
+    day = 0
+    while emitted < rows:
+        current = start + timedelta(days=day)
+        # Recurring payments on their day of the month
+        for name, category, amount, day_of_month in RECURRING:
+            if current.day != day_of_month or emitted >= rows:
+                continue
+            account, bank = account_of(name)
+            jitter = 1 + rng.uniform(-0.03, 0.03) if amount < 0 and "pojišťovna" not in name else 1
+            yield TransactionSpec(
+                index=emitted,
+                date=current + timedelta(hours=rng.randint(6, 20), minutes=rng.randint(0, 59)),
+                amount=Decimal(str(round(amount * jitter / APPROX_RATES.get(currencies[0], 1.0), 2))),
+                currency=currencies[0],
+                counterparty_name=name,
+                counterparty_account=account,
+                counterparty_bank=bank,
+                message=f"{name} {current:%m/%Y}",
+                variable_symbol=str(zlib.crc32(name.encode()) % 10 ** 8),
+                transaction_type="Příchozí úhrada" if amount > 0 else "Trvalý příkaz",
+                category=category,
+                account=own_accounts[0],
+                internal=False
+            )
+            emitted += 1
+
+        per_day = max(1, round(rng.gauss(rows / days, 4)))
+        for _ in range(per_day):
+            if emitted >= rows:
+                break
+            when = current + timedelta(hours=rng.randint(6, 22), minutes=rng.randint(0, 59), seconds=rng.randint(0, 59))
+
+            if len(own_accounts) > 1 and rng.random() < 0.03:
+                target = rng.choice(own_accounts[1:])
+                amount = Decimal(str(round(rng.choice((1000, 2000, 5000, 10000)) * rng.choice((1, 1, 1.5)), 2)))
+                number, bank = target.split("/") if "/" in target else (target, "")
+                yield TransactionSpec(
+                    index=emitted, date=when, amount=-amount, currency=currencies[0],
+                    counterparty_name="Vlastní účet", counterparty_account=number, counterparty_bank=bank,
+                    message="Převod mezi účty", variable_symbol="", transaction_type="Převod mezi účty",
+                    category=INTERNAL_CATEGORY, account=own_accounts[0], internal=True
+                )
+                emitted += 1
+                continue
+
+            index = rng.choices(range(len(merchant_weights)), weights=merchant_weights)[0]
+            if index < len(MERCHANTS):
+                name, category, (low, high), _ = MERCHANTS[index]
+            else:
+                name, category, (low, high) = minor_merchants[index - len(MERCHANTS)], ("", "", ""), (50, 1500)
+
+            currency = currencies[0]
+            if len(currencies) > 1 and rng.random() < 0.25:
+                currency = rng.choice(currencies[1:])
+            amount_czk = rng.uniform(low, high)
+            amount = Decimal(str(round(amount_czk / APPROX_RATES.get(currency, 1.0), 2)))
+            refund = rng.random() < 0.01
+            account, bank = account_of(name)
+
+            yield TransactionSpec(
+                index=emitted, date=when, amount=amount if refund else -amount, currency=currency,
+                counterparty_name=name, counterparty_account=account if rng.random() < 0.3 else "",
+                counterparty_bank=bank, message=f"{name.upper()} PRAHA",
+                variable_symbol="", transaction_type="Vrácení platby" if refund else "Platba kartou",
+                category=category, account=own_accounts[0], internal=False
+            )
+            emitted += 1
+        day += 1
+
+
+def _czech_amount(amount: Decimal) -> str:
+    """-1 234,50"""
+    sign = "-" if amount < 0 else ""
+    whole, _, fraction = f"{abs(amount):.2f}".partition(".")
+    groups = []
+    while len(whole) > 3:
+        groups.insert(0, whole[-3:])
+        whole = whole[:-3]
+    groups.insert(0, whole)
+    return f"{sign}{' '.join(groups)},{fraction}"
+
+
+CSOB_HEADER = (
+    "číslo účtu", "datum zaúčtování", "částka", "měna", "zůstatek", "číslo protiúčtu", "kód banky protiúčtu",
+    "jméno protistrany", "konstantní symbol", "variabilní symbol", "specifický symbol", "označení operace",
+    "ID transakce", "poznámka", "zpráva", "kategorie"
+)
+
+
+def write_csob_csv(path: Path, rows: int, seed: int = 42) -> Path:
+    """ČSOB CSV export: title row, empty row, header, ';'-separated rows"""
+    balance = Decimal("250000.00")
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow([f"Pohyby na účtu {CSOB_ACCOUNT}"])
+        writer.writerow([])
+        writer.writerow(CSOB_HEADER)
+        for spec in generate_specs(rows, seed, CSOB_ACCOUNTS, ("CZK",)):
+            balance += spec.amount
+            message = spec.message
+            if spec.transaction_type == "Platba kartou":
+                message = f"Částka: {_czech_amount(abs(spec.amount))} CZK {spec.date:%d.%m.%Y} Místo: {spec.message}"
+            writer.writerow((
+                CSOB_ACCOUNT, f"{spec.date:%d.%m.%Y}", _czech_amount(spec.amount), spec.currency,
+                _czech_amount(balance), spec.counterparty_account, spec.counterparty_bank if spec.counterparty_account else "",
+                spec.counterparty_name, "0308" if spec.variable_symbol else "", spec.variable_symbol, "",
+                spec.transaction_type, f"{seed % 1000:03d}{spec.index:09d}", "", message, spec.category[0]
+            ))
+    return path
+
+
+PARTNERS_HEADER = (
+    "Datum zúčtování", "Datum provedení", "Směr úhrady", "Typ úhrady", "Částka", "Měna", "Název protistrany",
+    "Číslo účtu protistrany", "Kód banky protistrany", "IBAN protistrany", "Variabilní symbol",
+    "Konstantní symbol", "Specifický symbol", "Zpráva pro příjemce", "Poznámka pro mě", "Identifikace transakce"
+)
+
+
+def _split_columns(line: str, parts: int = 4) -> List[str]:
+    """Spread a row over columns A-D the way Partners exports do"""
+    size = max(1, -(-len(line) // parts))
+    return [line[start:start + size] for start in range(0, len(line), size)][:parts]
+
+
+def _partners_rows(specs: List[TransactionSpec], seed: int) -> Iterator[List[str]]:
+    for spec in specs:
+        outgoing = spec.amount < 0
+        booked = f"{spec.date.day}. {spec.date.month}. {spec.date.year}"
+        yield [
+            booked,
+            booked,
+            "Odchozí" if outgoing else "Příchozí",
+            spec.transaction_type,
+            _czech_amount(spec.amount),
+            spec.currency,
+            spec.counterparty_name,
+            spec.counterparty_account,
+            spec.counterparty_bank if spec.counterparty_account else "",
+            "",
+            spec.variable_symbol,
+            "",
+            "",
+            spec.message,
+            "",
+            f"P{seed % 1000:03d}{spec.index:010d}",
+        ]
+
+
+def _partners_path(specs: List[TransactionSpec], out_dir: Path, extension: str) -> Path:
+    # The parser takes the account number from the file name
+    first, last = specs[0].date, specs[-1].date
+    return out_dir / f"vypis_{PARTNERS_ACCOUNT_NUMBER}_{first:%Y%m%d}_{last:%Y%m%d}.{extension}"
+
+
+def write_partners_csv(out_dir: Path, rows: int, seed: int = 43) -> Path:
+    """Partners CSV export (vypis_<account>_<from>_<to>.csv, ';', UTF-8 BOM)"""
+    specs = list(generate_specs(rows, seed, PARTNERS_ACCOUNTS, ("CZK",)))
+    path = _partners_path(specs, out_dir, "csv")
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow(PARTNERS_HEADER)
+        writer.writerows(_partners_rows(specs, seed))
+    return path
+
+
+def write_partners_xlsx(out_dir: Path, rows: int, seed: int = 43) -> Path:
+    """Partners XLSX export (vypis_<account>_<from>_<to>.xlsx): each ';'-joined row spread over columns A-D"""
+    import openpyxl
+
+    specs = list(generate_specs(rows, seed, PARTNERS_ACCOUNTS, ("CZK",)))
+    path = _partners_path(specs, out_dir, "xlsx")
+
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet("Pohyby")
+    sheet.append(_split_columns(";".join(PARTNERS_HEADER)))
+    for row in _partners_rows(specs, seed):
+        sheet.append(_split_columns(";".join(row)))
+    workbook.save(path)
+    return path
+
+
+WISE_HEADER = (
+    "ID", "Status", "Direction", "Created on", "Finished on", "Source fee amount", "Source fee currency",
+    "Target fee amount", "Target fee currency", "Source name", "Source amount (after fees)", "Source currency",
+    "Target name", "Target amount (after fees)", "Target currency", "Exchange rate", "Reference", "Batch",
+    "Created by", "Category", "Note"
+)
+WISE_CATEGORIES = {"Spotreba": "Shopping", "Zábava": "Entertainment", "Doprava": "Transport", "Bývanie": "Bills"}
+
+
+def write_wise_csv(path: Path, rows: int, seed: int = 44) -> Path:
+    """Wise transaction history CSV (multi-currency, IN/OUT direction, a few cancelled transfers)"""
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(WISE_HEADER)
+        for spec in generate_specs(rows, seed, ("Wise",), ("EUR", "CZK", "USD", "GBP")):
+            outgoing = spec.amount < 0
+            amount = abs(spec.amount)
+            status = "COMPLETED"
+            roll = rng.random()
+            if roll < 0.02:
+                status = "CANCELLED"
+            elif roll < 0.03:
+                status = "REFUNDED"
+            fee = Decimal("0.00") if not outgoing else Decimal(str(round(float(amount) * 0.004, 2)))
+            finished = spec.date + timedelta(seconds=rng.randint(1, 900))
+            writer.writerow((
+                f"TRANSFER-{seed % 1000:03d}{spec.index:09d}", status, "OUT" if outgoing else "IN",
+                f"{spec.date:%Y-%m-%d %H:%M:%S}", f"{finished:%Y-%m-%d %H:%M:%S}",
+                str(fee), spec.currency, "", "",
+                "Branislav B." if outgoing else spec.counterparty_name, str(amount), spec.currency,
+                spec.counterparty_name if outgoing else "Branislav B.", str(amount), spec.currency, "1",
+                spec.message if rng.random() < 0.5 else "", "", "",
+                WISE_CATEGORIES.get(spec.category[0], "General") if outgoing else "", ""
+            ))
+    return path
+
+
+def generate_file(institution: str, rows: int, out_dir: Path, seed: int = 42) -> Path:
+    """Write one export of an institution into out_dir (reused if it already exists)"""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    if institution == "csob":
+        path = out_dir / f"csob_export_pohyby_{rows}_{seed}.csv"
+        return path if path.exists() else write_csob_csv(path, rows, seed)
+    if institution in ("partners", "partners_xlsx"):
+        # Named after the account and date range, so each size gets its own directory
+        extension = "xlsx" if institution == "partners_xlsx" else "csv"
+        partners_dir = out_dir / f"partners_{rows}_{seed + 1}"
+        existing = sorted(partners_dir.glob(f"vypis_*.{extension}"))
+        if existing:
+            return existing[0]
+        partners_dir.mkdir(exist_ok=True)
+        writer = write_partners_xlsx if extension == "xlsx" else write_partners_csv
+        return writer(partners_dir, rows, seed + 1)
+    if institution == "wise":
+        path = out_dir / f"wise_{rows}_{seed + 2}.csv"
+        return path if path.exists() else write_wise_csv(path, rows, seed + 2)
+    raise ValueError(f"Unknown institution: {institution}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--institution", choices=INSTITUTIONS + ("all",), default="all")
+    parser.add_argument("--rows", type=int, default=10000, help="Transactions per file")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="benchmarks/.data", help="Output directory")
+    args = parser.parse_args()
+
+    institutions = INSTITUTIONS if args.institution == "all" else (args.institution,)
+    for institution in institutions:
+        path = generate_file(institution, args.rows, Path(args.out), args.seed)
+        print(f"{institution:<13} {args.rows:>9} rows -> {path}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
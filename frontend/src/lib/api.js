@@ -66,6 +66,44 @@ export const accountsApi = {
 };
 
 // Export api for direct use
+// Chunked, resumable upload of a statement file; resolves to the response of
+// .../complete (job_id, status). Failed chunks are retried from the offset the
+// server reports, so a dropped connection doesn't restart the upload.
+export async function uploadChunked(file, fields = {}, onProgress = () => {}, maxRetries = 5) {
+  const { data: session } = await api.post('/files/uploads', { filename: file.name, size: file.size, ...fields });
+  const url = `/files/uploads/${session.upload_id}`;
+  let offset = session.offset;
+  let retries = 0;
+
+  while (offset < file.size) {
+    try {
+      const { data } = await api.put(url, file.slice(offset, offset + session.chunk_size), {
+        params: { offset },
+        headers: { 'Content-Type': 'application/octet-stream' }
+      });
+      offset = data.offset;
+      retries = 0;
+      onProgress(offset / file.size);
+    } catch (err) {
+      const status = err.response?.status;
+      if (status === 400 || status === 404 || ++retries > maxRetries) throw err;
+      await new Promise(resolve => setTimeout(resolve, 1000 * retries));
+      try {
+        offset = (await api.get(url)).data.offset;
+      } catch (_) {
+        // Still offline: retry the same offset
+      }
+    }
+  }
+
+  return api.post(`${url}/complete`, {});
+}
+
+// Server-Sent Events stream of an import job (snapshot, log, stage, progress, status, end)
+export function jobEvents(jobId) {
+  return new EventSource(`${API_BASE}/files/jobs/${jobId}/events`);
+}
+
 export { api };
 
 export default api;
@@ -0,0 +1,124 @@
+"""
+Benchmark API responsiveness while a heavy request is running.
+
+Starts the FastAPI app with uvicorn against a seeded temporary database,
+keeps heavy requests (full transaction listing) in flight and measures the
+latency of cheap endpoints (/health, first page of /transactions).
+A handler that blocks the event loop shows up as a p99 close to the
+duration of the heavy request.
+
+Usage:
+    python scripts/benchmark_api_concurrency.py [--rows 20000] [--seconds 10] [--heavy 2]
+"""
+import argparse
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Point the app at a throwaway database before any backend module is imported
+_tmp_dir = tempfile.mkdtemp(prefix="bench_api_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmp_dir}/bench.db")
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import requests
+import uvicorn
+
+from benchmark_sqlite_profile import seed
+
+
+def free_port() -> int:
+    """Pick an unused local TCP port"""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def percentile(values, pct: float) -> float:
+    """Nearest-rank percentile of a list of values"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def measure(base_url: str, path: str, seconds: float, stop: threading.Event) -> list:
+    """Hit a cheap endpoint in a loop and collect latencies in ms"""
+    latencies = []
+    session = requests.Session()
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline and not stop.is_set():
+        start = time.perf_counter()
+        session.get(f"{base_url}{path}", timeout=120)
+        latencies.append((time.perf_counter() - start) * 1000)
+        time.sleep(0.01)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000, help="Seeded transactions")
+    parser.add_argument("--seconds", type=float, default=10, help="Measurement window per phase")
+    parser.add_argument("--heavy", type=int, default=2, help="Concurrent heavy requests")
+    args = parser.parse_args()
+
+    from backend.database.connection import engine
+    seed(engine, args.rows)
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = uvicorn.Server(uvicorn.Config("backend.app:app", host="127.0.0.1", port=port, log_level="warning"))
+    server_thread = threading.Thread(target=server.run, daemon=True)
+    server_thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    cheap_paths = ["/api/v1/health", "/api/v1/transactions?limit=1"]
+    heavy_path = f"/api/v1/transactions?limit={args.rows}"
+
+    print("=" * 80)
+    print(f"API concurrency benchmark: {args.rows} rows, {args.heavy} heavy requests in flight")
+    print("=" * 80)
+
+    start = time.perf_counter()
+    requests.get(f"{base_url}{heavy_path}", timeout=300)
+    print(f"Heavy request alone: {(time.perf_counter() - start) * 1000:.0f}ms  ({heavy_path})")
+
+    for phase in ("idle", "under load"):
+        stop = threading.Event()
+        heavy_threads = []
+        if phase == "under load":
+            def heavy_loop():
+                session = requests.Session()
+                while not stop.is_set():
+                    session.get(f"{base_url}{heavy_path}", timeout=300)
+            heavy_threads = [threading.Thread(target=heavy_loop) for _ in range(args.heavy)]
+            for t in heavy_threads:
+                t.start()
+            time.sleep(0.2)
+
+        for path in cheap_paths:
+            lat = measure(base_url, path, args.seconds / len(cheap_paths), stop)
+            print(
+                f"{phase:<11} {path:<32} n={len(lat):5d}  "
+                f"p50={statistics.median(lat) if lat else 0:8.1f}ms  "
+                f"p95={percentile(lat, 95):8.1f}ms  p99={percentile(lat, 99):8.1f}ms"
+            )
+
+        stop.set()
+        for t in heavy_threads:
+            t.join()
+
+    server.should_exit = True
+    server_thread.join(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
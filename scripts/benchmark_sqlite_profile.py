@@ -0,0 +1,156 @@
+"""
+Benchmark SQLite engine profiles under a mixed read/write load.
+
+Simulates an upload (one writer committing transactions row by row, like
+DatabaseWriter) while several dashboard readers run aggregate queries.
+Runs once with SQLite defaults and once with the performance profile.
+
+Usage:
+    python scripts/benchmark_sqlite_profile.py [--rows 20000] [--readers 4] [--seconds 10]
+"""
+import argparse
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from backend.database.connection import create_db_engine, _load_database_settings
+from backend.database.models import Base, Transaction
+from backend.database.repositories.transaction_repo import TransactionRepository
+
+CATEGORIES = ["Spotreba", "Bývanie", "Doprava", "Zábava", "Príjmy", "Presuny (Neutrálne)"]
+
+
+def make_transaction(i: int, rng: random.Random) -> dict:
+    """Build a synthetic transaction row"""
+    amount = round(rng.uniform(-5000, 3000), 2)
+    return {
+        "transaction_id": f"TXN_BENCH_{i:08d}",
+        "date": datetime(2024, 1, 1) + timedelta(days=rng.randint(0, 700)),
+        "description": f"Payment {i}",
+        "amount": amount,
+        "currency": "CZK",
+        "amount_czk": amount,
+        "category_tier1": rng.choice(CATEGORIES),
+        "category_tier2": "Bench",
+        "category_tier3": "Bench",
+        "is_internal_transfer": False,
+        "counterparty_name": f"Merchant {rng.randint(0, 300)}",
+    }
+
+
+def seed(engine, rows: int):
+    """Create schema and insert the initial history"""
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(42)
+    with engine.begin() as conn:
+        conn.execute(Transaction.__table__.insert(), [make_transaction(i, rng) for i in range(rows)])
+
+
+def run_profile(profile: str, rows: int, readers: int, seconds: float) -> dict:
+    """Run the mixed workload against a fresh database using the given profile"""
+    tmp_dir = tempfile.mkdtemp(prefix="bench_sqlite_")
+    try:
+        url = f"sqlite:///{tmp_dir}/bench.db"
+        engine = create_db_engine(url, profile=profile, database_settings=_load_database_settings())
+        seed(engine, rows)
+        Session = sessionmaker(bind=engine, autoflush=False)
+
+        stop = threading.Event()
+        read_latencies = []
+        lock_errors = [0]
+        written = [0]
+        results_lock = threading.Lock()
+
+        def reader():
+            while not stop.is_set():
+                start = time.perf_counter()
+                db = Session()
+                try:
+                    repo = TransactionRepository(db)
+                    repo.get_summary()
+                    repo.get_category_aggregations()
+                except OperationalError:
+                    with results_lock:
+                        lock_errors[0] += 1
+                    continue
+                finally:
+                    db.close()
+                with results_lock:
+                    read_latencies.append(time.perf_counter() - start)
+
+        def writer():
+            rng = random.Random(7)
+            i = rows
+            db = Session()
+            try:
+                while not stop.is_set():
+                    db.add(Transaction(**make_transaction(i, rng)))
+                    try:
+                        db.commit()
+                        written[0] += 1
+                    except OperationalError:
+                        db.rollback()
+                        with results_lock:
+                            lock_errors[0] += 1
+                    i += 1
+            finally:
+                db.close()
+
+        threads = [threading.Thread(target=reader) for _ in range(readers)]
+        threads.append(threading.Thread(target=writer))
+        for t in threads:
+            t.start()
+        time.sleep(seconds)
+        stop.set()
+        for t in threads:
+            t.join()
+
+        engine.dispose()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    latencies_ms = sorted(l * 1000 for l in read_latencies) or [0.0]
+    return {
+        "profile": profile,
+        "reads_per_sec": len(read_latencies) / seconds,
+        "read_p50_ms": statistics.median(latencies_ms),
+        "read_p95_ms": latencies_ms[int(len(latencies_ms) * 0.95) - 1] if len(latencies_ms) > 1 else latencies_ms[0],
+        "writes_per_sec": written[0] / seconds,
+        "lock_errors": lock_errors[0],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000, help="Seeded transactions")
+    parser.add_argument("--readers", type=int, default=4, help="Concurrent dashboard reader threads")
+    parser.add_argument("--seconds", type=float, default=10, help="Duration per profile")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print(f"SQLite mixed read/write benchmark: {args.rows} rows, {args.readers} readers + 1 writer, {args.seconds}s")
+    print("=" * 80)
+
+    for profile in ("default", "performance"):
+        r = run_profile(profile, args.rows, args.readers, args.seconds)
+        print(
+            f"{r['profile']:<12} reads/s={r['reads_per_sec']:8.1f}  "
+            f"read p50={r['read_p50_ms']:7.1f}ms  p95={r['read_p95_ms']:7.1f}ms  "
+            f"writes/s={r['writes_per_sec']:8.1f}  lock errors={r['lock_errors']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Migration script: Convert old CNB rate caches to the binary rate store.
+
+Reads data/cache/cnb_rates_cache.json (per-date JSON cache) and
+data/cache/cnb_rates.db (SQLite yearly cache) if present and writes their
+fixings into data/cache/cnb_rates.bin.
+
+The JSON cache stored whatever daily.txt returned under the requested date,
+so its entries are imported as fallback rates only: their years aren't
+marked as downloaded and are fetched again from CNB on first use, which
+replaces the migrated values.
+
+Usage:
+    python scripts/migrate_cnb_cache.py [--cache-dir data/cache] [--delete-old]
+"""
+import argparse
+import json
+import sqlite3
+import sys
+import time
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.cnb_rate_store import CNBRateStore
+
+
+def read_json_cache(path: Path):
+    """Fixings of the legacy JSON cache: {"2024-01-03": {"EUR": "24.357", ...}}"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    return [
+        (date.fromisoformat(date_str), {code: Decimal(rate) for code, rate in rates.items()})
+        for date_str, rates in data.items()
+    ]
+
+
+def read_sqlite_cache(path: Path):
+    """Fixings and downloaded years of the SQLite cache"""
+    fixings = {}
+    conn = sqlite3.connect(path)
+    try:
+        for fixing_date, currency, rate in conn.execute("SELECT fixing_date, currency, rate FROM cnb_rates"):
+            fixings.setdefault(date.fromisoformat(fixing_date), {})[currency] = Decimal(rate)
+        years = {
+            year: datetime.fromisoformat(fetched_at)
+            for year, fetched_at in conn.execute("SELECT year, fetched_at FROM cnb_years")
+        }
+    finally:
+        conn.close()
+    return list(fixings.items()), years
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate CNB rate caches to the binary rate store")
+    parser.add_argument("--cache-dir", default="data/cache", help="CNB cache directory (default: data/cache)")
+    parser.add_argument("--delete-old", action="store_true", help="Delete the old cache files after migrating")
+    args = parser.parse_args()
+
+    cache_dir = Path(args.cache_dir)
+    json_cache = cache_dir / "cnb_rates_cache.json"
+    sqlite_cache = cache_dir / "cnb_rates.db"
+
+    print("=" * 80)
+    print("Migrating CNB rate cache")
+    print("=" * 80)
+
+    if not json_cache.exists() and not sqlite_cache.exists():
+        print(f"\nNo old cache found in {cache_dir}, nothing to migrate")
+        return
+
+    store = CNBRateStore(cache_dir / "cnb_rates.bin")
+    migrated = []
+
+    # JSON first: real fixings from the SQLite cache replace its entries for the same dates
+    if json_cache.exists():
+        fixings = read_json_cache(json_cache)
+        store.write(fixings)
+        migrated.append(json_cache)
+        print(f"\n✓ {json_cache}: {len(fixings)} dates ({json_cache.stat().st_size:,} bytes)")
+
+    if sqlite_cache.exists():
+        fixings, years = read_sqlite_cache(sqlite_cache)
+        store.write(fixings, years)
+        migrated.append(sqlite_cache)
+        print(f"✓ {sqlite_cache}: {len(fixings)} dates, years {sorted(years)}")
+
+    store.close()
+
+    start = time.perf_counter()
+    reopened = CNBRateStore(cache_dir / "cnb_rates.bin")
+    open_ms = (time.perf_counter() - start) * 1000
+    print(f"\n{reopened.path}: {len(reopened)} dates ({reopened.path.stat().st_size:,} bytes), opened in {open_ms:.2f}ms")
+    reopened.close()
+
+    if args.delete_old:
+        for path in migrated:
+            path.unlink()
+            print(f"Deleted {path}")
+
+    print("\n" + "=" * 80)
+    print("✅ Migration completed successfully!")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
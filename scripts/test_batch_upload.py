@@ -0,0 +1,113 @@
+"""
+Test the ZIP checks of batch uploads (POST /api/v1/files/upload/batch).
+
+Every rejected archive must fail with a 4xx before anything is extracted or
+saved to data/uploads:
+
+1. an ordinary ZIP of statements is expanded (nested folders flattened)
+2. nested archives and path traversal names are rejected with 400
+3. too many entries, an oversized member and a zip bomb are rejected with 413
+4. a batch failing after some files were saved deletes them again
+
+Usage:
+    python scripts/test_batch_upload.py
+"""
+import io
+import sys
+import zipfile
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.api import files
+from backend.services import chunked_upload
+
+LIMITS = {**chunked_upload.DEFAULT_UPLOAD_SETTINGS, "max_file_mb": 1, "max_archive_mb": 2, "max_archive_members": 20}
+STATEMENT = b"Datum;Castka\n01.03.2024;-100,00\n"
+
+
+def check(description: str, condition: bool):
+    print(f"  {'✓' if condition else '✗'} {description}")
+    if not condition:
+        raise SystemExit(1)
+
+
+def make_zip(members, compression=zipfile.ZIP_DEFLATED) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression) as archive:
+        for name, content in members:
+            archive.writestr(name, content)
+    return buffer.getvalue()
+
+
+def upload(client: TestClient, archives):
+    return client.post(
+        "/api/v1/files/upload/batch",
+        files=[("files", (name, content, "application/zip")) for name, content in archives],
+        data={"institution": "csob"}
+    )
+
+
+def main():
+    print("=" * 80)
+    print("Testing batch upload ZIP checks")
+    print("=" * 80)
+
+    chunked_upload.load_upload_settings = lambda settings_path="config/settings.yaml": LIMITS
+    app = FastAPI()
+    app.include_router(files.router, prefix="/api/v1/files")
+    client = TestClient(app)
+    uploads_before = set(files.UPLOAD_DIR.iterdir())
+
+    print("\n1. Ordinary archive")
+    archive = make_zip([("2024/march.csv", STATEMENT), ("__MACOSX/._march.csv", b"x"), (".DS_Store", b"x")])
+    members = list(files._iter_batch_members([SimpleNamespace(filename="statements.zip", file=io.BytesIO(archive))]))
+    check(f"one statement, folder dropped ({[name for name, _ in members]})", [name for name, _ in members] == ["march.csv"])
+    check("content unpacked", members[0][1].read() == STATEMENT)
+
+    print("\n2. Rejected with 400")
+    for description, member in (
+        ("nested ZIP", ("inner.zip", make_zip([("a.csv", STATEMENT)]))),
+        ("nested tarball", ("old/statements.tar.gz", b"\x1f\x8b")),
+        ("parent directory", ("../../etc/cron.d/job.csv", STATEMENT)),
+        ("absolute path", ("/tmp/evil.csv", STATEMENT)),
+        ("Windows drive", ("C:\\evil.csv", STATEMENT)),
+    ):
+        response = upload(client, [("batch.zip", make_zip([member]))])
+        check(f"{description}: {response.status_code} {response.json()['detail']}", response.status_code == 400)
+
+    print("\n3. Rejected with 413")
+    response = upload(client, [("many.zip", make_zip([(f"s{i}.csv", STATEMENT) for i in range(25)]))])
+    check(f"too many entries: {response.status_code}", response.status_code == 413)
+    response = upload(client, [("big.zip", make_zip([("big.csv", b"0" * (1024 * 1024 + 1))]))])
+    check(f"member over max_file_mb: {response.status_code}", response.status_code == 413)
+    bomb = make_zip([(f"part{i}.csv", b"0" * (900 * 1024)) for i in range(4)])
+    response = upload(client, [("bomb.zip", bomb)])
+    check(f"{len(bomb)} byte ZIP unpacking to 3.5 MB: {response.status_code}", response.status_code == 413)
+    half = make_zip([(f"part{i}.csv", b"0" * (900 * 1024)) for i in range(2)])
+    response = upload(client, [("a.zip", half), ("b.zip", half)])
+    check(f"limit counts all archives of the batch: {response.status_code}", response.status_code == 413)
+
+    check("nothing saved to data/uploads", set(files.UPLOAD_DIR.iterdir()) == uploads_before)
+
+    print("\n4. Failure after files were saved")
+    files.job_queue.find_imported_file = lambda file_hash: None
+    archive = bytearray(make_zip([("a.csv", STATEMENT), ("b.csv", STATEMENT * 2)], zipfile.ZIP_STORED))
+    corrupt_at = archive.rindex(STATEMENT * 2)
+    archive[corrupt_at] ^= 0xFF
+    response = upload(client, [("corrupt.zip", bytes(archive))])
+    check(f"corrupt second member: {response.status_code} {response.json()['detail']}", response.status_code == 500)
+    check("first file deleted again, no partial file", set(files.UPLOAD_DIR.iterdir()) == uploads_before)
+
+    print("\n" + "=" * 80)
+    print("✅ Batch upload test completed successfully!")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Test format sniffing of chunked uploads.
+
+The format is decided from the first SNIFF_BYTES of the file, however the
+client splits it into chunks:
+
+1. an XLSX sent with a 2-byte first chunk ("PK") is classified as XLSX once
+   64 KB have arrived, and completes with the right SHA-256
+2. an XLSX smaller than 64 KB sent in small chunks is classified on complete
+3. CSV content named .xlsx, XLSX content named .csv and binary files are
+   rejected (the chunk that completes the head is not kept)
+
+Usage:
+    python scripts/test_chunked_upload.py
+"""
+import asyncio
+import hashlib
+import sys
+import tempfile
+from pathlib import Path
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.services import chunked_upload
+from benchmarks.synthetic import generate_file
+
+
+def check(description: str, condition: bool):
+    print(f"  {'✓' if condition else '✗'} {description}")
+    if not condition:
+        raise SystemExit(1)
+
+
+async def body(data: bytes):
+    yield data
+
+
+def send(upload_id: str, offset: int, data: bytes) -> dict:
+    return asyncio.run(chunked_upload.append_chunk(upload_id, offset, body(data)))
+
+
+def upload_in_chunks(filename: str, content: bytes, sizes) -> dict:
+    """Create an upload and send `content` in chunks of `sizes` (the rest in one last chunk)"""
+    session = chunked_upload.create_upload(filename, "partners", size=len(content))
+    for size in list(sizes) + [len(content)]:
+        chunk = content[session['offset']:session['offset'] + size]
+        if chunk:
+            session = send(session['upload_id'], session['offset'], chunk)
+    return session
+
+
+def rejected(action) -> str:
+    try:
+        action()
+    except ValueError as e:
+        return str(e)
+    return ""
+
+
+def main():
+    print("=" * 80)
+    print("Testing chunked upload format sniffing")
+    print("=" * 80)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        chunked_upload.PARTIAL_DIR = tmp / "partial"
+        chunked_upload.UPLOAD_DIR = tmp / "uploads"
+        chunked_upload.UPLOAD_DIR.mkdir()
+
+        large_xlsx = generate_file("partners_xlsx", 3000, tmp / "gen", 43).read_bytes()
+        small_xlsx = generate_file("partners_xlsx", 20, tmp / "gen", 44).read_bytes()
+        csv = generate_file("csob", 20, tmp / "gen", 42).read_bytes()
+        check(f"fixtures: XLSX of {len(large_xlsx)} and {len(small_xlsx)} bytes",
+              len(large_xlsx) > chunked_upload.SNIFF_BYTES > len(small_xlsx))
+
+        print("\n1. XLSX with a 2-byte first chunk")
+        session = chunked_upload.create_upload("statement.xlsx", "partners", size=len(large_xlsx))
+        session = send(session['upload_id'], 0, large_xlsx[:2])
+        check(f"first chunk {large_xlsx[:2]!r} accepted, format undecided", session['format'] is None)
+        session = send(session['upload_id'], 2, large_xlsx[2:1000])
+        check("still undecided below 64 KB", session['format'] is None)
+        session = send(session['upload_id'], 1000, large_xlsx[1000:])
+        check(f"classified as {session['format']}", session['format'] == "xlsx")
+        stored, saved_filename, file_hash = chunked_upload.complete_upload(session['upload_id'])
+        check("complete: SHA-256 of the whole file", file_hash == hashlib.sha256(large_xlsx).hexdigest())
+        check("stored content intact", (chunked_upload.UPLOAD_DIR / saved_filename).read_bytes() == large_xlsx)
+
+        print("\n2. Small XLSX in small chunks")
+        session = upload_in_chunks("small.xlsx", small_xlsx, [2, 7, 100])
+        check("undecided until complete", session['format'] is None)
+        stored, _, _ = chunked_upload.complete_upload(session['upload_id'])
+        check(f"classified on complete as {stored['format']}", stored['format'] == "xlsx")
+
+        print("\n3. Rejected content")
+        padded_csv = csv * (chunked_upload.SNIFF_BYTES // len(csv) + 1)
+        session = chunked_upload.create_upload("renamed.xlsx", "partners")
+        send(session['upload_id'], 0, padded_csv[:2])
+        session = send(session['upload_id'], 2, padded_csv[2:5002])
+        error = rejected(lambda: send(session['upload_id'], session['offset'], padded_csv[session['offset']:]))
+        check(f"CSV named .xlsx: {error}", "CSV content" in error)
+        check("rejected chunk not kept", chunked_upload.get_upload(session['upload_id'])['offset'] == 5002)
+
+        session = upload_in_chunks("renamed.csv", small_xlsx, [2])
+        error = rejected(lambda: chunked_upload.complete_upload(session['upload_id']))
+        check(f"small XLSX named .csv: {error}", "XLSX content" in error)
+
+        session = upload_in_chunks("binary.csv", b"\x00\x01\x02" * 100, [2])
+        error = rejected(lambda: chunked_upload.complete_upload(session['upload_id']))
+        check(f"binary file: {error}", "not a CSV or XLSX" in error)
+
+    print("\n" + "=" * 80)
+    print("✅ Chunked upload test completed successfully!")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
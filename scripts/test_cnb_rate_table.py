@@ -0,0 +1,124 @@
+"""
+Test the historical CNB rate table against a local fixture server.
+
+Serves scripts/fixtures/cnb_year_<year>.txt in place of cnb.cz, so no
+network access is needed.
+
+Usage:
+    python scripts/test_cnb_rate_table.py
+"""
+import sys
+import tempfile
+import threading
+from datetime import date
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.cnb_api import CNBExchangeRates
+from src.utils.cnb_rate_store import HEADER_SIZE, RECORD_SIZE
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Serves year.txt?year=N from the fixture files and counts requests"""
+    requests_served = []
+
+    def do_GET(self):
+        year = parse_qs(urlparse(self.path).query).get("year", [""])[0]
+        fixture = FIXTURES_DIR / f"cnb_year_{year}.txt"
+        FixtureHandler.requests_served.append(year)
+
+        if not fixture.exists():
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        body = fixture.read_bytes()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def check(description: str, condition: bool):
+    print(f"  {'✓' if condition else '✗'} {description}")
+    if not condition:
+        raise SystemExit(1)
+
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    year_url = f"http://127.0.0.1:{server.server_port}/year.txt"
+    cache_dir = tempfile.mkdtemp(prefix="cnb_cache_")
+
+    print("=" * 80)
+    print("Testing CNB historical rate table (fixture server)")
+    print("=" * 80)
+
+    cnb = CNBExchangeRates(cache_dir=cache_dir, year_url=year_url)
+
+    print("\n1. Business day lookup")
+    fixing_date, rates = cnb.lookup(date(2024, 1, 3))
+    check("fixing of the same day", fixing_date == date(2024, 1, 3))
+    check("EUR rate parsed", rates["EUR"] == Decimal("24.357"))
+    check("100 JPY normalized to 1 JPY", rates["JPY"] == Decimal("0.15824"))
+
+    print("\n2. Weekend and holiday use the previous business day")
+    check("Saturday -> Friday", cnb.lookup(date(2024, 1, 6))[0] == date(2024, 1, 5))
+    check("1 January -> last fixing of previous year", cnb.lookup(date(2024, 1, 1))[0] == date(2023, 12, 29))
+
+    print("\n3. Header change during the year")
+    check("PLN missing before February", "PLN" not in cnb.lookup(date(2024, 1, 31))[1])
+    check("PLN present from February", "PLN" in cnb.lookup(date(2024, 2, 1))[1])
+
+    print("\n4. One download per year")
+    for day in range(1, 29):
+        cnb.get_rate("USD", date(2024, 2, day))
+    check(f"requests served: {FixtureHandler.requests_served}",
+          sorted(FixtureHandler.requests_served) == ["2023", "2024"])
+
+    print("\n5. Persistent cache")
+    FixtureHandler.requests_served.clear()
+    cached = CNBExchangeRates(cache_dir=cache_dir, year_url=year_url)
+    check("rates loaded from cache", cached.get_rate("EUR", date(2024, 1, 3)) == Decimal("24.357"))
+    check("no new downloads", FixtureHandler.requests_served == [])
+
+    print("\n6. Binary cache file")
+    store_path = Path(cache_dir) / "cnb_rates.bin"
+    count = len(cached.store)
+    check(f"{count} fixings in header + fixed-size records",
+          store_path.stat().st_size == HEADER_SIZE + count * RECORD_SIZE)
+
+    with open(store_path, "ab") as f:
+        f.write(b"\0" * (RECORD_SIZE // 2))  # torn append
+    torn = CNBExchangeRates(cache_dir=cache_dir, year_url=year_url)
+    check("partial record ignored", len(torn.store) == count)
+    check("rates still readable", torn.get_rate("EUR", date(2024, 1, 3)) == Decimal("24.357"))
+
+    last_date = torn.store.date_at(count - 1)
+    torn.store.write([(date.fromordinal(last_date.toordinal() + 1), {"EUR": Decimal("25.001")})])
+    check("next append replaces the partial record",
+          store_path.stat().st_size == HEADER_SIZE + (count + 1) * RECORD_SIZE)
+    cached.store.refresh()
+    check("other reader sees the append after refresh", len(cached.store) == count + 1)
+
+    server.shutdown()
+
+    print("\n" + "=" * 80)
+    print("✅ CNB rate table test completed successfully!")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Test the cold-start import cost of the API and the import workers.
+
+Imports each entrypoint in a fresh interpreter with `python -X importtime`
+and checks that
+
+- heavy libraries only needed by some code paths (openpyxl for XLSX
+  exports, requests for CNB/Gemini calls, dateutil, pandas) are not
+  imported at startup, and
+- the total import time stays within a budget.
+
+The budget is generous on purpose (importtime itself adds overhead and CI
+machines are slow); the module checks catch most regressions.
+
+Usage:
+    python scripts/test_import_time.py [--budget-ms 1500] [--top 15]
+"""
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# entrypoint -> modules it must not import
+ENTRYPOINTS: Dict[str, Tuple[str, ...]] = {
+    "backend.app": ("openpyxl", "pandas", "requests", "dateutil", "src.core.parser", "src.utils.categorizer"),
+    "backend.services.file_processing": ("openpyxl", "pandas", "requests"),
+    "src.utils.metrics": ("dateutil", "requests", "src.utils.date_parser", "src.utils.currency"),
+    "src.connectors": ("googleapiclient", "google"),
+}
+
+
+def import_times(module: str) -> List[Tuple[str, int, int]]:
+    """(module, self us, cumulative us) of every module imported by `import module` in a new interpreter"""
+    env = {**os.environ, "PYTHONPATH": str(PROJECT_ROOT)}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def check(description: str, condition: bool):
+    print(f"  {'✓' if condition else '✗'} {description}")
+    if not condition:
+        raise SystemExit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=1500, help="Maximum import time of backend.app")
+    parser.add_argument("--top", type=int, default=10, help="Slowest project modules to list")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("Testing import time of the entrypoints")
+    print("=" * 80)
+
+    for number, (entrypoint, forbidden) in enumerate(ENTRYPOINTS.items(), start=1):
+        rows = import_times(entrypoint)
+        imported = {name for name, _, _ in rows}
+        total_ms = next(cumulative for name, _, cumulative in rows if name == entrypoint) / 1000
+
+        print(f"\n{number}. import {entrypoint}: {total_ms:.0f} ms, {len(imported)} modules")
+        for module in forbidden:
+            check(f"{module} not imported", module not in imported)
+
+        if entrypoint == "backend.app":
+            check(f"{total_ms:.0f} ms within the {args.budget_ms:.0f} ms budget", total_ms <= args.budget_ms)
+
+            project = sorted(
+                (row for row in rows if row[0].split(".")[0] in ("backend", "src")),
+                key=lambda row: row[1], reverse=True
+            )
+            print("  Slowest project modules (self time):")
+            for name, self_us, cumulative_us in project[:args.top]:
+                print(f"    {self_us / 1000:8.1f} ms  {name}")
+
+    print("\n" + "=" * 80)
+    print("✅ Import time test completed successfully!")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
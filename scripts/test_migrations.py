@@ -0,0 +1,140 @@
+"""
+Test init_db() schema migrations in a deployment-like tree.
+
+Copies backend/, src/ and config/ to a temporary directory the way the
+Dockerfile does (no alembic.ini, no benchmarks) and runs init_db() there
+in a fresh interpreter:
+
+1. a new database is created and stamped with the head revision
+2. a database from before Alembic (REAL amounts, no alembic_version) is
+   upgraded: transaction and recurring payment amounts become integer
+   cents, rounded like Decimal
+3. a second init_db() leaves a current database alone
+4. processes starting together (uvicorn --workers N) migrate a database
+   from before Alembic once, and none of them fails
+
+Usage:
+    python scripts/test_migrations.py
+"""
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DEPLOYED_DIRS = ("backend", "src", "config")
+
+LEGACY_SETUP = """
+from sqlalchemy import text
+from backend.database.connection import BASELINE_REVISION, alembic_config, engine, init_db
+from alembic import command
+
+init_db()
+with engine.begin() as conn:
+    command.downgrade(alembic_config(conn), BASELINE_REVISION)
+    conn.execute(text("DROP TABLE alembic_version"))
+    conn.execute(text(
+        "INSERT INTO transactions (transaction_id, date, description, amount, currency, amount_czk) VALUES "
+        "('T1', '2024-01-01 00:00:00', 'a', 0.285, 'CZK', 0.285), "
+        "('T2', '2024-01-02 00:00:00', 'b', -1234.5, 'EUR', -30864.2), "
+        "('T3', '2024-01-03 00:00:00', 'c', 10.1, 'USD', NULL)"
+    ))
+    conn.execute(text(
+        "INSERT INTO recurring_payments (group_key, amount, amount_czk, amount_min, amount_max) VALUES "
+        "('expense|CZK|netflix', -0.285, -199.0, -0.29, NULL)"
+    ))
+"""
+
+
+def check(description: str, condition: bool):
+    print(f"  {'✓' if condition else '✗'} {description}")
+    if not condition:
+        raise SystemExit(1)
+
+
+INIT_DB = "from backend.database.connection import init_db; init_db()"
+CONCURRENT_PROCESSES = 4
+
+
+def start(tree: Path, database: Path, code: str) -> subprocess.Popen:
+    env = {**os.environ, "PYTHONPATH": str(tree), "DATABASE_URL": f"sqlite:///{database}"}
+    return subprocess.Popen([sys.executable, "-c", code], cwd=tree, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+
+
+def finish(process: subprocess.Popen):
+    _, stderr = process.communicate()
+    if process.returncode != 0:
+        raise SystemExit(f"init_db failed:\n{stderr[-3000:]}")
+
+
+def run(tree: Path, database: Path, code: str):
+    finish(start(tree, database, code))
+
+
+def query(database: Path, sql: str):
+    with sqlite3.connect(database) as conn:
+        return conn.execute(sql).fetchall()
+
+
+def main():
+    print("=" * 80)
+    print("Testing database migrations")
+    print("=" * 80)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tree = Path(tmp) / "app"
+        for name in DEPLOYED_DIRS:
+            shutil.copytree(PROJECT_ROOT / name, tree / name,
+                            ignore=shutil.ignore_patterns("__pycache__", "static", "node_modules"))
+        (tree / "data").mkdir()
+        check("tree has no alembic.ini", not (tree / "alembic.ini").exists())
+
+        print("\n1. New database")
+        fresh = Path(tmp) / "fresh.db"
+        run(tree, fresh, INIT_DB)
+        check("stamped with head", query(fresh, "SELECT version_num FROM alembic_version") == [("0003_recurring_cents",)])
+        for table in ("transactions", "recurring_payments"):
+            check(f"{table}.amount is BIGINT", any(
+                row[1] == "amount" and row[2] == "BIGINT" for row in query(fresh, f"PRAGMA table_info({table})")
+            ))
+
+        print("\n2. Database from before migrations")
+        legacy = Path(tmp) / "legacy.db"
+        run(tree, legacy, LEGACY_SETUP)
+        check("legacy schema without alembic_version",
+              not query(legacy, "SELECT name FROM sqlite_master WHERE name = 'alembic_version'"))
+        run(tree, legacy, INIT_DB)
+        check("upgraded to head", query(legacy, "SELECT version_num FROM alembic_version") == [("0003_recurring_cents",)])
+        amounts = query(legacy, "SELECT amount, amount_czk, typeof(amount) FROM transactions ORDER BY transaction_id")
+        check(f"amounts in cents {amounts}",
+              amounts == [(29, 29, "integer"), (-123450, -3086420, "integer"), (1010, None, "integer")])
+        recurring = query(legacy, "SELECT amount, amount_czk, amount_min, amount_max FROM recurring_payments")
+        check(f"recurring amounts in cents {recurring}", recurring == [(-29, -19900, -29, None)])
+
+        print("\n3. Current database")
+        run(tree, legacy, INIT_DB)
+        check("amounts unchanged", query(legacy, "SELECT amount, amount_czk FROM transactions ORDER BY transaction_id")
+              == [row[:2] for row in amounts])
+
+        print(f"\n4. {CONCURRENT_PROCESSES} processes starting together")
+        shared = Path(tmp) / "shared.db"
+        run(tree, shared, LEGACY_SETUP)
+        processes = [start(tree, shared, INIT_DB) for _ in range(CONCURRENT_PROCESSES)]
+        errors = [process.communicate()[1] for process in processes]
+        failed = [error for process, error in zip(processes, errors) if process.returncode != 0]
+        check(f"no process failed{(':' + failed[0][-1500:]) if failed else ''}", not failed)
+        check("one head revision", query(shared, "SELECT version_num FROM alembic_version") == [("0003_recurring_cents",)])
+        check("amounts converted once", query(shared, "SELECT amount, amount_czk FROM transactions ORDER BY transaction_id")
+              == [row[:2] for row in amounts])
+
+    print("\n" + "=" * 80)
+    print("✅ Migration test completed successfully!")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
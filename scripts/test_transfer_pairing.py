@@ -0,0 +1,164 @@
+"""
+Test internal transfer pairing on mixed data.
+
+1. Hand-made statements: two real transfers (same currency with own-account
+   counterparties, and a ČSOB -> Wise top-up without counterparty) among
+   card payments, refunds, ambiguous look-alike transfers and a leg without
+   an account. Only the two real transfers may be paired.
+2. A seeded benchmark database (card payments, refunds, standing orders and
+   one-sided transfers to own accounts): nothing may be paired and no
+   categorized row may change.
+
+Usage:
+    python scripts/test_transfer_pairing.py [--rows 5000]
+"""
+import argparse
+import sys
+import tempfile
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import yaml
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.database.models import Account, Base, Institution, Transaction
+from backend.services.transfer_pairing import pair_transfers
+
+CATEGORIZATION_CONFIG = yaml.safe_load(Path("config/categorization.yaml").read_text(encoding="utf-8"))
+OWN_ACCOUNTS = set(yaml.safe_load(Path("config/accounts.yaml").read_text(encoding="utf-8"))["accounts"])
+CSOB, PARTNERS = "210621040/0300", "1330299329/6363"
+
+
+def check(description: str, condition: bool):
+    print(f"  {'✓' if condition else '✗'} {description}")
+    if not condition:
+        raise SystemExit(1)
+
+
+def run_pairing(session):
+    return pair_transfers(session, categorization_config=CATEGORIZATION_CONFIG, own_accounts=OWN_ACCOUNTS)
+
+
+def test_mixed_statements():
+    print("\n1. Mixed statements")
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+
+    institution = Institution(code="csob", name="ČSOB")
+    session.add(institution)
+    session.flush()
+    accounts = {}
+    for number in (CSOB, PARTNERS, "wise-eur"):
+        accounts[number] = Account(account_number=number, institution_id=institution.id)
+        session.add(accounts[number])
+    session.flush()
+
+    def txn(txn_id, account, day, amount, currency="CZK", amount_czk=None, source="uncategorized", **fields):
+        row = Transaction(
+            transaction_id=txn_id, date=datetime(2024, 3, day, 12), description=fields.pop("description", txn_id),
+            amount=Decimal(amount), currency=currency,
+            amount_czk=Decimal(amount_czk if amount_czk is not None else amount),
+            account_id=accounts[account].id if account else None, categorization_source=source,
+            is_internal_transfer=source == "internal_transfer", **fields
+        )
+        session.add(row)
+        return row
+
+    # Real transfer between own accounts (categorizer found the debit)
+    txn("own_out", CSOB, 4, "-10000", source="internal_transfer", counterparty_account=PARTNERS,
+        transaction_type="Převod mezi účty")
+    txn("own_in", PARTNERS, 5, "10000", counterparty_account=CSOB, transaction_type="Příchozí úhrada")
+    # Wise top-up from ČSOB: no counterparty on either side, EUR vs CZK
+    txn("topup_out", CSOB, 10, "-2500")
+    txn("topup_in", "wise-eur", 11, "100.00", currency="EUR", amount_czk="2488.50")
+
+    # Card payment and an unrelated refund of the same CZK value
+    txn("albert", "wise-eur", 14, "-55.13", currency="EUR", amount_czk="-1354.00", source="manual_rule",
+        category_tier1="Spotreba", counterparty_name="Albert", transaction_type="Platba kartou")
+    txn("kaufland_refund", CSOB, 15, "1354.02", counterparty_name="Kaufland", transaction_type="Vrácení platby")
+    # Uncategorized card payment vs salary credit of the same amount
+    txn("shop", CSOB, 18, "-4200", counterparty_name="Eshop s.r.o.", transaction_type="Platba kartou")
+    txn("salary", PARTNERS, 18, "4200", counterparty_name="Employer a.s.", counterparty_account="123456789/0100")
+    # Rule-categorized credit that would match a transfer-looking debit
+    txn("rent_out", CSOB, 20, "-15000", transaction_type="Převod")
+    txn("rent_in", PARTNERS, 20, "15000", source="manual_rule", category_tier1="Bývanie")
+    # Two transfers of the same amount on the same days: ambiguous
+    txn("twin_out_1", CSOB, 22, "-5000", transaction_type="Převod mezi účty")
+    txn("twin_out_2", CSOB, 22, "-5000", transaction_type="Převod mezi účty")
+    txn("twin_in_1", PARTNERS, 23, "5000")
+    txn("twin_in_2", PARTNERS, 23, "5000")
+    # Leg without an account
+    txn("orphan_out", CSOB, 26, "-777")
+    txn("orphan_in", None, 26, "777")
+    session.commit()
+
+    before = {row.transaction_id: (row.category_tier1, row.categorization_source, row.is_internal_transfer)
+              for row in session.query(Transaction)}
+    stats = run_pairing(session)
+    rows = {row.transaction_id: row for row in session.query(Transaction)}
+    paired = {txn_id for txn_id, row in rows.items() if row.transfer_pair_id}
+
+    check(f"2 pairs ({stats})", stats["pairs"] == 2)
+    check("own-account transfer paired", rows["own_out"].transfer_pair_id == rows["own_in"].transfer_pair_id is not None)
+    check("top-up without counterparty paired",
+          rows["topup_out"].transfer_pair_id == rows["topup_in"].transfer_pair_id is not None)
+    check(f"no false positives (paired: {sorted(paired)})",
+          paired == {"own_out", "own_in", "topup_out", "topup_in"})
+    check("categorized rows unchanged", all(
+        (rows[txn_id].category_tier1, rows[txn_id].categorization_source, rows[txn_id].is_internal_transfer) == state
+        for txn_id, state in before.items() if state[1] not in ("uncategorized", "internal_transfer")
+    ))
+    check("unpaired rows not marked internal", not any(
+        rows[txn_id].is_internal_transfer for txn_id in rows if txn_id not in paired and txn_id != "own_out"
+    ))
+    check("second run pairs nothing", run_pairing(session)["pairs"] == 0)
+    session.close()
+
+
+def test_seeded_database(rows: int):
+    print(f"\n2. Seeded database ({rows} transactions)")
+    from backend.database.connection import create_db_engine
+    from benchmarks.seed_db import build_database
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = build_database(Path(tmp) / "seeded.db", rows, rules=50)
+        engine = create_db_engine(f"sqlite:///{path}")
+        session = sessionmaker(bind=engine)()
+
+        columns = (Transaction.id, Transaction.category_tier1, Transaction.categorization_source,
+                   Transaction.is_internal_transfer)
+        before = session.query(*columns).all()
+        stats = run_pairing(session)
+        after = session.query(*columns).all()
+
+        check(f"no pairs among {stats['candidates']} candidates", stats["pairs"] == 0)
+        check("no transaction changed", before == after)
+        session.close()
+        engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000, help="Transactions in the seeded database")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("Testing internal transfer pairing")
+    print("=" * 80)
+
+    test_mixed_statements()
+    test_seeded_database(args.rows)
+
+    print("\n" + "=" * 80)
+    print("✅ Transfer pairing test completed successfully!")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
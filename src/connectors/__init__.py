@@ -1,6 +1,28 @@
-"""Google API connectors for Drive and Sheets."""
+"""Google API connectors for Drive and Sheets.
 
-from src.connectors.google_drive import GoogleDriveConnector
-from src.connectors.google_sheets import GoogleSheetsConnector
+The connector modules are not included in this tree, so the names are
+resolved on first access: importing the package works, using a missing
+connector raises ImportError.
+"""
+from importlib import import_module
 
-__all__ = ['GoogleDriveConnector', 'GoogleSheetsConnector']
+_EXPORTS = {
+    'GoogleDriveConnector': 'src.connectors.google_drive',
+    'GoogleSheetsConnector': 'src.connectors.google_sheets',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    try:
+        module = import_module(_EXPORTS[name])
+    except ModuleNotFoundError as e:
+        raise ImportError(
+            f"{name} is not available: {_EXPORTS[name]} is not part of this installation"
+        ) from e
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
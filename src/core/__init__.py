@@ -1,7 +1,21 @@
-"""Core processing modules."""
+"""Core processing modules.
 
-from src.core.parser import FileParser
-from src.core.normalizer import DataNormalizer
-from src.core.database_writer import DatabaseWriter
+Exports are resolved on first access (see src/utils/__init__.py).
+"""
+from importlib import import_module
 
-__all__ = ['FileParser', 'DataNormalizer', 'DatabaseWriter']
+_EXPORTS = {
+    'FileParser': 'src.core.parser',
+    'DataNormalizer': 'src.core.normalizer',
+    'DatabaseWriter': 'src.core.database_writer',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
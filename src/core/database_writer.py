@@ -3,15 +3,56 @@ Database writer for SQLite integration.
 
 Writes normalized transactions to SQLite database for web service.
 """
-from typing import List, Optional
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 from datetime import datetime
 from decimal import Decimal
+from pathlib import Path
 
 from src.models.transaction import Transaction
-from src.utils.logger import get_logger
+from src.utils.logger import get_logger, log_row
+from src.utils.timing import timed
 
 logger = get_logger(__name__)
 
+ACCOUNTS_PATH = Path("config/accounts.yaml")
+
+# Reasons of failed rows returned in the write summary (the rest are only logged)
+MAX_REPORTED_ERRORS = 10
+
+# accounts.yaml descriptions shared by all writers of the process: (mtime, {account_number: description})
+_account_descriptions: Tuple[Optional[int], Dict[str, Optional[str]]] = (None, {})
+_account_descriptions_lock = threading.Lock()
+
+
+def load_account_descriptions() -> Dict[str, Optional[str]]:
+    """
+    Account number -> description from config/accounts.yaml.
+
+    The file is parsed once per process and again only when its mtime changes.
+    """
+    global _account_descriptions
+    import yaml
+
+    try:
+        mtime = ACCOUNTS_PATH.stat().st_mtime_ns
+    except FileNotFoundError:
+        return {}
+
+    with _account_descriptions_lock:
+        if _account_descriptions[0] != mtime:
+            try:
+                with open(ACCOUNTS_PATH, 'r', encoding='utf-8') as f:
+                    config = yaml.safe_load(f) or {}
+            except Exception as e:
+                logger.warning(f"Failed to load account descriptions: {e}")
+                return {}
+            _account_descriptions = (mtime, {
+                number: (info or {}).get('description')
+                for number, info in (config.get('accounts') or {}).items()
+            })
+        return _account_descriptions[1]
+
 
 class DatabaseWriter:
     """Writes transactions to SQLite database"""
@@ -26,6 +67,9 @@ class DatabaseWriter:
         self.db_session = db_session
         self._session_created = False
 
+        # Account registry: account_number -> (account id, account_name)
+        self._accounts: Dict[str, Tuple[int, Optional[str]]] = {}
+
         if not self.db_session:
             from backend.database.connection import get_db_context
             self.db_context = get_db_context()
@@ -40,10 +84,12 @@ class DatabaseWriter:
             except:
                 pass
 
+    @timed("db_write", rows=lambda self, transactions, *args, **kwargs: len(transactions))
     def write_transactions(
         self,
         transactions: List[Transaction],
-        mode: str = "append"
+        mode: str = "append",
+        progress: Optional[Callable[[int], None]] = None
     ) -> dict:
         """
         Write transactions to SQLite database.
@@ -51,9 +97,12 @@ class DatabaseWriter:
         Args:
             transactions: List of Transaction objects to write
             mode: Write mode - "append" (skip duplicates) or "overwrite" (clear all)
+            progress: Called with the number of transactions handled so far
 
         Returns:
-            dict: Summary with counts of added/skipped/updated transactions
+            dict: Summary with counts of added/skipped/updated/failed transactions.
+                skipped are duplicates of stored transactions; failed rows could not be
+                written (errors holds the first few reasons)
         """
         from backend.database.models import Transaction as DBTransaction
         from backend.database.models import Institution, Owner, Account
@@ -67,6 +116,15 @@ class DatabaseWriter:
         added = 0
         skipped = 0
         updated = 0
+        failed = 0
+        errors: List[str] = []
+
+        def fail(message: str):
+            nonlocal failed
+            logger.error(message)
+            failed += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append(message)
 
         # Get institution mappings
         institution_map = self._get_institution_map()
@@ -75,31 +133,35 @@ class DatabaseWriter:
         if transactions:
             logger.info(f"First transaction: institution={repr(transactions[0].institution)}, account={repr(transactions[0].account)}")
 
+        # All accounts of the import in one query, new ones created in one commit
+        self._resolve_accounts(transactions, institution_map)
+
         logger.info(f"Starting transaction loop: {len(transactions)} transactions to process")
         for i, txn in enumerate(transactions):
+            if progress:
+                progress(i)
             try:
                 # Check if transaction already exists
                 existing = self.db_session.query(DBTransaction).filter(
                     DBTransaction.transaction_id == txn.transaction_id
                 ).first()
 
-                # DEBUG: Log what we found
-                if i < 3 or existing:  # Log first 3 and any duplicates
-                    logger.info(f"Transaction {i+1}/{len(transactions)}: ID={txn.transaction_id}, existing={existing is not None}, mode={mode}")
+                log_row(logger, i, len(transactions), "ID=%s, existing=%s, mode=%s",
+                        txn.transaction_id, existing is not None, mode)
 
                 if existing and mode == "append":
-                    logger.debug(f"Skipping duplicate in append mode: {txn.transaction_id}")
+                    logger.debug("Skipping duplicate in append mode: %s", txn.transaction_id)
                     skipped += 1
                     continue
 
                 # Get foreign keys (case-insensitive lookup for institution)
                 institution_id = institution_map.get(txn.institution.lower() if txn.institution else None)
 
-                # Get account description from central accounts.yaml
-                account_description = self._get_account_description(txn.account)
-
-                # Get or create account (no owner concept)
-                account_id = self._get_or_create_account(txn.account, institution_id, account_description)
+                # Account resolved up front (no owner concept)
+                account_id = self._account_id(txn.account)
+                if txn.account and account_id is None:
+                    fail(f"Transaction {txn.transaction_id}: account {txn.account} could not be created")
+                    continue
 
                 # Convert Transaction model to database model (no owner_id)
                 db_txn = self._transaction_to_db(txn, institution_id, account_id)
@@ -115,58 +177,150 @@ class DatabaseWriter:
                     self.db_session.add(new_txn)
                     added += 1
 
-                # CRITICAL FIX: Commit after each transaction to avoid conflicts with flush() in _get_or_create_account()
-                # The flush() can write pending transactions, causing IntegrityError on final commit
+                # Commit per transaction so an IntegrityError only rolls back this row
                 self.db_session.commit()
 
-                # Progress logging
-                if (added + updated) % 10 == 0:
-                    logger.info(f"Written {added + updated} transactions to database...")
 
             except IntegrityError as e:
-                logger.error(f"IntegrityError for transaction {txn.transaction_id}: {str(e)}")
-                logger.error(f"Error details: {e.orig if hasattr(e, 'orig') else 'no orig'}")
                 self.db_session.rollback()
-                skipped += 1
+                if "transactions.transaction_id" in str(getattr(e, 'orig', e)):
+                    # Stored by another import since the existence check
+                    logger.debug("Duplicate on insert: %s", txn.transaction_id)
+                    skipped += 1
+                else:
+                    fail(f"Transaction {txn.transaction_id}: {getattr(e, 'orig', e)}")
             except Exception as e:
-                logger.error(f"Error writing transaction {txn.transaction_id}: {e}")
                 self.db_session.rollback()
-                continue
+                fail(f"Transaction {txn.transaction_id}: {e}")
 
         # Final commit
         self.db_session.commit()
+        if progress:
+            progress(len(transactions))
 
         summary = {
             "added": added,
             "skipped": skipped,
             "updated": updated,
+            "failed": failed,
+            "errors": errors,
             "total": len(transactions)
         }
 
-        logger.info(f"Database write complete: {added} added, {updated} updated, {skipped} skipped")
+        logger.info(f"Database write complete: {added} added, {updated} updated, {skipped} skipped, {failed} failed")
         return summary
 
-    def _get_account_description(self, account_number: Optional[str]) -> Optional[str]:
-        """Get account description from central accounts.yaml config"""
-        import yaml
-        from pathlib import Path
+    @timed("db_write", rows=lambda self, transactions, *args, **kwargs: len(transactions))
+    def bulk_write_transactions(
+        self,
+        transactions: List[Transaction],
+        mode: str = "append",
+        chunk_size: int = 500,
+        progress: Optional[Callable[[int], None]] = None
+    ) -> dict:
+        """
+        Write transactions in chunks: one existence query and one commit per chunk.
+
+        Used for batch imports. Transactions are written in the given order and a
+        transaction_id repeated within the input is written once (first wins).
 
-        if not account_number:
-            return None
+        Args:
+            transactions: List of Transaction objects to write
+            mode: Write mode - "append" (skip duplicates) or "overwrite" (update existing)
+            chunk_size: Transactions per query/commit
+            progress: Called with the number of unique transactions written so far after every chunk
 
-        try:
-            accounts_path = Path("config/accounts.yaml")
-            if not accounts_path.exists():
-                return None
+        Returns:
+            dict: Summary with counts of added/skipped/updated transactions
+        """
+        from backend.database.models import Transaction as DBTransaction
+
+        added = 0
+        skipped = 0
+        updated = 0
+
+        institution_map = self._get_institution_map()
+
+        # Drop repeated transaction_ids (overlapping statements in one batch)
+        seen = set()
+        unique = []
+        for txn in transactions:
+            if txn.transaction_id in seen:
+                skipped += 1
+                continue
+            seen.add(txn.transaction_id)
+            unique.append(txn)
+
+        logger.info(f"Bulk writing {len(unique)} transactions (mode: {mode}, {skipped} repeated in input)")
+
+        self._resolve_accounts(unique, institution_map)
+        missing = sorted({txn.account for txn in unique if txn.account and self._account_id(txn.account) is None})
+        if missing:
+            raise ValueError(f"Accounts could not be created (unknown institution): {', '.join(missing)}")
+
+        for start in range(0, len(unique), chunk_size):
+            chunk = unique[start:start + chunk_size]
+            chunk_ids = [txn.transaction_id for txn in chunk]
+
+            try:
+                if mode == "append":
+                    existing = {
+                        row.transaction_id: None
+                        for row in self.db_session.query(DBTransaction.transaction_id).filter(
+                            DBTransaction.transaction_id.in_(chunk_ids)
+                        )
+                    }
+                else:
+                    existing = {
+                        row.transaction_id: row
+                        for row in self.db_session.query(DBTransaction).filter(
+                            DBTransaction.transaction_id.in_(chunk_ids)
+                        )
+                    }
+
+                new_rows = []
+                for txn in chunk:
+                    if txn.transaction_id in existing and mode == "append":
+                        skipped += 1
+                        continue
+
+                    institution_id = institution_map.get(txn.institution.lower() if txn.institution else None)
+
+                    db_txn = self._transaction_to_db(txn, institution_id, self._account_id(txn.account))
+
+                    existing_row = existing.get(txn.transaction_id)
+                    if existing_row is not None:
+                        for key, value in db_txn.items():
+                            setattr(existing_row, key, value)
+                        updated += 1
+                    else:
+                        new_rows.append(db_txn)
+
+                if new_rows:
+                    self.db_session.bulk_insert_mappings(DBTransaction, new_rows)
+                    added += len(new_rows)
+
+                self.db_session.commit()
+                logger.info(f"Written {added + updated} transactions to database...")
+                if progress:
+                    progress(start + len(chunk))
+
+            except Exception as e:
+                logger.error(f"Error writing chunk starting at {chunk_ids[0]}: {e}")
+                self.db_session.rollback()
+                raise
+
+        summary = {
+            "added": added,
+            "skipped": skipped,
+            "updated": updated,
+            "failed": 0,  # Any error fails the whole write
+            "errors": [],
+            "total": len(transactions)
+        }
 
-            with open(accounts_path, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
-                accounts = config.get('accounts', {})
-                account_info = accounts.get(account_number, {})
-                return account_info.get('description')
-        except Exception as e:
-            logger.warning(f"Failed to load account description: {e}")
-            return None
+        logger.info(f"Database write complete: {added} added, {updated} updated, {skipped} skipped")
+        return summary
 
     def _get_institution_map(self) -> dict:
         """Get mapping of institution names to IDs"""
@@ -187,43 +341,68 @@ class DatabaseWriter:
 
         return inst_map
 
-    def _get_or_create_account(
-        self,
-        account_number: Optional[str],
-        institution_id: Optional[int],
-        account_description: Optional[str]
-    ) -> Optional[int]:
-        """Get or create account record"""
+    def _account_id(self, account_number: Optional[str]) -> Optional[int]:
+        """Id of a resolved account (None for no account or one that couldn't be created)"""
+        entry = self._accounts.get(account_number) if account_number else None
+        return entry[0] if entry else None
+
+    @timed("db_write.accounts")
+    def _resolve_accounts(self, transactions: Iterable[Transaction], institution_map: dict):
+        """
+        Add the accounts of transactions to the account registry.
+
+        Accounts not yet in the registry are loaded with one query. Names that
+        differ from accounts.yaml are updated, and missing accounts are created
+        together in one commit. An account whose institution is unknown can't be
+        created and stays out of the registry.
+        """
         from backend.database.models import Account
 
-        if not account_number:
-            return None
-
-        # Check if account exists
-        account = self.db_session.query(Account).filter(
-            Account.account_number == account_number
-        ).first()
-
-        if account:
-            # Update description if changed
-            if account_description and account.account_name != account_description:
-                account.account_name = account_description
-                logger.info(f"Updated account description: {account_number} -> {account_description}")
-            return account.id
-
-        # Create new account
-        new_account = Account(
-            account_number=account_number,
-            account_name=account_description,
-            institution_id=institution_id,
-            owner_id=None,  # No owner concept
-            is_active=True
-        )
-        self.db_session.add(new_account)
-        self.db_session.flush()
-
-        logger.info(f"Created new account: {account_number} ({account_description or 'no description'})")
-        return new_account.id
+        institutions: Dict[str, Optional[int]] = {}
+        for txn in transactions:
+            if txn.account and txn.account not in self._accounts and txn.account not in institutions:
+                institutions[txn.account] = institution_map.get(txn.institution.lower() if txn.institution else None)
+
+        if not institutions:
+            return
+
+        descriptions = load_account_descriptions()
+        accounts = {
+            account.account_number: account
+            for account in self.db_session.query(Account).filter(
+                Account.account_number.in_(list(institutions))
+            )
+        }
+
+        for account_number, institution_id in institutions.items():
+            description = descriptions.get(account_number)
+            account = accounts.get(account_number)
+
+            if account is not None:
+                # Update description if changed
+                if description and account.account_name != description:
+                    account.account_name = description
+                    logger.info(f"Updated account description: {account_number} -> {description}")
+                continue
+
+            if institution_id is None:
+                logger.error(f"Cannot create account {account_number}: institution not found")
+                continue
+
+            accounts[account_number] = Account(
+                account_number=account_number,
+                account_name=description,
+                institution_id=institution_id,
+                owner_id=None,  # No owner concept
+                is_active=True
+            )
+            self.db_session.add(accounts[account_number])
+            logger.info(f"Created new account: {account_number} ({description or 'no description'})")
+
+        self.db_session.commit()
+
+        for account_number, account in accounts.items():
+            self._accounts[account_number] = (account.id, account.account_name)
 
     def _transaction_to_db(
         self,
@@ -233,7 +412,7 @@ class DatabaseWriter:
     ) -> dict:
         """Convert Transaction model to database dict"""
 
-        # Convert Decimal to float for SQLite
+        # Convert Decimal to float for SQLite (amounts stay Decimal: MinorUnits stores exact cents)
         def to_float(val):
             if val is None:
                 return None
@@ -245,9 +424,9 @@ class DatabaseWriter:
             "transaction_id": txn.transaction_id,
             "date": txn.date,
             "description": txn.description or "",
-            "amount": to_float(txn.amount),
+            "amount": txn.amount,
             "currency": txn.currency,
-            "amount_czk": to_float(txn.amount_czk),
+            "amount_czk": txn.amount_czk,
             "exchange_rate": to_float(txn.exchange_rate),
             "category_tier1": txn.category_tier1,
             "category_tier2": txn.category_tier2,
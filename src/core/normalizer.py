@@ -11,6 +11,7 @@ from src.models.transaction import Transaction
 from src.utils.currency import CurrencyConverter, normalize_currency_code
 from src.utils.date_parser import parse_date, parse_czech_date
 from src.utils.logger import get_logger
+from src.utils.timing import span
 
 logger = get_logger()
 
@@ -18,6 +19,9 @@ logger = get_logger()
 class DataNormalizer:
     """Normalize raw parsed data into Transaction objects."""
 
+    # Rows normalized per batched currency conversion
+    CHUNK_SIZE = 500
+
     def __init__(self, currency_converter: CurrencyConverter, institution_config: Dict[str, Any]):
         """
         Initialize normalizer.
@@ -78,14 +82,22 @@ class DataNormalizer:
         """
         transactions = []
 
-        for i, raw_txn in enumerate(raw_transactions):
-            try:
-                txn = self.normalize_transaction(raw_txn, source_file)
-                if txn:
-                    transactions.append(txn)
-            except Exception as e:
-                logger.warning(f"Failed to normalize transaction {i+1}: {str(e)}")
-                logger.debug(f"Raw transaction: {raw_txn}")
+        with span("normalize", rows=len(raw_transactions)):
+            for start in range(0, len(raw_transactions), self.CHUNK_SIZE):
+                chunk = []
+                for i, raw_txn in enumerate(raw_transactions[start:start + self.CHUNK_SIZE], start):
+                    try:
+                        txn = self.normalize_transaction(raw_txn, source_file, convert_currency=False)
+                        if txn:
+                            chunk.append(txn)
+                    except Exception as e:
+                        logger.warning(f"Failed to normalize transaction {i+1}: {str(e)}")
+                        logger.debug("Raw transaction: %s", raw_txn)
+
+                # One batched conversion per chunk: each (currency, date) rate is resolved once
+                with span("currency_conversion", rows=len(chunk)):
+                    self._convert_to_czk(chunk)
+                transactions.extend(chunk)
 
         logger.info(f"Normalized {len(transactions)} out of {len(raw_transactions)} transactions")
         return transactions
@@ -115,10 +127,36 @@ class DataNormalizer:
 
         return cleaned
 
+    def _convert_to_czk(self, transactions: List[Transaction]):
+        """Fill amount_czk and exchange_rate of a chunk with one batched conversion"""
+        if not transactions:
+            return
+
+        try:
+            # Pass transaction date for accurate historical exchange rates
+            amounts_czk = self.converter.convert_many(
+                [txn.amount for txn in transactions],
+                [txn.currency for txn in transactions],
+                [txn.date.date() if hasattr(txn.date, 'date') else txn.date for txn in transactions],
+                'CZK'
+            )
+        except Exception as e:
+            logger.warning(f"Currency conversion failed: {e}")
+            amounts_czk = [txn.amount for txn in transactions]  # Fallback to original
+
+        for txn, amount_czk in zip(transactions, amounts_czk):
+            txn.amount_czk = amount_czk
+            # Actual exchange rate used: 1 foreign currency = X CZK
+            if txn.currency != 'CZK' and txn.amount != 0:
+                txn.exchange_rate = amount_czk / txn.amount
+            else:
+                txn.exchange_rate = Decimal('1.0')
+
     def normalize_transaction(
         self,
         raw_data: Dict[str, Any],
-        source_file: str
+        source_file: str,
+        convert_currency: bool = True
     ) -> Optional[Transaction]:
         """
         Convert raw transaction dict to Transaction object.
@@ -126,6 +164,8 @@ class DataNormalizer:
         Args:
             raw_data: Raw transaction dictionary from parser
             source_file: Source filename
+            convert_currency: Convert to CZK now (False leaves it to a batched
+                              _convert_to_czk call over a chunk)
 
         Returns:
             Transaction object or None if invalid
@@ -147,28 +187,6 @@ class DataNormalizer:
         currency_raw = str(raw_data.get('currency', 'CZK')).strip().strip('"').strip("'")
         currency = normalize_currency_code(currency_raw)
 
-        # Convert to CZK (base currency)
-        try:
-            # Pass transaction date for accurate historical exchange rates
-            transaction_date = date.date() if hasattr(date, 'date') else date
-            amount_czk = self.converter.convert(
-                amount,
-                currency,
-                'CZK',
-                transaction_date=transaction_date
-            )
-            logger.debug(f"Converted {amount} {currency} to {amount_czk} CZK on {transaction_date}")
-        except Exception as e:
-            logger.warning(f"Currency conversion failed: {e}")
-            amount_czk = amount  # Fallback to original
-
-        # Calculate the actual exchange rate used (amount_czk / amount)
-        # This gives us: 1 foreign currency = X CZK
-        if currency != 'CZK' and amount != 0:
-            actual_exchange_rate = amount_czk / amount
-        else:
-            actual_exchange_rate = Decimal('1.0')
-
         # Get description
         description = self._get_description(raw_data)
 
@@ -203,7 +221,7 @@ class DataNormalizer:
                 source_name = self._clean_string_field(raw_data.get('_source_name', ''))
                 if source_name:
                     counterparty_name_value = source_name
-                    logger.debug(f"Wise IN transfer: using Source name '{source_name}' as counterparty")
+                    logger.debug("Wise IN transfer: using Source name '%s' as counterparty", source_name)
 
         # Create Transaction object
         transaction = Transaction(
@@ -211,7 +229,7 @@ class DataNormalizer:
             description=description,
             amount=amount,
             currency=currency,
-            amount_czk=amount_czk,
+            amount_czk=amount,  # Set by _convert_to_czk
             category=category,
             account=account,
             institution=self.institution_name,
@@ -229,9 +247,12 @@ class DataNormalizer:
             constant_symbol=self._clean_string_field(raw_data.get('constant_symbol', '')),
             specific_symbol=self._clean_string_field(raw_data.get('specific_symbol', '')),
             note=self._clean_string_field(raw_data.get('note', '')),
-            exchange_rate=actual_exchange_rate
+            exchange_rate=Decimal('1.0')
         )
 
+        if convert_currency:
+            self._convert_to_czk([transaction])
+
         return transaction
 
     def _parse_date(self, date_str: str) -> Optional[datetime]:
@@ -498,7 +519,7 @@ class DataNormalizer:
         # Format: TXN_YYYYMMDD_<hash8>
         transaction_id = f"TXN_{date_str}_{hash_hex}"
 
-        logger.debug(f"Generated transaction ID: {transaction_id}")
+        logger.debug("Generated transaction ID: %s", transaction_id)
 
         return transaction_id
 
@@ -4,8 +4,8 @@ import csv
 import re
 from pathlib import Path
 from typing import List, Dict, Any, Optional
-import openpyxl
 from src.utils.logger import get_logger
+from src.utils.timing import span
 
 logger = get_logger()
 
@@ -62,13 +62,15 @@ class FileParser:
                 file_type = 'xlsx' if file_extension in ['.xlsx', '.xls'] else 'csv'
 
             # Route to appropriate parser
-            if file_type == 'csv':
-                transactions = self._parse_csv(file_path, filename_for_extraction)
-            elif file_type == 'xlsx':
-                transactions = self._parse_xlsx(file_path, filename_for_extraction)
-            else:
-                logger.error(f"Unsupported file type: {file_type}")
-                return []
+            with span("parse") as parse_span:
+                if file_type == 'csv':
+                    transactions = self._parse_csv(file_path, filename_for_extraction)
+                elif file_type == 'xlsx':
+                    transactions = self._parse_xlsx(file_path, filename_for_extraction)
+                else:
+                    logger.error(f"Unsupported file type: {file_type}")
+                    return []
+                parse_span.rows = len(transactions)
 
             logger.info(f"Successfully parsed {len(transactions)} transactions from {file_path_obj.name}")
             return transactions
@@ -127,7 +129,7 @@ class FileParser:
                     for pattern in skip_patterns:
                         row_values = row.values() if isinstance(row, dict) else row
                         if any(pattern in str(value) for value in row_values):
-                            logger.debug(f"Skipping row {row_num} (matches pattern: {pattern})")
+                            logger.debug("Skipping row %d (matches pattern: %s)", row_num, pattern)
                             skip_row = True
                             break
 
@@ -176,6 +178,9 @@ class FileParser:
         column_mapping = self.config.get('columns', self.config.get('column_mapping', {}))
 
         try:
+            # openpyxl takes ~200 ms to import; only XLSX exports need it
+            import openpyxl
+
             # Load workbook
             wb = openpyxl.load_workbook(file_path, data_only=True)
 
@@ -1,16 +1,28 @@
-"""Utility modules."""
+"""Utility modules.
 
-from .logger import setup_logger, get_logger
-from .currency import CurrencyConverter, normalize_currency_code
-from .date_parser import parse_date, format_date, parse_czech_date, get_date_range
+Exports are resolved on first access, so importing one submodule
+(e.g. src.utils.metrics from the API) doesn't load the others and their
+dependencies (dateutil, requests).
+"""
+from importlib import import_module
 
-__all__ = [
-    'setup_logger',
-    'get_logger',
-    'CurrencyConverter',
-    'normalize_currency_code',
-    'parse_date',
-    'format_date',
-    'parse_czech_date',
-    'get_date_range',
-]
+_EXPORTS = {
+    'setup_logger': 'src.utils.logger',
+    'get_logger': 'src.utils.logger',
+    'CurrencyConverter': 'src.utils.currency',
+    'normalize_currency_code': 'src.utils.currency',
+    'parse_date': 'src.utils.date_parser',
+    'format_date': 'src.utils.date_parser',
+    'parse_czech_date': 'src.utils.date_parser',
+    'get_date_range': 'src.utils.date_parser',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
@@ -19,8 +19,27 @@ from datetime import date, datetime, timedelta
 from decimal import Decimal
 from collections import deque
 
+from src.utils.metrics import counter, gauge, histogram
+from src.utils.timing import span
+
 logger = logging.getLogger(__name__)
 
+AI_REQUESTS = counter(
+    "finance_ai_requests_total",
+    "Gemini API requests by HTTP status (error = no response)",
+    ("code",)
+)
+AI_LATENCY = histogram(
+    "finance_ai_request_duration_seconds",
+    "Gemini API request latency",
+    buckets=(0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0)
+)
+AI_QUOTA_REMAINING = gauge(
+    "finance_ai_quota_remaining",
+    "Gemini API calls left in the configured rate limit window",
+    ("window",)
+)
+
 
 class TransactionCategorizer:
     """
@@ -56,6 +75,7 @@ class TransactionCategorizer:
         self.transfer_keywords = self.config.get('internal_transfers', {}).get(
             'detection_methods', []
         )
+        self._build_transfer_detection()
 
         # Load manual rules (from Google Sheets or YAML)
         self.manual_rules = []
@@ -290,15 +310,14 @@ class TransactionCategorizer:
             - ai_confidence: 0-100 if source is "ai", None otherwise
         """
         # 1. Check internal transfer
-        if self._is_internal_transfer(transaction):
-            logger.debug(f"Detected internal transfer: {transaction.get('description', '')[:50]}")
-            transfer_cat = self.config.get('internal_transfers', {}).get('category', {})
+        with span("categorize.internal_transfer", rows=1):
+            is_internal = self._is_internal_transfer(transaction)
+        if is_internal:
+            logger.debug("Detected internal transfer: %.50s", transaction.get('description', ''))
             # Owner still determined by fallback for internal transfers
             owner = self._determine_owner(transaction)
             return (
-                transfer_cat.get('tier1', 'Transfers'),
-                transfer_cat.get('tier2', 'Internal Transfer'),
-                transfer_cat.get('tier3', 'Between Own Accounts'),
+                *self._transfer_category,
                 owner,
                 True,  # is_internal_transfer
                 'internal_transfer',  # categorization_source
@@ -306,7 +325,8 @@ class TransactionCategorizer:
             )
 
         # 2. Try manual rules (now returns owner too)
-        result = self._apply_manual_rules(transaction)
+        with span("categorize.rules", rows=1):
+            result = self._apply_manual_rules(transaction)
         if result:
             tier1, tier2, tier3, owner_from_rule = result
             # If owner not in rule, use fallback
@@ -316,14 +336,15 @@ class TransactionCategorizer:
 
         # 3. Try AI fallback (unless disabled)
         if self.ai_enabled and not disable_ai:
-            result = self._apply_ai_categorization(transaction)
+            with span("categorize.ai", rows=1):
+                result = self._apply_ai_categorization(transaction)
             if result:
                 tier1, tier2, tier3, confidence = result
                 owner = self._determine_owner(transaction)
                 return (tier1, tier2, tier3, owner, False, 'ai', confidence)
 
         # 4. Default to uncategorized
-        logger.debug(f"No category found for: {transaction.get('description', '')[:50]}")
+        logger.debug("No category found for: %.50s", transaction.get('description', ''))
         owner = self._determine_owner(transaction)
         return ("Uncategorized", "Needs Review", "Unknown Transaction", owner, False, 'uncategorized', None)
 
@@ -352,6 +373,47 @@ class TransactionCategorizer:
         # Fallback to transaction's existing owner field
         return transaction.get('owner', 'Unknown')
 
+    def _build_transfer_detection(self):
+        """
+        Precompute the internal transfer checks from the internal_transfers config.
+
+        Builds frozen exclusion sets, the own accounts to match exactly, their
+        base numbers without bank code ("283337817/0300" -> "283337817") and
+        one case-insensitive regex for all description keywords, so each
+        transaction is checked with set lookups and a single regex search.
+        """
+        transfer_config = self.config.get('internal_transfers', {}) or {}
+        exclusions = transfer_config.get('exclusions', {}) or {}
+        self._excluded_counterparty_names = frozenset(exclusions.get('counterparty_names', []))
+        self._excluded_transaction_types = frozenset(exclusions.get('transaction_types', []))
+
+        transfer_cat = transfer_config.get('category', {}) or {}
+        self._transfer_category = (
+            transfer_cat.get('tier1', 'Transfers'),
+            transfer_cat.get('tier2', 'Internal Transfer'),
+            transfer_cat.get('tier3', 'Between Own Accounts'),
+        )
+
+        methods = [m for m in transfer_config.get('detection_methods', []) if m.get('enabled', True)]
+
+        self._own_accounts_exact = frozenset()
+        self._own_account_bases: Dict[str, str] = {}  # base number -> own account
+        if any(m.get('type') == 'counterparty_in_own_accounts' for m in methods):
+            self._own_accounts_exact = frozenset(self.own_accounts)
+            for own_account in sorted(self.own_accounts):
+                self._own_account_bases.setdefault(own_account.split('/')[0], own_account)
+
+        keywords = [
+            keyword
+            for m in methods if m.get('type') == 'description_keywords'
+            for keyword in m.get('keywords', []) if keyword
+        ]
+        self._transfer_keyword_pattern = None
+        if keywords:
+            # Longest first, so the reported match is the most specific keyword
+            alternation = '|'.join(re.escape(k) for k in sorted(set(keywords), key=len, reverse=True))
+            self._transfer_keyword_pattern = re.compile(alternation, re.IGNORECASE)
+
     def _is_internal_transfer(self, transaction: Dict[str, Any]) -> bool:
         """
         Detect if transaction is an internal transfer.
@@ -361,65 +423,43 @@ class TransactionCategorizer:
         2. Description keywords
         """
         # Check exclusions first - if any exclusion matches, NOT an internal transfer
-        exclusions = self.config.get('internal_transfers', {}).get('exclusions', {})
-
         # Exclude specific counterparty names (e.g., TransferWise cashback, Amazon refunds)
-        exclude_counterparty_names = exclusions.get('counterparty_names', [])
         counterparty_name = transaction.get('counterparty_name', '')
-        if counterparty_name in exclude_counterparty_names:
-            logger.debug(f"Excluded from internal transfer: counterparty_name '{counterparty_name}' in exclusion list")
+        if counterparty_name in self._excluded_counterparty_names:
+            logger.debug("Excluded from internal transfer: counterparty_name '%s' in exclusion list", counterparty_name)
             return False
 
         # Exclude specific transaction types (e.g., Úroky/Interest is income, not transfer)
-        exclude_transaction_types = exclusions.get('transaction_types', [])
         transaction_type = transaction.get('type', '')
-        if transaction_type in exclude_transaction_types:
-            logger.debug(f"Excluded from internal transfer: transaction_type '{transaction_type}' in exclusion list")
+        if transaction_type in self._excluded_transaction_types:
+            logger.debug("Excluded from internal transfer: transaction_type '%s' in exclusion list", transaction_type)
             return False
 
-        # Now proceed with detection methods
-        detection_methods = self.config.get('internal_transfers', {}).get('detection_methods', [])
-
-        # Debug: Log what we're checking
-        account = transaction.get('account', '')
+        # Method 1: Counterparty in own accounts
         counterparty = transaction.get('counterparty_account', '')
-        logger.debug(f"Checking internal transfer: account='{account}', counterparty='{counterparty}', own_accounts={self.own_accounts}")
-
-        for method in detection_methods:
-            if not method.get('enabled', True):
-                continue
-
-            method_type = method.get('type')
-
-            # Method 1: Counterparty in own accounts
-            if method_type == 'counterparty_in_own_accounts':
-                # Try exact match first
-                if counterparty in self.own_accounts:
-                    logger.info(f"✓ Internal transfer detected: counterparty '{counterparty}' in own accounts (exact match)")
-                    return True
-
-                # Fallback: Try matching base account number (without bank code)
-                # This handles format variations like "123456789" vs "123456789/0300"
-                if counterparty:
-                    counterparty_base = counterparty.split('/')[0] if '/' in counterparty else counterparty
-                    for own_account in self.own_accounts:
-                        own_account_base = own_account.split('/')[0] if '/' in own_account else own_account
-                        if counterparty_base == own_account_base:
-                            logger.info(f"✓ Internal transfer detected: counterparty base '{counterparty_base}' matches own account '{own_account}' (flexible match)")
-                            return True
-
-                logger.debug(f"✗ No match: counterparty='{counterparty}' not in own_accounts")
-
-            # Method 2: Description keywords
-            elif method_type == 'description_keywords':
-                description = transaction.get('description', '').upper()
-                counterparty_name = transaction.get('counterparty_name', '').upper()
-                keywords = method.get('keywords', [])
-
-                for keyword in keywords:
-                    if keyword.upper() in description or keyword.upper() in counterparty_name:
-                        logger.debug(f"Internal transfer detected: keyword '{keyword}' found")
-                        return True
+        if counterparty:
+            if counterparty in self._own_accounts_exact:
+                logger.debug("Internal transfer detected: counterparty '%s' in own accounts (exact match)", counterparty)
+                return True
+
+            # Fallback: match base account number (without bank code)
+            # This handles format variations like "123456789" vs "123456789/0300"
+            counterparty_base = counterparty.split('/')[0]
+            own_account = self._own_account_bases.get(counterparty_base)
+            if own_account:
+                logger.debug("Internal transfer detected: counterparty base '%s' matches own account '%s' (flexible match)",
+                             counterparty_base, own_account)
+                return True
+
+        # Method 2: Description keywords
+        if self._transfer_keyword_pattern:
+            match = (
+                self._transfer_keyword_pattern.search(transaction.get('description') or '')
+                or self._transfer_keyword_pattern.search(counterparty_name or '')
+            )
+            if match:
+                logger.debug("Internal transfer detected: keyword '%s' found", match.group(0))
+                return True
 
         return False
 
@@ -455,7 +495,7 @@ class TransactionCategorizer:
                     tier3 = category.get('tier3') or ''
                     owner = ''
 
-                logger.debug(f"Rule matched: {tier1} > {tier2} > {tier3}" + (f" (owner: {owner})" if owner else ""))
+                logger.debug("Rule matched: %s > %s > %s (owner: %s)", tier1, tier2, tier3, owner)
                 return (tier1, tier2, tier3, owner)
 
         return None
@@ -549,7 +589,7 @@ class TransactionCategorizer:
 
         # If no criteria were specified, this rule is invalid and should not match
         if not has_criteria:
-            logger.debug(f"Rule skipped: no matching criteria specified (tier1={rule.get('tier1')})")
+            logger.debug("Rule skipped: no matching criteria specified (tier1=%s)", rule.get('tier1'))
             return False
 
         # All specified conditions matched
@@ -766,6 +806,8 @@ class TransactionCategorizer:
         # Record this call
         self._api_call_timestamps.append(current_time)
         self._daily_api_calls += 1
+        AI_QUOTA_REMAINING.labels("minute").set(requests_per_minute - len(self._api_call_timestamps))
+        AI_QUOTA_REMAINING.labels("day").set(requests_per_day - self._daily_api_calls)
 
     def _call_gemini_api(self, prompt: str) -> str:
         """
@@ -808,7 +850,15 @@ class TransactionCategorizer:
                 self._wait_for_rate_limit()
 
                 # Make API request
-                response = requests.post(url, json=payload, headers=headers, timeout=30)
+                started = time.perf_counter()
+                try:
+                    response = requests.post(url, json=payload, headers=headers, timeout=30)
+                except Exception:
+                    AI_REQUESTS.labels("error").inc()
+                    raise
+                finally:
+                    AI_LATENCY.observe(time.perf_counter() - started)
+                AI_REQUESTS.labels(response.status_code).inc()
                 response.raise_for_status()
 
                 data = response.json()
@@ -1,16 +1,18 @@
 """
 Czech National Bank (CNB) API Integration
-Fetches real-time exchange rates from official CNB source
+Fetches historical and current exchange rates from official CNB source
 """
 
 import requests
 import logging
+import decimal
 from decimal import Decimal
 from datetime import date, datetime, timedelta
-from typing import Dict, Optional
-import json
+from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 
+from src.utils.cnb_rate_store import CNBRateStore
+
 logger = logging.getLogger(__name__)
 
 
@@ -18,67 +20,125 @@ class CNBExchangeRates:
     """
     Fetch and cache exchange rates from Czech National Bank.
 
-    CNB publishes daily exchange rates around 2:30 PM CET.
-    All rates are expressed as: 1 CZK = X foreign currency
-    (or amount foreign currency = 1 CZK)
+    CNB publishes daily exchange rates around 2:30 PM CET on business days.
+    Rates are downloaded a whole year at a time (year.txt) and kept in a
+    per-date table; a date without a fixing (weekend, holiday, today before
+    publication) uses the most recent earlier fixing.
+
+    All rates are expressed as CZK per 1 unit of foreign currency.
 
-    Example CNB format:
-    Country|Currency|Amount|Code|Rate
-    USA|dollar|1|USD|22.795
-    (meaning 1 USD = 22.795 CZK)
+    Example CNB year.txt format:
+    Date|1 AUD|1 EUR|100 JPY|1 USD
+    02.01.2024|15.215|24.405|15.854|22.367
+    (meaning 1 USD = 22.367 CZK, 100 JPY = 15.854 CZK)
     """
 
     CNB_DAILY_URL = "https://www.cnb.cz/en/financial-markets/foreign-exchange-market/central-bank-exchange-rate-fixing/central-bank-exchange-rate-fixing/daily.txt"
+    CNB_YEAR_URL = "https://www.cnb.cz/en/financial-markets/foreign-exchange-market/central-bank-exchange-rate-fixing/central-bank-exchange-rate-fixing/year.txt"
+
+    # How often the current year is re-downloaded when a newer fixing is needed
+    REFRESH_INTERVAL = timedelta(hours=1)
 
-    def __init__(self, cache_dir: str = "data/cache"):
+    def __init__(self, cache_dir: str = "data/cache", year_url: Optional[str] = None):
         """
         Initialize CNB API client.
 
         Args:
             cache_dir: Directory to store cached rates
+            year_url: URL of the CNB yearly rate file (override for tests/mirrors)
         """
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
-        self.cache_file = self.cache_dir / "cnb_rates_cache.json"
+        self.year_url = year_url or self.CNB_YEAR_URL
+
+        # Per-date rate table, memory-mapped from data/cache/cnb_rates.bin
+        self.store = CNBRateStore(self.cache_dir / "cnb_rates.bin")
+        self._failed_years: Dict[int, datetime] = {}  # year -> last failed download
+
+    def _download_year(self, year: int) -> List[Tuple[date, Dict[str, Decimal]]]:
+        """Download and parse the CNB rate file of one year"""
+        logger.info(f"Downloading CNB exchange rates for {year}...")
+        response = requests.get(self.year_url, params={"year": year}, timeout=30)
+        response.raise_for_status()
+        fixings = self._parse_cnb_year(response.text)
+        logger.info(f"Fetched {len(fixings)} CNB fixings for {year}")
+        return fixings
+
+    def _ensure_year(self, year: int, needed_date: Optional[date] = None):
+        """
+        Make sure a year is in the rate store.
 
-        # In-memory cache
-        self._rates_cache: Dict[str, Dict[str, Decimal]] = {}
+        Downloads the year when it isn't stored, or when it is the current
+        year and the stored copy is older than needed_date and REFRESH_INTERVAL.
+        """
+        fetched_at = self.store.fetched_at(year)
+        if fetched_at is None:
+            # Another worker process may have downloaded it meanwhile
+            self.store.refresh()
+            fetched_at = self.store.fetched_at(year)
+
+        if fetched_at is not None:
+            # A year is complete once it was downloaded after it ended
+            if fetched_at.date() > date(year, 12, 31):
+                return
+            last_fixing = self._last_fixing_in_year(year)
+            if needed_date is None or (last_fixing and needed_date <= last_fixing):
+                return
+            if datetime.now() - fetched_at < self.REFRESH_INTERVAL:
+                return
+
+        # Don't retry a failed download for every row of an import
+        failed_at = self._failed_years.get(year)
+        if failed_at and datetime.now() - failed_at < self.REFRESH_INTERVAL:
+            raise requests.RequestException(f"CNB download for {year} failed recently, not retrying yet")
 
-        # Load from disk cache
-        self._load_cache_from_disk()
+        try:
+            fixings = self._download_year(year)
+        except requests.RequestException:
+            self._failed_years[year] = datetime.now()
+            raise
 
-    def _load_cache_from_disk(self):
-        """Load cached rates from disk."""
-        if self.cache_file.exists():
-            try:
-                with open(self.cache_file, 'r', encoding='utf-8') as f:
-                    cache_data = json.load(f)
+        try:
+            self.store.write(fixings, {year: datetime.now()})
+        except OSError as e:
+            raise ValueError(f"Could not store CNB rates for {year}: {e}") from e
 
-                # Convert string decimals back to Decimal
-                for date_str, rates in cache_data.items():
-                    self._rates_cache[date_str] = {
-                        code: Decimal(rate) for code, rate in rates.items()
-                    }
+    def _last_fixing_in_year(self, year: int) -> Optional[date]:
+        index = self.store.index_on_or_before(date(year, 12, 31))
+        if index >= 0 and self.store.date_at(index).year == year:
+            return self.store.date_at(index)
+        return None
 
-                logger.info(f"Loaded {len(self._rates_cache)} cached rate sets from disk")
-            except Exception as e:
-                logger.warning(f"Could not load rate cache: {e}")
+    def lookup(self, target_date: Optional[date] = None) -> Tuple[date, Dict[str, Decimal]]:
+        """
+        Find the fixing that applies to a date.
 
-    def _save_cache_to_disk(self):
-        """Save cached rates to disk."""
-        try:
-            # Convert Decimal to string for JSON
-            cache_data = {
-                date_str: {code: str(rate) for code, rate in rates.items()}
-                for date_str, rates in self._rates_cache.items()
-            }
+        Args:
+            target_date: Date to get rates for (default: today)
+
+        Returns:
+            (fixing date, rates) of the latest fixing on or before target_date
+
+        Raises:
+            requests.RequestException: If rates are needed from CNB and the request fails
+            ValueError: If CNB has no fixing on or before target_date
+        """
+        today = date.today()
+        if target_date is None or target_date > today:
+            target_date = today
+
+        self._ensure_year(target_date.year, target_date)
+        index = self.store.index_on_or_before(target_date)
 
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, indent=2)
+        # Before the first fixing of the year (e.g. 1 January) - use the previous year
+        if index < 0 or self.store.date_at(index).year != target_date.year:
+            self._ensure_year(target_date.year - 1)
+            index = self.store.index_on_or_before(target_date)
 
-            logger.debug(f"Saved rate cache to disk: {len(cache_data)} dates")
-        except Exception as e:
-            logger.warning(f"Could not save rate cache: {e}")
+        if index < 0:
+            raise ValueError(f"No CNB fixing on or before {target_date}")
+
+        return self.store.date_at(index), self.store.rates_at(index)
 
     def fetch_rates(self, target_date: Optional[date] = None) -> Dict[str, Decimal]:
         """
@@ -92,47 +152,63 @@ class CNBExchangeRates:
             Example: {'USD': Decimal('22.795'), 'EUR': Decimal('24.120')}
 
         Raises:
-            requests.RequestException: If API request fails
+            requests.RequestException: If API request fails and nothing is cached
         """
-        if target_date is None:
-            target_date = date.today()
+        try:
+            return self.lookup(target_date)[1]
 
-        date_str = target_date.isoformat()
+        except (requests.RequestException, ValueError) as e:
+            logger.error(f"Failed to fetch rates from CNB: {e}")
 
-        # Check cache first
-        if date_str in self._rates_cache:
-            logger.debug(f"Using cached rates for {date_str}")
-            return self._rates_cache[date_str]
+            # Try to use the closest cached rates
+            if len(self.store):
+                index = max(0, self.store.index_on_or_before(target_date or date.today()))
+                logger.warning(f"Using cached rates from {self.store.date_at(index)} as fallback")
+                return self.store.rates_at(index)
 
-        logger.info(f"Fetching exchange rates from CNB for {date_str}...")
+            raise
 
-        try:
-            # CNB daily.txt returns today's rates (or most recent if weekend)
-            response = requests.get(self.CNB_DAILY_URL, timeout=10)
-            response.raise_for_status()
+    def _parse_cnb_year(self, text: str) -> List[Tuple[date, Dict[str, Decimal]]]:
+        """
+        Parse CNB year.txt response.
 
-            rates = self._parse_cnb_response(response.text)
+        Format:
+        Line 1: Date|1 AUD|1 BGN|...|100 JPY|...
+        Line 2+: DD.MM.YYYY|rate|rate|...
 
-            # Add CZK itself (1 CZK = 1 CZK)
-            rates['CZK'] = Decimal('1.0')
+        The header line repeats (with different columns) when the set of
+        published currencies changes during the year. Rates are normalized
+        to rate per 1 unit.
+        """
+        fixings = []
+        columns: List[Tuple[int, str]] = []
 
-            # Cache the results
-            self._rates_cache[date_str] = rates
-            self._save_cache_to_disk()
+        for line in text.strip().splitlines():
+            parts = line.strip().split('|')
 
-            logger.info(f"Fetched {len(rates)} exchange rates from CNB")
-            return rates
+            if parts[0] == 'Date':
+                columns = []
+                for column in parts[1:]:
+                    amount, code = column.split()
+                    columns.append((int(amount), code.strip()))
+                continue
 
-        except requests.RequestException as e:
-            logger.error(f"Failed to fetch rates from CNB: {e}")
+            if not columns or len(parts) != len(columns) + 1:
+                continue
 
-            # Try to use most recent cached rates
-            if self._rates_cache:
-                most_recent = max(self._rates_cache.keys())
-                logger.warning(f"Using cached rates from {most_recent} as fallback")
-                return self._rates_cache[most_recent]
+            try:
+                fixing_date = datetime.strptime(parts[0], '%d.%m.%Y').date()
+                rates = {'CZK': Decimal('1.0')}
+                for (amount, code), value in zip(columns, parts[1:]):
+                    if value:
+                        rates[code] = Decimal(value.replace(',', '.')) / Decimal(amount)
+                fixings.append((fixing_date, rates))
 
-            raise
+            except (ValueError, decimal.InvalidOperation) as e:
+                logger.warning(f"Could not parse CNB line: {line} - {e}")
+                continue
+
+        return fixings
 
     def _parse_cnb_response(self, text: str) -> Dict[str, Decimal]:
         """
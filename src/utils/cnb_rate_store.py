@@ -0,0 +1,363 @@
+"""
+Binary on-disk store for CNB exchange rate fixings.
+
+File layout (little-endian):
+
+    header (4096 bytes)
+        magic "CNBR", version, currency slots, year slots, scale digits
+        currency table   64 x 4-byte ASCII code (column order of the records)
+        year table      128 x (year, fetched_at unix seconds)
+    records (260 bytes each, sorted by date)
+        fixing date as date.toordinal() (int32)
+        64 x int32 rate in CZK per 1 unit, scaled by 10^6 (0 = not quoted)
+
+CNB quotes three decimals for 1, 100 or 1000 units, so six decimals hold
+every per-unit rate exactly.
+
+Opening the store only maps the file and reads the header, so startup
+cost doesn't grow with the number of cached dates. Lookups bisect the
+record dates in the memory map and decode only the rows they return.
+
+New fixings are appended after the last record. A write that would break
+the date order (an older year, a corrected fixing) rewrites the file to a
+temporary copy that atomically replaces the original. Writers hold a lock
+file, so worker processes can share one store.
+"""
+
+import logging
+import mmap
+import os
+import struct
+from bisect import bisect_right
+from contextlib import contextmanager
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"CNBR"
+VERSION = 1
+HEADER_SIZE = 4096
+CURRENCY_SLOTS = 64
+YEAR_SLOTS = 128
+SCALE_DIGITS = 6
+SCALE = Decimal(10) ** SCALE_DIGITS
+
+_PREAMBLE = struct.Struct("<4sHHHH")
+_CURRENCY = struct.Struct("<4s")
+_YEAR = struct.Struct("<H6xq")
+_ORDINAL = struct.Struct("<i")
+_RECORD = struct.Struct(f"<i{CURRENCY_SLOTS}i")
+MAX_SCALED_RATE = 2 ** 31 - 1
+
+CURRENCY_TABLE_OFFSET = 16
+YEAR_TABLE_OFFSET = CURRENCY_TABLE_OFFSET + CURRENCY_SLOTS * _CURRENCY.size
+RECORD_SIZE = _RECORD.size
+
+Fixing = Tuple[date, Dict[str, Decimal]]
+
+
+class _DateIndex:
+    """Read-only sequence of record date ordinals, for bisect over the memory map"""
+
+    def __init__(self, mm: mmap.mmap, count: int):
+        self._mm = mm
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> int:
+        return _ORDINAL.unpack_from(self._mm, HEADER_SIZE + index * RECORD_SIZE)[0]
+
+
+class CNBRateStore:
+    """
+    Memory-mapped table of CNB fixings, one row per fixing date.
+
+    Rows hold CZK per 1 unit of each quoted currency, like CNBExchangeRates.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Open (or create) a rate store.
+
+        Args:
+            path: Store file, e.g. data/cache/cnb_rates.bin
+        """
+        self.path = Path(path)
+        self.lock_path = self.path.with_suffix(".lock")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._file = None
+        self._mm: Optional[mmap.mmap] = None
+        self._stat: Optional[Tuple[int, int]] = None  # (inode, size) of the mapped file
+        self._valid = False
+        self._count = 0
+        self._currencies: List[str] = []
+        self._years: Dict[int, datetime] = {}
+        self._rows: Dict[int, Dict[str, Decimal]] = {}  # decoded rows by record index
+
+        if not self.path.exists():
+            with self._locked():
+                if not self.path.exists():
+                    self._rewrite([], {}, [])
+        self._map()
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return self._count
+
+    def fetched_at(self, year: int) -> Optional[datetime]:
+        """When a whole year was last downloaded, or None if it never was"""
+        return self._years.get(year)
+
+    def date_at(self, index: int) -> date:
+        return date.fromordinal(_ORDINAL.unpack_from(self._mm, HEADER_SIZE + index * RECORD_SIZE)[0])
+
+    def rates_at(self, index: int) -> Dict[str, Decimal]:
+        """Rates of one record, including CZK itself"""
+        rates = self._rows.get(index)
+        if rates is None:
+            values = _RECORD.unpack_from(self._mm, HEADER_SIZE + index * RECORD_SIZE)[1:]
+            rates = {'CZK': Decimal('1.0')}
+            for code, value in zip(self._currencies, values):
+                if value:
+                    rates[code] = Decimal(value) / SCALE
+            self._rows[index] = rates
+        return rates
+
+    def index_on_or_before(self, target_date: date) -> int:
+        """Index of the latest fixing on or before target_date (-1 if there is none)"""
+        return bisect_right(_DateIndex(self._mm, self._count), target_date.toordinal()) - 1
+
+    def refresh(self):
+        """Remap the file if another process appended to or replaced it"""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        if (st.st_ino, st.st_size) != self._stat:
+            self._map()
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _map(self):
+        """Map the file and read its header - O(1) in the number of records"""
+        self.close()
+        self._rows = {}
+        self._count = 0
+        self._currencies = []
+        self._years = {}
+
+        self._file = open(self.path, "rb")
+        st = os.fstat(self._file.fileno())
+        self._stat = (st.st_ino, st.st_size)
+        self._valid = False
+        if st.st_size < HEADER_SIZE:
+            logger.warning(f"Ignoring truncated CNB rate cache {self.path}; it will be rebuilt")
+            return
+
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if _PREAMBLE.unpack_from(self._mm, 0) != (MAGIC, VERSION, CURRENCY_SLOTS, YEAR_SLOTS, SCALE_DIGITS):
+            logger.warning(f"Ignoring unreadable CNB rate cache {self.path}; it will be rebuilt")
+            return
+
+        self._valid = True
+        # A torn append leaves a partial record at the end - ignore it
+        self._count = (st.st_size - HEADER_SIZE) // RECORD_SIZE
+        self._currencies = self._read_currencies(self._mm)
+        self._years = self._read_years(self._mm)
+
+    @staticmethod
+    def _read_currencies(buffer) -> List[str]:
+        currencies = []
+        for slot in range(CURRENCY_SLOTS):
+            code = _CURRENCY.unpack_from(buffer, CURRENCY_TABLE_OFFSET + slot * _CURRENCY.size)[0]
+            code = code.rstrip(b"\0").decode("ascii")
+            if not code:
+                break
+            currencies.append(code)
+        return currencies
+
+    @staticmethod
+    def _read_years(buffer) -> Dict[int, datetime]:
+        years = {}
+        for slot in range(YEAR_SLOTS):
+            year, fetched_at = _YEAR.unpack_from(buffer, YEAR_TABLE_OFFSET + slot * _YEAR.size)
+            if not year:
+                break
+            years[year] = datetime.fromtimestamp(fetched_at)
+        return years
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def write(self, fixings: Iterable[Fixing], fetched_years: Optional[Dict[int, datetime]] = None):
+        """
+        Store fixings and mark years as downloaded.
+
+        Fixings for dates already in the store replace the stored rates.
+
+        Args:
+            fixings: (fixing date, rates) pairs
+            fetched_years: Years fully downloaded by this write -> download time
+        """
+        fixings = sorted(dict(fixings).items())
+        fetched_years = fetched_years or {}
+
+        with self._locked():
+            # Another process may have written since we mapped the file
+            self.refresh()
+
+            # New currencies get the next free columns, existing columns never move
+            currencies = list(self._currencies)
+            for _, rates in fixings:
+                for code in rates:
+                    if code != 'CZK' and code not in currencies:
+                        if len(currencies) == CURRENCY_SLOTS:
+                            logger.warning(f"CNB rate cache is full, not storing {code}")
+                            continue
+                        currencies.append(code)
+
+            years = {**self._years, **fetched_years}
+            if len(years) > YEAR_SLOTS:
+                years = dict(sorted(years.items())[-YEAR_SLOTS:])
+
+            records = [self._encode(fixing_date, rates, currencies) for fixing_date, rates in fixings]
+
+            # Fixings already stored unchanged are skipped, changed ones force a rewrite
+            new_records = []
+            changed = False
+            for (fixing_date, _), record in zip(fixings, records):
+                index = self.index_on_or_before(fixing_date)
+                if index >= 0 and self.date_at(index) == fixing_date:
+                    changed = changed or self._raw_record(index) != record
+                    continue
+                new_records.append(record)
+
+            in_order = (
+                not new_records or self._count == 0
+                or _ORDINAL.unpack_from(new_records[0])[0] > self._last_ordinal()
+            )
+
+            if self._valid and not changed and in_order:
+                self._append(new_records, currencies, years)
+            else:
+                existing = [self._raw_record(index) for index in range(self._count)]
+                self._rewrite(currencies, years, self._merge(existing, records))
+
+            self._map()
+
+    def _encode(self, fixing_date: date, rates: Dict[str, Decimal], currencies: List[str]) -> bytes:
+        values = [0] * CURRENCY_SLOTS
+        for code, rate in rates.items():
+            if code == 'CZK' or code not in currencies:
+                continue
+            scaled = rate * SCALE
+            integral = scaled.to_integral_value()
+            if scaled != integral:
+                logger.debug(f"Rounding CNB rate {code} {rate} on {fixing_date} to {SCALE_DIGITS} decimals")
+            if integral > MAX_SCALED_RATE:
+                logger.warning(f"CNB rate {code} {rate} on {fixing_date} is too large for the cache, skipping")
+                continue
+            values[currencies.index(code)] = int(integral)
+        return _RECORD.pack(fixing_date.toordinal(), *values)
+
+    def _raw_record(self, index: int) -> bytes:
+        offset = HEADER_SIZE + index * RECORD_SIZE
+        return self._mm[offset:offset + RECORD_SIZE]
+
+    def _last_ordinal(self) -> int:
+        return _ORDINAL.unpack_from(self._mm, HEADER_SIZE + (self._count - 1) * RECORD_SIZE)[0]
+
+    @staticmethod
+    def _merge(existing: List[bytes], records: List[bytes]) -> List[bytes]:
+        """Merge records by date; records win over existing ones of the same date"""
+        merged = {_ORDINAL.unpack_from(record)[0]: record for record in existing}
+        merged.update((_ORDINAL.unpack_from(record)[0], record) for record in records)
+        return [merged[ordinal] for ordinal in sorted(merged)]
+
+    def _header(self, currencies: List[str], years: Dict[int, datetime]) -> bytes:
+        header = bytearray(HEADER_SIZE)
+        _PREAMBLE.pack_into(header, 0, MAGIC, VERSION, CURRENCY_SLOTS, YEAR_SLOTS, SCALE_DIGITS)
+        for slot, code in enumerate(currencies):
+            _CURRENCY.pack_into(header, CURRENCY_TABLE_OFFSET + slot * _CURRENCY.size, code.encode("ascii"))
+        for slot, (year, fetched_at) in enumerate(sorted(years.items())):
+            _YEAR.pack_into(header, YEAR_TABLE_OFFSET + slot * _YEAR.size, year, int(fetched_at.timestamp()))
+        return bytes(header)
+
+    def _append(self, records: List[bytes], currencies: List[str], years: Dict[int, datetime]):
+        """
+        Append records, then update the header in place.
+
+        New currency columns and year marks only add information, so a reader
+        that sees the header before the records (or a crash between the two
+        writes) never gets wrong rates - at worst a year is downloaded again.
+        """
+        with open(self.path, "r+b") as f:
+            header = self._header(currencies, years)
+            end = HEADER_SIZE + self._count * RECORD_SIZE
+            if currencies != self._currencies:
+                f.seek(CURRENCY_TABLE_OFFSET)
+                f.write(header[CURRENCY_TABLE_OFFSET:YEAR_TABLE_OFFSET])
+                f.flush()
+            if records:
+                f.truncate(end)
+                f.seek(end)
+                f.write(b"".join(records))
+                f.flush()
+                os.fsync(f.fileno())
+            if years != self._years:
+                f.seek(YEAR_TABLE_OFFSET)
+                f.write(header[YEAR_TABLE_OFFSET:YEAR_TABLE_OFFSET + YEAR_SLOTS * _YEAR.size])
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _rewrite(self, currencies: List[str], years: Dict[int, datetime], records: List[bytes]):
+        """Write the whole store to a temporary file and atomically replace the original"""
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(self._header(currencies, years))
+            f.write(b"".join(records))
+            f.flush()
+            os.fsync(f.fileno())
+        # Windows can't replace a file that is still mapped
+        self.close()
+        os.replace(tmp_path, self.path)
+
+    @contextmanager
+    def _locked(self):
+        """Exclusive lock held by one writing process at a time"""
+        with open(self.lock_path, "a+b") as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
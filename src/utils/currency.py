@@ -1,12 +1,18 @@
 """Currency conversion utilities."""
 
 from decimal import Decimal
-from typing import Dict, Optional
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
 from datetime import date
 from src.utils.logger import get_logger
 
 logger = get_logger()
 
+CENT = Decimal('0.01')
+
+# Resolved (from, to, date) conversion factors kept per converter
+FACTOR_CACHE_SIZE = 4096
+
 
 class CurrencyConverter:
     """Handle currency conversions with optional CNB API integration."""
@@ -14,7 +20,8 @@ class CurrencyConverter:
     def __init__(self, rates: Optional[Dict[str, float]] = None,
                  base_currency: str = "CZK",
                  use_cnb_api: bool = False,
-                 cnb_cache_dir: str = "data/cache"):
+                 cnb_cache_dir: str = "data/cache",
+                 cnb_year_url: Optional[str] = None):
         """
         Initialize converter with exchange rates.
 
@@ -24,6 +31,7 @@ class CurrencyConverter:
             base_currency: Base currency for normalization (default: CZK)
             use_cnb_api: If True, fetch real-time rates from CNB API
             cnb_cache_dir: Directory for caching CNB rates
+            cnb_year_url: Override of the CNB yearly rate file URL (mirrors, tests)
         """
         self.base_currency = base_currency
         self.use_cnb_api = use_cnb_api
@@ -39,12 +47,15 @@ class CurrencyConverter:
         if base_currency not in self.rates:
             self.rates[base_currency] = Decimal("1.0")
 
+        # LRU of resolved conversion factors - one rate lookup per (currency, date)
+        self._factor_cache = lru_cache(maxsize=FACTOR_CACHE_SIZE)(self._resolve_factor)
+
         # Initialize CNB API if enabled
         if use_cnb_api:
             try:
                 from src.utils.cnb_api import CNBExchangeRates
-                self.cnb_api = CNBExchangeRates(cache_dir=cnb_cache_dir)
-                logger.info("CNB API integration enabled for real-time exchange rates")
+                self.cnb_api = CNBExchangeRates(cache_dir=cnb_cache_dir, year_url=cnb_year_url)
+                logger.info("CNB API integration enabled for historical exchange rates")
             except Exception as e:
                 logger.error(f"Failed to initialize CNB API: {e}")
                 logger.warning("Falling back to static rates")
@@ -76,27 +87,66 @@ class CurrencyConverter:
         if from_currency == to_currency:
             return amount
 
+        factor = self._factor(from_currency, to_currency, transaction_date)
+        result = (amount * factor).quantize(CENT)
+        logger.debug("Converted %s %s to %s %s", amount, from_currency, result, to_currency)
+        return result
+
+    def convert_many(
+        self,
+        amounts: Sequence[Decimal],
+        currencies: Sequence[str],
+        dates: Sequence[Optional[date]],
+        to_currency: Optional[str] = None
+    ) -> List[Decimal]:
+        """
+        Convert many amounts at once.
+
+        Rows are grouped by (currency, date) so each rate is resolved once,
+        then every row of a group is converted with the same factor.
+
+        Args:
+            amounts: Amounts to convert
+            currencies: Source currency code of each amount
+            dates: Date for the exchange rate of each amount
+            to_currency: Target currency code (defaults to base currency)
+
+        Returns:
+            Converted amounts, in input order
+        """
+        if to_currency is None:
+            to_currency = self.base_currency
+
+        groups: Dict[Tuple[str, Optional[date]], List[int]] = {}
+        for i, key in enumerate(zip(currencies, dates)):
+            groups.setdefault(key, []).append(i)
+
+        results: List[Decimal] = list(amounts)
+        for (from_currency, transaction_date), indexes in groups.items():
+            if from_currency == to_currency:
+                continue
+            factor = self._factor(from_currency, to_currency, transaction_date)
+            for i in indexes:
+                results[i] = (amounts[i] * factor).quantize(CENT)
+
+        return results
+
+    def _factor(self, from_currency: str, to_currency: str, transaction_date: Optional[date]) -> Decimal:
+        """Multiplier converting from_currency to to_currency (memoized per currency/date)"""
+        return self._factor_cache(from_currency, to_currency, transaction_date)
+
+    def _resolve_factor(self, from_currency: str, to_currency: str, transaction_date: Optional[date]) -> Decimal:
+        """Look up the conversion multiplier: CNB rates if enabled, else static rates"""
         # Use CNB API if enabled and base currency is CZK
         if self.use_cnb_api and self.cnb_api and self.base_currency == 'CZK':
             try:
-                # Convert to CZK first
+                # Rates are CZK per 1 unit: multiply to get CZK, divide to leave CZK
+                factor = Decimal("1")
                 if from_currency != 'CZK':
-                    amount_czk = self.cnb_api.convert_to_czk(
-                        amount, from_currency, transaction_date
-                    )
-                else:
-                    amount_czk = amount
-
-                # Then convert from CZK to target
+                    factor *= self.cnb_api.get_rate(from_currency, transaction_date)
                 if to_currency != 'CZK':
-                    result = self.cnb_api.convert_from_czk(
-                        amount_czk, to_currency, transaction_date
-                    )
-                else:
-                    result = amount_czk
-
-                logger.debug(f"Converted {amount} {from_currency} to {result} {to_currency} using CNB rates")
-                return result.quantize(Decimal('0.01'))
+                    factor /= self.cnb_api.get_rate(to_currency, transaction_date)
+                return factor
 
             except Exception as e:
                 logger.warning(f"CNB API conversion failed: {e}, falling back to static rates")
@@ -121,22 +171,11 @@ class CurrencyConverter:
         # To convert FROM foreign to CZK: multiply by rate
         # To convert FROM CZK to foreign: divide by rate
         if from_currency == self.base_currency:
-            # Converting from CZK to foreign: divide by rate
-            amount_in_base = amount
-            result = amount_in_base / to_rate
-        elif to_currency == self.base_currency:
-            # Converting from foreign to CZK: multiply by rate
-            amount_in_base = amount * from_rate
-            result = amount_in_base
-        else:
-            # Converting between two foreign currencies: through CZK
-            # First convert to CZK (multiply), then to target (divide)
-            amount_in_base = amount * from_rate  # to CZK
-            result = amount_in_base / to_rate     # to target currency
+            return 1 / to_rate
+        if to_currency == self.base_currency:
+            return from_rate
+        return from_rate / to_rate
 
-        logger.debug(f"Converted {amount} {from_currency} to {result} {to_currency}")
-        return result.quantize(Decimal('0.01'))
-    
     def get_rate(self, currency: str) -> Decimal:
         """Get exchange rate for a currency."""
         return self.rates.get(currency, Decimal("1.0"))
@@ -144,8 +183,13 @@ class CurrencyConverter:
     def add_rate(self, currency: str, rate: float):
         """Add or update exchange rate."""
         self.rates[currency] = Decimal(str(rate))
+        self.clear_cache()
         logger.info(f"Added/updated rate for {currency}: {rate}")
 
+    def clear_cache(self):
+        """Forget memoized conversion factors (e.g. before reusing the converter for a new import)"""
+        self._factor_cache.cache_clear()
+
 
 def normalize_currency_code(code: str) -> str:
     """Normalize currency code to standard format."""
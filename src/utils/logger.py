@@ -1,9 +1,36 @@
-"""Logging configuration."""
+"""Logging configuration.
 
+Processes log through a QueueHandler: a logging call only formats the
+record's message and puts it on a queue, and a QueueListener thread does
+the file and console writes. Hot loops log per-row details at DEBUG with
+%-style arguments (formatted only if DEBUG is enabled) and only for every
+ROW_LOG_EVERY-th row (see log_row).
+"""
+
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
+import threading
 from datetime import datetime
-from typing import Optional
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+LOG_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+DEFAULT_LOGGING_SETTINGS: Dict[str, Any] = {
+    "level": "INFO",
+    "file": "data/logs/finance_consolidator.log",
+    "console": True,
+}
+
+# Per-row DEBUG logs of hot loops are written for every Nth row
+ROW_LOG_EVERY = 100
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_listener_lock = threading.Lock()
 
 
 def setup_logger(
@@ -57,3 +84,90 @@ def setup_logger(
 def get_logger(name: str = "finance_consolidator") -> logging.Logger:
     """Get existing logger or create new one."""
     return logging.getLogger(name)
+
+
+def load_logging_settings(settings_path: str = "config/settings.yaml") -> Dict[str, Any]:
+    """settings.yaml -> logging merged over DEFAULT_LOGGING_SETTINGS"""
+    path = Path(settings_path)
+    if not path.exists():
+        return dict(DEFAULT_LOGGING_SETTINGS)
+
+    try:
+        import yaml
+        with open(path, 'r', encoding='utf-8') as f:
+            settings = yaml.safe_load(f) or {}
+        return {**DEFAULT_LOGGING_SETTINGS, **(settings.get('logging') or {})}
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"Could not load logging settings from {settings_path}: {e}")
+        return dict(DEFAULT_LOGGING_SETTINGS)
+
+
+def configure_logging(settings: Optional[Dict[str, Any]] = None) -> logging.handlers.QueueListener:
+    """
+    Route the root logger through a queue to a background writer thread.
+
+    The file and console handlers run on the QueueListener's thread, so a
+    request handler or import loop never blocks on a log write. Safe to
+    call more than once per process (later calls return the running
+    listener). The listener is stopped, and the queue flushed, at exit.
+
+    Args:
+        settings: logging settings (level, file, console); loads settings.yaml if None
+
+    Returns:
+        The process's QueueListener
+    """
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            return _listener
+
+        settings = settings if settings is not None else load_logging_settings()
+        level = getattr(logging, str(settings.get('level') or 'INFO').upper(), logging.INFO)
+        formatter = logging.Formatter(LOG_FORMAT, datefmt=LOG_DATE_FORMAT)
+
+        handlers = []
+        if settings.get('file'):
+            log_file = Path(settings['file'])
+            log_file.parent.mkdir(parents=True, exist_ok=True)
+            handlers.append(logging.FileHandler(log_file, encoding='utf-8'))
+        if settings.get('console', True):
+            handlers.append(logging.StreamHandler())
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(logging.handlers.QueueHandler(log_queue))
+        root.setLevel(level)
+
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(stop_logging)
+        return _listener
+
+
+def stop_logging():
+    """Flush queued records and stop the writer thread (no-op if not running)"""
+    global _listener
+    with _listener_lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def log_row(logger: logging.Logger, index: int, total: int, message: str, *args):
+    """
+    DEBUG log of one row of a hot loop, for every ROW_LOG_EVERY-th row only.
+
+        log_row(logger, idx, len(transactions), "Result: %s > %s", tier1, tier2)
+
+    The message is %-formatted by logging, i.e. never if DEBUG is disabled.
+    """
+    if index % ROW_LOG_EVERY == 0 and logger.isEnabledFor(logging.DEBUG):
+        logger.debug("[%d/%d] " + message, index + 1, total, *args)
@@ -0,0 +1,286 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+
+Counters, gauges and histograms are plain Python objects with a lock;
+recording a value is a dict lookup and an addition, so instrumenting hot
+paths (every HTTP request, every SQL statement) costs microseconds.
+
+    REQUESTS = counter("finance_http_requests_total", "HTTP requests", ("method", "route"))
+    REQUESTS.labels("GET", "/api/v1/transactions").inc()
+    REGISTRY.render()   # text served by GET /metrics
+
+Import jobs run in worker processes; a worker returns drain() with each
+job result and the API process merge()s it, so SQL and AI metrics of the
+workers show up in the API's /metrics.
+"""
+import bisect
+import math
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_string(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    """Base of the metric types: a name, label names and one child per label values"""
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: Dict[Tuple[str, ...], Any] = {}
+
+    def labels(self, *values) -> Any:
+        """Child metric of the given label values (created on first use)"""
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self) -> Any:
+        raise NotImplementedError
+
+    def _items(self) -> List[Tuple[Tuple[str, ...], Any]]:
+        with self._lock:
+            return list(self._children.items())
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in sorted(self._items()):
+            lines.extend(self._render_child(values, child))
+        return lines
+
+    def _render_child(self, values: Tuple[str, ...], child: Any) -> List[str]:
+        return [f"{self.name}{_label_string(self.labelnames, values)} {_format_value(child.value)}"]
+
+
+class _Value:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float):
+        self.value = float(value)
+
+
+class Counter(_Metric):
+    """Monotonically increasing total"""
+    kind = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1.0):
+        """Increment the unlabelled counter"""
+        self.labels().inc(amount)
+
+
+class Gauge(_Metric):
+    """Value that goes up and down (in-flight requests, queue depth, quota)"""
+    kind = "gauge"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def set(self, value: float):
+        """Set the unlabelled gauge"""
+        self.labels().set(value)
+
+
+class _HistogramValue:
+    __slots__ = ("upper_bounds", "counts", "sum", "_lock")
+
+    def __init__(self, upper_bounds: Tuple[float, ...]):
+        self.upper_bounds = upper_bounds
+        self.counts = [0] * (len(upper_bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.upper_bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+
+class Histogram(_Metric):
+    """Distribution of observed values (durations) in cumulative buckets"""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(bucket) for bucket in buckets))
+
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float):
+        """Observe a value of the unlabelled histogram"""
+        self.labels().observe(value)
+
+    def _render_child(self, values: Tuple[str, ...], child: _HistogramValue) -> List[str]:
+        with child._lock:
+            counts = list(child.counts)
+            total = child.sum
+
+        lines = []
+        cumulative = 0
+        for upper_bound, count in zip(self.buckets + (math.inf,), counts):
+            cumulative += count
+            le = f'le="{_format_value(upper_bound)}"'
+            lines.append(f"{self.name}_bucket{_label_string(self.labelnames, values, le)} {cumulative}")
+        labels = _label_string(self.labelnames, values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Metrics of this process plus callbacks collected at scrape time"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[str]]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        """Add a metric (returns the registered one if the name exists, e.g. on module reload)"""
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def add_collector(self, collector: Callable[[], Iterable[str]]):
+        """Register a callback returning extra exposition lines (values read at scrape time)"""
+        with self._lock:
+            if collector not in self._collectors:
+                self._collectors.append(collector)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        for collector in collectors:
+            try:
+                lines.extend(collector())
+            except Exception as e:
+                lines.append(f"# collector {getattr(collector, '__name__', collector)} failed: {_escape(e)}")
+        return "\n".join(lines) + "\n"
+
+    def drain(self) -> Dict[str, Any]:
+        """
+        Take the values recorded since the last drain (worker processes).
+
+        Counters and histograms are returned and reset, gauges are returned
+        as they are.
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        snapshot: Dict[str, Any] = {}
+        for metric in metrics:
+            entries = []
+            for values, child in metric._items():
+                with child._lock:
+                    if isinstance(child, _HistogramValue):
+                        if not any(child.counts):
+                            continue
+                        entries.append((values, list(child.counts), child.sum))
+                        child.counts = [0] * len(child.counts)
+                        child.sum = 0.0
+                    else:
+                        if metric.kind == "counter" and not child.value:
+                            continue
+                        entries.append((values, child.value))
+                        if metric.kind == "counter":
+                            child.value = 0.0
+            if entries:
+                snapshot[metric.name] = entries
+        return snapshot
+
+    def merge(self, snapshot: Optional[Dict[str, Any]]):
+        """Add a drain() result of another process to the metrics of this one"""
+        for name, entries in (snapshot or {}).items():
+            metric = self._metrics.get(name)
+            if metric is None:
+                continue
+            for entry in entries:
+                child = metric.labels(*entry[0])
+                if isinstance(child, _HistogramValue):
+                    _, counts, total = entry
+                    if len(counts) != len(child.counts):
+                        continue
+                    with child._lock:
+                        child.counts = [own + other for own, other in zip(child.counts, counts)]
+                        child.sum += total
+                elif metric.kind == "counter":
+                    child.inc(entry[1])
+                else:
+                    child.set(entry[1])
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    """Create and register a Counter"""
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+
+def gauge(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+    """Create and register a Gauge"""
+    return REGISTRY.register(Gauge(name, documentation, labelnames))
+
+
+def histogram(name: str, documentation: str, labelnames: Sequence[str] = (),
+              buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    """Create and register a Histogram"""
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+
+def metric_lines(name: str, documentation: str, kind: str,
+                 samples: Iterable[Tuple[Dict[str, str], float]]) -> List[str]:
+    """Exposition lines of a value read by a collector: samples are [({label: value}, value), ...]"""
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        lines.append(f"{name}{_label_string(list(labels), list(labels.values()))} {_format_value(value)}")
+    return lines